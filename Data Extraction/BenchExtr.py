@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This code times the extraction of one month of consumption data, as done by
+# 'DataExtr.py', on synthetic raw DSB reports (see 'SynthReport.py') of a fleet
+# of 1x, 10x and 100x a base number of trains. For every fleet size, the time
+# of the extraction (conversion of the report to the compact schema, binning
+# and creation of the hourly dataframe), the number of rows extracted per
+# second and the peak memory that is allocated during the extraction are
+# reported. The results are also appended to 'Benchmark.csv', so that the
+# results of different versions of the code or of different computers can be
+# compared.
+# The reports are created in memory, so the time of reading the excel file is
+# not included (that time is removed by the cache of 'DataCache.py').
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import os
+import time
+import tracemalloc
+from ExtrEngine import BinTrainChunks, CreateHourlyDf
+from FrameSchema import CompactReport
+from SynthReport import SynthReport
+
+def ExtractFrame(df_trains, month, year=2022):
+    """Extract the hourly consumption of a month from a report held in memory"""
+    df_trains = CompactReport(df_trains)
+    tot_5min, num_trains = BinTrainChunks([df_trains], month, year, ['Consumption (MWh)'])
+    return CreateHourlyDf('Total consumption (MWh)', tot_5min['Consumption (MWh)'],
+                          num_trains['Consumption (MWh)'], month, year)
+
+def BenchExtraction(n_trains, month=11, year=2022, repeats=3, **synth):
+    """
+    Time 'ExtractFrame' on a synthetic report of 'n_trains' trains ('synth'
+    holds the other inputs of 'SynthReport'). The time is the best of
+    'repeats' runs, and the peak memory is measured on a separate run.
+    """
+    df_trains = SynthReport(n_trains, [month], year, **synth)
+    times = []
+    for r in range(repeats):
+        df_run = df_trains.copy()
+        t0 = time.perf_counter()
+        ExtractFrame(df_run, month, year)
+        times.append(time.perf_counter() - t0)
+
+    df_run = df_trains.copy()
+    tracemalloc.start()
+    ExtractFrame(df_run, month, year)
+    peak = tracemalloc.get_traced_memory()[1] # Peak of the memory allocated, in bytes.
+    tracemalloc.stop()
+
+    best = min(times)
+    return {'Trains': n_trains, 'Rows': len(df_trains), 'Time (s)': best,
+            'Rows/sec': len(df_trains) / best, 'Peak memory (MB)': peak / 2**20}
+
+if __name__ == '__main__':
+
+    # -------------------- Inputs -------------------------------------- #
+    # Input the base number of trains, and the fleet sizes as multiples of it:
+    base_trains = 10
+    scales = [1, 10, 100]
+    # Input the month and the year of the synthetic reports:
+    month = 11
+    year = 2022
+    # Input the number of timed runs of each fleet size:
+    repeats = 3
+    # Input the file where the results are appended:
+    log_path = os.path.join(os.getcwd(), 'Benchmark.csv')
+
+    # --------------------- Outputs ----------------------------------- #
+    list_res = []
+    for scale in scales:
+        res = BenchExtraction(base_trains * scale, month, year, repeats)
+        res['Scale'] = str(scale) + 'x'
+        list_res.append(res)
+        print(res)
+
+    df_bench = pd.DataFrame(list_res)
+    df_bench.insert(0, 'Date', pd.Timestamp.now().strftime('%Y-%m-%d %H:%M'))
+    df_bench['pandas'] = pd.__version__
+    print(df_bench.to_string(index=False))
+    df_bench.to_csv(log_path, mode='a', header=not os.path.exists(log_path), index=False)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the box statistics of the box plots ('YearlyDays.py' and
+# 'Regen-YearlyDays.py'). Instead of passing all the rows of the data to the
+# box plot of every figure, the statistics of every box are computed once, and
+# the box plots are drawn from them (with 'ax.bxp', see 'BoxStatsFigure' in
+# 'FigureReport.py'), so that drawing does not depend on the number of rows.
+# The values of a column are sorted once for all the groupings of the figures
+# (eg. by hour, month, day of the week and weekday/weekend, see
+# 'GroupedBoxStats'), and for every group:
+    #1. The quartiles are read from the sorted values by position (with the
+    #... linear interpolation of 'np.percentile', as in 'plt.boxplot'),
+    #2. The whiskers are the most extreme values within 1.5 x IQR of the box,
+    #3. The values beyond the whiskers (outliers) are kept as a sample of at
+    #... most 'max_fliers' values, evenly spread over the sorted outliers, so
+    #... that the lowest and the highest outliers are always drawn.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+
+def GroupOrder(keys):
+    """
+    Return the groups in the order of the box plots: sorted numbers, the
+    categories of categorical values, other values as they appear
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.cat.categories[keys.cat.categories.isin(keys)]
+    unique = pd.unique(keys)
+    if pd.api.types.is_numeric_dtype(keys):
+        return np.sort(unique)
+    return unique
+
+def SortedPercentile(values, q):
+    """Return the percentile q (in %) of sorted values, as 'np.percentile'"""
+    position = q / 100 * (len(values) - 1)
+    lo = int(position)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (position - lo) * (values[hi] - values[lo])
+
+def BoxStats(df, y, by, whis=1.5, max_fliers=100):
+    """
+    Return the box statistics of column y of 'df' grouped by column 'by', as a
+    list with one dictionary per group (in the format of 'ax.bxp': 'label',
+    'q1', 'med', 'q3', 'whislo', 'whishi', 'fliers'), and the number of values
+    of the group ('n'). Empty values are left out.
+    """
+    return GroupedBoxStats(df, y, [by], whis, max_fliers)[by]
+
+def GroupedBoxStats(df, y, groupings, whis=1.5, max_fliers=100):
+    """
+    Return a dictionary with the box statistics (see 'BoxStats') of column y
+    of 'df' for each of the grouping columns in 'groupings' (eg. the hour, the
+    month and the day of the week). The values are sorted only once: for every
+    grouping, the sorted values are then ordered by group with a stable sort of
+    the group codes, which keeps them sorted within each group.
+    """
+    values = df[y].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    sort = np.flatnonzero(valid)[np.argsort(values[valid], kind='stable')]
+    values = values[sort]
+
+    grouped = {}
+    for by in groupings:
+        order = GroupOrder(df[by])
+        codes = pd.Categorical(df[by].to_numpy()[sort], categories=order).codes
+        by_group = np.argsort(codes, kind='stable')
+        group_values, codes = values[by_group], codes[by_group]
+        bounds = np.searchsorted(codes, np.arange(len(order) + 1))
+        grouped[by] = [GroupStats(group_values[bounds[i]:bounds[i + 1]], label, whis, max_fliers)
+                       for i, label in enumerate(order) if bounds[i + 1] > bounds[i]]
+    return grouped
+
+def GroupStats(group, label, whis=1.5, max_fliers=100):
+    """Return the box statistics of the sorted values of a group"""
+    q1, med, q3 = (SortedPercentile(group, q) for q in [25, 50, 75])
+    iqr = q3 - q1
+    lo = np.searchsorted(group, q1 - whis * iqr, side='left') # First value within the whiskers.
+    hi = np.searchsorted(group, q3 + whis * iqr, side='right') # After the last one.
+    whislo = group[lo] if lo < len(group) else q1
+    whishi = group[hi - 1] if hi > 0 else q3
+    fliers = np.concatenate([group[:lo], group[hi:]])
+    if len(fliers) > max_fliers:
+        fliers = fliers[np.linspace(0, len(fliers) - 1, max_fliers).round().astype(np.int64)]
+    return {'label': str(label), 'q1': q1, 'med': med, 'q3': q3, 'whislo': min(whislo, q1),
+            'whishi': max(whishi, q3), 'fliers': fliers, 'n': len(group)}
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the calendar index of the project: a table with one row
+# per day, which holds the calendar fields that the scripts group the data by,
+# so that they are not recomputed row by row in every script. Every day has an
+# integer key (the number of days since 1 January 1970, see 'DayKeys'), and the
+# fields of the calendar are joined to the rows of a dataframe by looking up
+# the position of their key in the table ('JoinCalendar'). The fields are:
+    #1. 'day of week' (Monday=0), 'Day of week name', 'Month of year name',
+    #... 'Day of year' and 'Weekday-Weekend', as in the scripts,
+    #2. 'Holiday': the name of the Danish public holiday of the day ('' if
+    #... none), and 'Is holiday'. The movable holidays follow from Easter,
+    #... and the Great Prayer Day is a holiday until 2023,
+    #3. 'Day type': 'Weekday', 'Saturday', 'Sunday' or 'Holiday' (a public
+    #... holiday on any day of the week),
+    #4. 'Timetable year': the year of the annual timetable of the day, which
+    #... changes on the second Sunday of December (eg. the timetable 2023
+    #... starts on 11 December 2022), and 'Timetable season': 'Summer' during
+    #... the summer timetable ('SUMMER_WEEKS', ISO weeks) and 'Regular' else.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+import datetime as dt
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "August",
+               "September", "October", "November", "December"]
+DAY_TYPES = ['Weekday', 'Saturday', 'Sunday', 'Holiday']
+SUMMER_WEEKS = range(27, 33) # ISO weeks of the summer timetable (assumption).
+EPOCH = np.datetime64('1970-01-01', 'D') # Day of the key 0.
+
+def EasterSunday(year):
+    """Return the date of Easter Sunday of a year (Gregorian calendar)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+def DanishHolidays(year):
+    """Return a dictionary with the date and the name of every Danish public holiday of a year"""
+    easter = EasterSunday(year)
+    movable = {-3: "Maundy Thursday", -2: "Good Friday", 0: "Easter Sunday", 1: "Easter Monday",
+               39: "Ascension Day", 49: "Whit Sunday", 50: "Whit Monday"}
+    if year <= 2023: # The Great Prayer Day was abolished from 2024.
+        movable[26] = "Great Prayer Day"
+    holidays = {easter + dt.timedelta(days=offset): name for offset, name in movable.items()}
+    holidays[dt.date(year, 1, 1)] = "New Year's Day"
+    holidays[dt.date(year, 12, 25)] = "Christmas Day"
+    holidays[dt.date(year, 12, 26)] = "Second Christmas Day"
+    return holidays
+
+def TimetableChange(year):
+    """Return the date of the change of the annual timetable in December of a year (second Sunday)"""
+    first = dt.date(year, 12, 1)
+    return first + dt.timedelta(days=(6 - first.weekday()) % 7 + 7)
+
+def DayKeys(times):
+    """Return the integer day keys of the timestamps of a series (the days since 1 January 1970)"""
+    if times.dt.tz is not None:
+        times = times.dt.tz_localize(None)
+    return (times.to_numpy().astype('datetime64[D]') - EPOCH).astype(np.int64)
+
+def CalendarIndex(first_day, last_day):
+    """
+    Return the calendar table of the days from 'first_day' to 'last_day'
+    (included), indexed by their day key ('Day key'), with the fields listed
+    at the top of this file.
+    """
+    days = pd.date_range(pd.Timestamp(first_day).normalize(), pd.Timestamp(last_day).normalize(),
+                         freq='D')
+    weekday = days.dayofweek.to_numpy()
+    holidays = {}
+    for year in range(days[0].year, days[-1].year + 1):
+        holidays.update(DanishHolidays(year))
+    holiday = np.array([holidays.get(day.date(), '') for day in days], dtype=object)
+
+    df_calendar = pd.DataFrame({'Date': days}, index=pd.Index((days.to_numpy().astype('datetime64[D]')
+                                                              - EPOCH).astype(np.int64),
+                                                             name='Day key'))
+    df_calendar['day of week'] = weekday
+    df_calendar['Day of week name'] = np.array(DAY_NAMES)[weekday]
+    df_calendar['Month of year name'] = np.array(MONTH_NAMES)[days.month - 1]
+    df_calendar['Day of year'] = days.dayofyear
+    df_calendar['Weekday-Weekend'] = np.where(weekday < 5, 'Weekday', 'Weekend')
+    df_calendar['Holiday'] = holiday
+    df_calendar['Is holiday'] = holiday != ''
+    day_type = np.select([holiday != '', weekday == 5, weekday == 6],
+                         ['Holiday', 'Saturday', 'Sunday'], 'Weekday')
+    df_calendar['Day type'] = pd.Categorical(day_type, categories=DAY_TYPES) # In this order.
+    changes = np.array([TimetableChange(year) for year in days.year], dtype='datetime64[D]')
+    df_calendar['Timetable year'] = days.year + (days.to_numpy().astype('datetime64[D]')
+                                                 >= changes)
+    df_calendar['Timetable season'] = np.where(days.isocalendar().week.isin(SUMMER_WEEKS),
+                                               'Summer', 'Regular')
+    return df_calendar
+
+def JoinCalendar(df, columns=('Day of week name', 'Month of year name', 'Weekday-Weekend',
+                              'Day type'), time_column='Time'):
+    """
+    Add the given calendar fields to every row of 'df', from the day of its
+    'time_column', by looking up the position of its day key in the calendar
+    table of the days of 'df'. The dataframe is changed in place and returned.
+    """
+    keys = DayKeys(df[time_column])
+    df_calendar = CalendarIndex(pd.Timestamp(EPOCH + keys.min()), pd.Timestamp(EPOCH + keys.max()))
+    rows = keys - df_calendar.index[0] # Position of the day of every row in the table.
+    for column in columns:
+        df[column] = df_calendar[column].array.take(rows)
+    return df
+
+def DropHolidays(df, time_column='Time'):
+    """Return the rows of 'df' that are not on a Danish public holiday"""
+    holiday = JoinCalendar(df[[time_column]].copy(), ['Is holiday'], time_column)['Is holiday']
+    return df[~holiday.to_numpy(dtype=bool)]
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the cache that is used to read the Excel workbooks of the
+# project (the raw DSB reports and the 'Data - MonthN.xlsx' type of files).
+# The first time a workbook is read, its contents are also written to a
+# columnar (Parquet) copy, whose name is made from the hash of the workbook
+# and the version of the cache. Every later read of the same workbook is
+# served from that copy instead of parsing the Excel file again. Since the
+# name depends on the contents of the workbook, a workbook that is rewritten
+# (for instance by running 'DataExtr.py' again) gets a new copy.
+# A workbook can be converted to a schema (see 'FrameSchema.py') before it is
+# cached, in which case the copy is stored with that schema and its name also
+# holds the name of the schema.
+# If pyarrow is not installed, the copies are stored as pickle files instead.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import os
+import hashlib
+
+try:
+    import pyarrow.parquet as pq
+except ImportError: # The cache falls back to pickle files without pyarrow.
+    pq = None
+
+# Version of the cached copies. This has to be incremented whenever the way in
+# which a workbook is converted changes, so that older copies are not used.
+CACHE_VERSION = 3
+
+# Folder where the cached copies are stored. When None, the copies are stored
+# in a 'Cache' folder next to each workbook.
+CACHE_DIR = None
+
+def FileHash(data_path):
+    """Return the SHA-256 hash of the contents of a file"""
+    h = hashlib.sha256()
+    with open(data_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def CachePath(data_path, ext='.parquet', schema=None):
+    """Return the path of the cached copy of a workbook (converted with 'schema')"""
+    cache_dir = CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(data_path)), 'Cache')
+    name = FileHash(data_path) + '-v' + str(CACHE_VERSION)
+    if schema is not None:
+        name += '-' + schema.__name__
+    name += ext
+    return os.path.join(cache_dir, name)
+
+def SaveFrame(df, stem):
+    """
+    Save a dataframe to '<stem>.parquet', or to '<stem>.pkl' when pyarrow is
+    not installed or Parquet cannot store one of its columns.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(stem)), exist_ok=True)
+    # The file is first written to a temporary file and then renamed, so that
+    # processes reading the same file at the same time never see a partially
+    # written file:
+    tmp_path = stem + '.' + str(os.getpid()) + '.tmp'
+    try:
+        if pq is None:
+            raise ImportError('pyarrow is not installed')
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, stem + '.parquet')
+    except (ImportError, ValueError, TypeError, NotImplementedError):
+        # Columns that Parquet cannot store (eg. mixed types) and missing
+        # pyarrow: the file is stored as a pickle file instead.
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, stem + '.pkl')
+
+def LoadFrame(stem):
+    """Load a dataframe saved with 'SaveFrame', or return None if there is none"""
+    if pq is not None and os.path.exists(stem + '.parquet'):
+        return pd.read_parquet(stem + '.parquet')
+    if os.path.exists(stem + '.pkl'):
+        return pd.read_pickle(stem + '.pkl')
+    return None
+
+def ReadExcelCached(data_path, schema=None):
+    """
+    Read a workbook like 'pd.read_excel', serving it from its cached copy
+    when that copy exists, and creating the copy otherwise. When a 'schema'
+    function is given (eg. 'CompactHourly'), the workbook is converted with it
+    before it is cached, and the cached copy is converted with it again when
+    it is loaded, so that the dtypes do not depend on how the copy is stored
+    (eg. the categorical train IDs, which Parquet can return as integers).
+    """
+    stem = CachePath(data_path, '', schema)
+    df = LoadFrame(stem)
+    if df is None:
+        df = pd.read_excel(data_path)
+        if schema is not None:
+            df = schema(df)
+        SaveFrame(df, stem)
+    elif schema is not None:
+        df = schema(df)
+    return df
+
+def CachedChunks(data_path, chunk_rows, schema=None):
+    """
+    Return an iterator over the cached Parquet copy of a workbook (converted
+    with 'schema'), in dataframes of 'chunk_rows' rows, or None when there is
+    no such copy.
+    """
+    parquet_path = CachePath(data_path, '.parquet', schema)
+    if pq is None or not os.path.exists(parquet_path):
+        return None
+    batches = pq.ParquetFile(parquet_path).iter_batches(batch_size=chunk_rows)
+    return (batch.to_pandas() for batch in batches)
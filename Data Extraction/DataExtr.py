@@ -14,138 +14,94 @@ import os
 import datetime as dt
 import matplotlib.pyplot as plt
 import numpy as np
+from ExtrEngine import BinTrainChunks, CreateHourlyDf, NewAccumulator, FoldChunks, QualityResult
+from ReportReader import ReadReport, ReadReportChunks
+from HourlyStore import AppendReport, ReadStoreMonth, ReadStoreChunks
+from HourlyStats import CreateStatsDf
+from DataQuality import WriteQuality
 
 # -------------------- Inputs -------------------------------------- #
-# Input the number corresponding to the month you want to open the Excel file  
-# containing the dates:
+# Input the number of the month you want to extract the data of:
 month = 11
+# Input the year of the data:
+year = 2022
 # Input the data path by changing the file name of the month you want to 
 # extract the data from:
 data_path = os.path.join(os.getcwd(),'2022-11 - 2022-12_energy-raw-data-report_DSB.xlsx')
 #data_path = os.path.join(os.getcwd(),'Test - Dec.xlsx')
-df_trains = pd.read_excel(data_path)
+# Set 'streaming' to True to read the report in chunks of 'chunk_rows' rows
+# instead of loading the whole report at once (for reports that do not fit
+# in memory):
+streaming = False
+chunk_rows = 100000
+# Set 'incremental' to True to add the report to the persistent store in
+# 'store_dir' (see 'HourlyStore.py'), where only its new rows and the rows that
+# correct already stored readings are processed, and to extract the month from
+# that store:
+incremental = False
+store_dir = os.path.join(os.getcwd(), 'Store')
+# Input the duration of a reading of a train in minutes (eg. 5) to add the peak
+# number of trains that are active at the same moment within each hour
+# ('Peak concurrent trains', see 'SweepLine.py'), or None to leave it out:
+reading_min = None
 
 # --------------------- Outputs ----------------------------------- #
-month_31 = [1, 3, 5, 7, 8, 10, 12] # Months having 31 days.
-month_30 = [4, 6, 9, 11] # Months having 30 days.
+if streaming:
+    chunks = ReadReportChunks(data_path, chunk_rows) # The report, chunk by chunk.
+else:
+    chunks = [ReadReport(data_path)] # The whole report as a single chunk.
 
-# Reading the excel file that contains only 5 minute timestamps for the inputted month, 
-# which was created through 'New_Df_Files.py'.
-data_path_new = os.path.join(os.getcwd(),'New_Df_Month - ' + str(month) + '.xlsx')
-df_new = pd.read_excel(data_path_new)
+# Calling the 'BinTrainChunks' function (see 'ExtrEngine.py'), or in the ...
+# ... incremental mode the 'ReadStoreMonth' function (see 'HourlyStore.py'), ...
+# ... to obtain, in a single pass over the rows of the inputted month:
+    #1. the total consumption at each 5-minute timestamp (consum_l),
+    #2. the number of active trains available at each hour (num_trains),
+    #3. the active trains available at each hour (hourly_consum). The trains of ...
+    #... hour h of the month are given by 'TrainsAtHour(hourly_consum, h)',
+    #4. with 'reading_min', the peak number of concurrent trains within each ...
+    #... 5-minute timestamp (concurrent). In the incremental mode, it is ...
+    #... obtained from the stored readings of the month,
+    #5. the data-quality report of the rows of the month (quality, see ...
+    #... 'DataQuality.py'). In the incremental mode, it is obtained from the ...
+    #... rows of the report while they are added to the store.
+concurrent = None
+if incremental:
+    acc_quality = NewAccumulator(month, year, [], quality=True) # Only the quality checks.
+    # Adding the new and corrected rows to the store:
+    AppendReport(store_dir, FoldChunks(acc_quality, chunks))
+    quality = QualityResult(acc_quality)
+    tot_5min, num_trains, hourly_consum = ReadStoreMonth(store_dir, month, year,
+                                                         return_members=True)
+    chunks = ReadStoreChunks(store_dir, month, year) # Stored readings, day by day.
+if not incremental or reading_min is not None:
+    out = BinTrainChunks(chunks, month, year, ['Consumption (MWh)'], return_members=True,
+                         reading_min=reading_min, return_quality=not incremental)
+    tot_5min, num_trains, hourly_consum = out[:3]
+    if reading_min is not None:
+        concurrent = out[3]['Consumption (MWh)']
+    if not incremental:
+        quality = out[-1]
+consum_l = tot_5min['Consumption (MWh)']
+num_trains = num_trains['Consumption (MWh)']
+hourly_consum = hourly_consum['Consumption (MWh)']
+P_max_consum = consum_l.max()
 
-consum_l = [] # List to store the total consumption at each 5-minute timestamp.
-num_trains = [] # List to store the number of active trains available at each hour.
-hourly_consum = [] # List to store what active trains are available at each hour.
-
-# convert the date column to datetime format
-df_trains['Time'] = pd.to_datetime(df_trains['Time'], dayfirst=True) # This ...
-# ... is to arrange the date in the dataframe in day/month/year format.
-
-df_trains['Time'] = df_trains['Time'].dt.tz_localize('UTC')
-
-# Assigning the end day depending on the type of month:
-if month in month_31:
-    day_end = 32 # For months with 31 days, the end day is 31.
-                 # (Here, 1 is added to 31 because, later in this code, the 'range' 
-                 # function is used to create the range of days within that month).
-    
-elif month in month_30:
-    day_end = 31 # For months with 30 days, the end day is 30.
-    
-else: 
-    day_end = 29 # For month of February in year 2022, the end day is 28.
-
-days = range(1,day_end) # Range of days of a month
-hours = range(0,24) # 24 hours of a day
-min_s = [0,5,10,15,20,25,30,35,40,45,50,55] # Minutes with 5 minute resolution
-
-for day in days:
-    for hour in hours:
-        for mints in min_s:
-            
-            # Start-time to extract the 5-minute timestamp:
-            t_s = pd.Timestamp(dt.datetime(2022, month, day, hour, mints, 0), tz='UTC')
-            # End-time to extract the 5-minute timestamp:
-            t_e = pd.Timestamp(dt.datetime(2022, month, day, hour, mints+4, 59), tz='UTC')
-            
-            # Extracting the 5-minute timestamp specified by t_s and t_e, from the dataframe:
-            df_train_set1 = df_trains.loc[(df_trains['Time']>=t_s) & (df_trains['Time']<=t_e)]
-            df_train_set1 =df_train_set1.reset_index(drop=True)
-            
-            # Count the entries that has nonzero consumption
-            n = np.count_nonzero(df_train_set1["Consumption (MWh)"])
-            #num_trains.append(n)
-            
-            # Add the consumption of all active trains within that corresponding timestamp...
-            # ... to obtain the total consumption at that timestamp
-            x = df_train_set1["Consumption (MWh)"].sum()
-            consum_l.append(x) # Inserting the total consumption at each timestamp ...
-            # ... to the list: consum_l
-            
-            if mints == 0: # At a timestamp where there is a 'start ... 
-            # ... of a new hour' (minutes is equal to 00):
-                
-                # Filtering the df_train_set1 dataframe to obtain a dataframe with ...
-                # ... nonzero consumption.
-                train_set2 = df_train_set1.loc[df_train_set1["Consumption (MWh)"] > 0] 
-                all_consum_Points = train_set2.ConsumptionPoint.unique() # Filter all the  ...
-                # ... unique consump. points at this particular time stamp. This is an array.
-    
-                consumP_list = all_consum_Points.tolist() # Convert "all_consum_Points" ...
-                # ... to a list.
-                
-            else: # At a timestamp of the 'same hour but not the start of that hour'... 
-            # ... (minutes is not equal to 00):
-                
-                # Filtering the df_train_set1 dataframe to obtain a dataframe with ...
-                # ... nonzero consumption.
-                train_set3 = df_train_set1.loc[df_train_set1["Consumption (MWh)"] > 0] 
-                other_CP = train_set3.ConsumptionPoint.unique() # Filter all the  ...
-                # ... unique consump. points at this particular time stamp. This is an array.
-                
-                other_CP_list = other_CP.tolist() # Convert "other_CP" ...
-                # ... to a list.
-                
-                
-                # If there is a consumption point in other_CP_list that is not present in ...
-                # ... consumP_list, add it to consumP_list. This is to count a ...
-                # ... consumption point (train) that is active within the corresponding hour, only once.
-                for i in other_CP_list:
-                    if i not in consumP_list:
-                        consumP_list.append(i)
-        
-        trains = len(consumP_list) # Counting the total number of active trains within ...
-        # ... the corresponding hour.
-        num_trains.append(trains) # This contains the number of active trains available ...
-        # .... at each hour for all the days of the month.  
-        hourly_consum.append(consumP_list) # This contains all the active trains at each hour ...
-        # .... for all the days of the month.
-
-df_new['Total consumption (MWh)'] = consum_l # Insert the column with total consumption ...
-# ... at each 5 minute timestamp for every day for the inputted month.
-P_max_consum = df_new['Total consumption (MWh)'].max() 
-df_new['Time'] = pd.to_datetime(df_new['Time'], dayfirst=True)
-df_new_hourly = df_new.resample('H', on='Time').mean() # Get the total ...
-# ... consumption at each hour. 
-df_new_hourly = df_new_hourly.reset_index() # Resetting the index of the dataframe.
-df_new_hourly['Number of trains available'] = num_trains # Insert the ...
-# ... active number of trains available at each hourly timestamp for ...
-# ... every day.
-df_new_hourly['Time'] = pd.to_datetime(df_new_hourly['Time'], dayfirst=True)
-df_new_hourly["day"] = df_new_hourly["Time"].dt.day # Extracting the day ....
-# ... of the month.
-df_new_hourly["hour"] = df_new_hourly['Time'].dt.hour # Extracting the hour ...
-# ... of the day.
-df_new_hourly["day of week"] = df_new_hourly["Time"].dt.dayofweek # Extracting the day ...
-# ... of the week with Monday=0, Sunday=6.
+# Creating the hourly dataframe containing the total consumption of all active ...
+# ... trains within each hour, with the number of active trains available, ...
+# ... the day of the month, the hour of the day and the day of the week:
+df_new_hourly = CreateHourlyDf('Total consumption (MWh)', consum_l, num_trains, month, year,
+                               concurrent)
 
 # Creating the excel file containing the total consumption of all active trains ...
 # ... within each hour for an entire month:
-   
-#df_new_hourly.dtypes
-#df_new_hourly['Time'] = df_new['Time'].dt.tz_localize(None)
-
 file_name = 'Data - Month' + str(month) + '.xlsx'
 df_new_hourly.to_excel(file_name)
-#    return df_new
\ No newline at end of file
+
+# Creating the excel file containing the hourly summaries (maximum, minimum, sum, ...
+# ... count and sum of squares) of the 5-minute total consumption, from which ...
+# ... the later stages obtain P_max (see 'HourlyStats.py'):
+CreateStatsDf(consum_l, month, year).to_excel('Stats - Month' + str(month) + '.xlsx')
+
+# Creating the excel file of the data-quality report of the month (gaps, ...
+# ... duplicate, negative and empty readings, per hour and per train):
+WriteQuality(quality, 'Quality - Month' + str(month) + '.xlsx')
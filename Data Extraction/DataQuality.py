@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the data-quality checks of the raw DSB reports. They are
+# folded into the scan of the extraction engine (see 'FoldChunk' in
+# 'ExtrEngine.py'), so that the report is not read a second time. A raw report
+# holds one reading per train (ConsumptionPoint) every 5 minutes, and for
+# every hour of the month and every train the following is counted:
+    #1. The readings, and the 5-minute timestamps without any reading of a
+    #... train (missing readings). The coverage is the share of the expected
+    #... readings (number of trains x 5-minute timestamps) that is present,
+    #2. The readings of a train beyond the first one within the same 5-minute
+    #... timestamp (duplicate readings),
+    #3. The negative and the empty (NaN) readings of each energy column,
+    #4. The readings with both consumption and generation at the same time,
+    #5. The readings without a ConsumptionPoint (per hour only), which are not
+    #... part of the checks above.
+# The checks are kept as counts per hour and per train, together with the
+# distinct (train, 5-minute timestamp) pairs of the month, so their size is
+# bounded by the size of the month and not by the number of rows.
+# The report of a month is written to 'Quality - MonthN.xlsx' ('RegenQuality -
+# MonthN.xlsx' by 'RegenDataExtr.py'), with one sheet per hour ('Hours') and
+# one per train ('Trains').
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+
+QUALITY_COLUMNS = ['Consumption (MWh)', 'Generation (MWh)'] # Energy columns that are checked.
+
+def CountNames():
+    """Return the names of the counts that are kept per hour and per train"""
+    names = ['Readings']
+    for column in QUALITY_COLUMNS:
+        quantity = column.split(' ')[0] # 'Consumption' or 'Generation'.
+        names += ['Negative ' + quantity.lower(), 'Empty ' + quantity.lower()]
+    return names + ['Consumption and generation']
+
+def NewQuality(n_hours, bins_hour=12):
+    """Create the running counts of the data-quality checks of a month"""
+    return {
+        'n_hours': n_hours,
+        'n_bins': n_hours * bins_hour, # Number of 5-minute timestamps of the month.
+        'bins_hour': bins_hour,
+        # Sorted (train code, 5-minute timestamp) keys with a reading, and the ...
+        # ... number of readings of each key:
+        'pairs': (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)),
+        'hours': {name: np.zeros(n_hours, dtype=np.int64) for name in CountNames()},
+        'trains': {name: np.zeros(0, dtype=np.int64) for name in CountNames()},
+        'no train': np.zeros(n_hours, dtype=np.int64), # Readings without a ConsumptionPoint.
+    }
+
+def FoldQuality(quality, codes, bins, values, n_trains):
+    """
+    Add the checks of the rows of a chunk to the running counts. 'codes' and
+    'bins' are the train code (-1 without a ConsumptionPoint) and the 5-minute
+    timestamp of each row, and 'values' holds the raw readings of the energy
+    columns of the chunk.
+    """
+    hours = bins // quality['bins_hour']
+    known = codes >= 0
+    quality['no train'] += np.bincount(hours[~known], minlength=quality['n_hours'])
+    codes, bins, hours = codes[known], bins[known], hours[known]
+    values = {column: value[known] for column, value in values.items()}
+    flags = {'Readings': np.ones(len(codes), dtype=bool)}
+    for column in QUALITY_COLUMNS:
+        if column in values:
+            quantity = column.split(' ')[0].lower()
+            flags['Negative ' + quantity] = values[column] < 0
+            flags['Empty ' + quantity] = np.isnan(values[column])
+    if all(column in values for column in QUALITY_COLUMNS):
+        flags['Consumption and generation'] = ((values['Consumption (MWh)'] > 0)
+                                               & (values['Generation (MWh)'] > 0))
+
+    for name, flag in flags.items():
+        quality['hours'][name] += np.bincount(hours[flag], minlength=quality['n_hours'])
+        old = quality['trains'][name]
+        new = np.bincount(codes[flag], minlength=n_trains)
+        new[:len(old)] += old
+        quality['trains'][name] = new
+    for name, old in quality['trains'].items():
+        if len(old) < n_trains: # Trains that are new in this chunk.
+            quality['trains'][name] = np.pad(old, (0, n_trains - len(old)))
+
+    # Adding the (train, 5-minute timestamp) pairs of the chunk to those of the ...
+    # ... earlier chunks:
+    old_keys, old_counts = quality['pairs']
+    new_keys, inverse = np.unique(np.concatenate([old_keys, codes * quality['n_bins'] + bins]),
+                                  return_inverse=True)
+    new_counts = np.bincount(inverse, weights=np.concatenate([old_counts, np.ones(len(codes))]),
+                             minlength=len(new_keys))
+    quality['pairs'] = (new_keys, new_counts.astype(np.int64))
+
+def QualityFrames(quality, times, train_ids, rank):
+    """
+    Return the data-quality report of a month as two dataframes: one row per
+    hour (at the hourly 'times') and one row per train ('train_ids', the
+    sorted ConsumptionPoints, where 'rank' is the position of each code).
+    """
+    n_hours, n_bins, bins_hour = quality['n_hours'], quality['n_bins'], quality['bins_hour']
+    n_trains = len(train_ids)
+    keys, counts = quality['pairs']
+    pair_codes = keys // n_bins
+    pair_hours = keys % n_bins // bins_hour
+
+    df_hours = pd.DataFrame({'Time': times})
+    df_trains = pd.DataFrame({'ConsumptionPoint': train_ids})
+    for name in CountNames():
+        df_hours[name] = quality['hours'][name]
+        by_rank = np.zeros(n_trains, dtype=np.int64) # Counts in the order of 'train_ids'.
+        by_rank[rank] = quality['trains'][name]
+        df_trains[name] = by_rank
+
+    # Coverage and duplicate readings, from the (train, 5-minute timestamp) pairs:
+    for df, index, size, expected in [(df_hours, pair_hours, n_hours, n_trains * bins_hour),
+                                      (df_trains, rank[pair_codes], n_trains, n_bins)]:
+        present = np.bincount(index, minlength=size) # Timestamps with a reading.
+        df.insert(2, 'Missing readings', expected - present)
+        df.insert(3, 'Coverage', present / expected if expected > 0 else np.nan)
+        df.insert(4, 'Duplicate readings',
+                  np.bincount(index, weights=counts - 1, minlength=size).astype(np.int64))
+    df_hours['Readings without ConsumptionPoint'] = quality['no train']
+    return df_hours, df_trains
+
+def WriteQuality(quality_dfs, file_name):
+    """Write the data-quality report of a month (see 'QualityFrames') to an excel file"""
+    df_hours, df_trains = quality_dfs
+    # The ConsumptionPoints are written as text, as excel keeps only 15 digits of a number:
+    df_trains = df_trains.assign(ConsumptionPoint=df_trains['ConsumptionPoint'].astype(str))
+    with pd.ExcelWriter(file_name) as writer:
+        df_hours.to_excel(writer, sheet_name='Hours')
+        df_trains.to_excel(writer, sheet_name='Trains')
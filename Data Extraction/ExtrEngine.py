@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the extraction engine that is used by 'DataExtr.py',
+# 'RegenDataExtr.py' and 'JointDataExtr.py' to assign the rows of a raw DSB
+# report to the 5-minute timestamps of a month.
+# Instead of building a mask over the whole report for every 5-minute
+# timestamp, the report is sorted once by time, the rows of the inputted month
+# are located with 'searchsorted', and every row is given the index of its
+# 5-minute timestamp by flooring its time. The total energy at each 5-minute
+# timestamp and the number of active trains at each hour are then obtained
+# from a single grouped pass over those rows, for as many energy columns
+# (consumption, regeneration) as needed. The active trains are counted per hour
+# from the distinct (hour, train) pairs, instead of checking list membership
+# for every train at every 5-minute timestamp.
+# The rows are folded into running totals ('NewAccumulator', 'FoldChunk'), so
+# that a report can also be read and binned in chunks of rows (see
+# 'ReportReader.py'), keeping the memory bounded by the size of the output.
+# Optionally, the energy of every train within each hour is kept as well, and
+# returned as a sparse (hours x ConsumptionPoint) matrix (see 'TrainMatrix.py').
+# The same scan can also give the totals at other resolutions than the hour
+# ('1min', '5min', '15min'). The rows are then binned at the finest of the
+# requested resolutions, and every coarser resolution is obtained by rolling
+# up the bins of the finer one (1-minute -> 5-minute -> 15-minute -> hourly).
+# Optionally, the peak number of trains that are active at the same moment is
+# obtained as well, with a sweep line over the activity intervals of the
+# trains, folded chunk by chunk (see 'SweepLine.py'), and the data-quality checks of the report
+# (gaps, duplicate readings, negative or empty readings) are folded into the
+# same scan (see 'DataQuality.py').
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import datetime as dt
+import calendar
+import numpy as np
+from scipy import sparse
+from SweepLine import NewSweep, FoldIntervals, SweepPeaks
+from DataQuality import QUALITY_COLUMNS, NewQuality, FoldQuality, QualityFrames
+
+MIN_NS = 60 * 10**9 # Nanoseconds in one minute.
+BIN_NS = 5 * MIN_NS # Nanoseconds in one 5-minute timestamp.
+BINS_HOUR = 12 # Number of 5-minute timestamps within one hour.
+HOUR_NS = BINS_HOUR * BIN_NS # Nanoseconds in one hour.
+# Resolutions that the engine can bin the rows at, with the number of minutes
+# of each. Every resolution is a whole number of periods of the finer ones.
+RESOLUTIONS = {'1min': 1, '5min': 5, '15min': 15, 'h': 60}
+
+def TimeToNs(times):
+    """Return the times of a 'Time' column as UTC nanoseconds (int64)"""
+    times = pd.to_datetime(times)
+    if times.dt.tz is not None: # Time-zone aware times are converted to UTC...
+        times = times.dt.tz_convert('UTC').dt.tz_localize(None) # ... and made naive.
+    return times.values.astype('datetime64[ns]').astype(np.int64)
+
+def NewAccumulator(month, year=2022,
+                   columns=('Consumption (MWh)', 'Generation (MWh)'),
+                   train_energy=False, resolutions=('h',), reading_min=None, quality=False):
+    """
+    Create the running totals of a month, into which the rows of a raw DSB
+    report are folded (all at once, or chunk by chunk) with 'FoldChunk'.
+
+    The size of the running totals is bounded by the periods of the month and
+    by the distinct (period, train) pairs, not by the number of rows of the
+    report. The energy is summed per 5 minutes (per minute when '1min' is one
+    of the 'resolutions'), and the active trains are kept per period of the
+    finest of the 'resolutions' (see 'ResolutionResult'). With
+    'train_energy=True', the energy of every train within each hour is summed
+    as well (see 'TrainEnergyResult'). When the duration of a reading is given
+    in minutes ('reading_min'), the number of concurrent trains at each second
+    of the month is kept as well, with the open activity interval of every
+    train (see 'ConcurrencyResult'); the chunks must then be in time order. With
+    'quality=True', the data-quality checks of the rows are counted as well
+    (see 'QualityResult').
+    """
+    n_days = calendar.monthrange(year, month)[1] # Number of days of the month.
+    n_hours = n_days * 24 # Number of hours of the month.
+    key_min = min(RESOLUTIONS[resolution] for resolution in resolutions) # Finest resolution.
+    bin_min = min(key_min, 5) # The energy is summed per 5 minutes, or per minute.
+    acc = {
+        'columns': list(columns),
+        't_start': pd.Timestamp(dt.datetime(year, month, 1)).value, # Start of the month.
+        'n_hours': n_hours,
+        'bin_min': bin_min,
+        'n_bins': n_hours * 60 // bin_min, # Number of energy bins of the month.
+        # Total energy of all trains within each energy bin:
+        'tot': {column: np.zeros(n_hours * 60 // bin_min) for column in columns},
+        'key_min': key_min,
+        'n_periods': n_hours * 60 // key_min, # Number of periods of the finest resolution.
+        # Distinct (train code, period) pairs with a nonzero reading, stored as ...
+        # ... the sorted keys 'code * n_periods + period':
+        'keys': {column: np.empty(0, dtype=np.int64) for column in list(columns) + ['All']},
+        'train_codes': {}, # Integer code given to each train (ConsumptionPoint).
+        # Sorted (train code, hour) keys with a nonzero reading and the sum of ...
+        # ... the readings of each key, per column (only with 'train_energy'):
+        'energy': {column: (np.empty(0, dtype=np.int64), np.empty(0))
+                   for column in columns} if train_energy else None,
+        # Sweep over the activity intervals of the trains of each column, in ...
+        # ... seconds from the start of the month (only with 'reading_min'):
+        'reading_s': None if reading_min is None else int(reading_min * 60),
+        'sweep': {column: NewSweep(n_hours * 3600) for column in list(columns) + ['All']}
+                 if reading_min is not None else None,
+        # Running counts of the data-quality checks (only with 'quality'):
+        'quality': NewQuality(n_hours, BINS_HOUR) if quality else None,
+    }
+    return acc
+
+def FoldChunk(acc, df_chunk):
+    """Add the rows of 'df_chunk' that belong to the month to the running totals"""
+    t_end = acc['t_start'] + acc['n_hours'] * HOUR_NS # Start of the next month.
+
+    # Sorting the chunk once by time, so that the rows of the month form one
+    # contiguous block that is located with 'searchsorted':
+    t_ns = TimeToNs(df_chunk['Time'])
+    order = np.argsort(t_ns, kind='stable')
+    t_sorted = t_ns[order]
+    lo, hi = np.searchsorted(t_sorted, [acc['t_start'], t_end])
+    rows = order[lo:hi] # Rows of the chunk that belong to the month.
+
+    # Index of the energy bin, of the period and of the hour that each row ...
+    # ... belongs to (floor of its time):
+    t_month = t_sorted[lo:hi] - acc['t_start']
+    bins = t_month // (acc['bin_min'] * MIN_NS)
+    periods = t_month // (acc['key_min'] * MIN_NS)
+    hours = t_month // HOUR_NS
+
+    # Integer code of the train of each row. The codes are kept in 'acc', so ...
+    # ... that a train has the same code in every chunk. The rows without a ...
+    # ... ConsumptionPoint ('factorize' gives them the code -1) keep the code ...
+    # ... -1: their energy is added to the totals, but they are not counted ...
+    # ... as a train (they are counted in the data-quality report):
+    local_codes, local_ids = pd.factorize(df_chunk['ConsumptionPoint'].to_numpy()[rows])
+    train_codes = acc['train_codes']
+    glob_codes = np.array([train_codes.setdefault(t, len(train_codes)) for t in local_ids] + [-1],
+                          dtype=np.int64) # The last code is the one of the code -1.
+    codes = glob_codes[local_codes]
+    known = codes >= 0 # Rows with a ConsumptionPoint.
+    keys = codes * acc['n_periods'] + periods
+
+    active_all = np.zeros(len(rows), dtype=bool)
+    actives = {} # Active rows of each column.
+    for column in acc['columns']:
+        values = df_chunk[column].to_numpy(dtype=float)[rows]
+        values = np.nan_to_num(values) # Empty readings do not add to the total.
+
+        acc['tot'][column] += np.bincount(bins, weights=values, minlength=acc['n_bins'])
+
+        active = (values > 0) & known # Rows of a train with a nonzero reading.
+        acc['keys'][column] = np.union1d(acc['keys'][column], keys[active])
+        active_all |= active
+        actives[column] = active
+
+        if acc['energy'] is not None:
+            # Adding the readings of the chunk to the sums of their (train, hour) ...
+            # ... keys, in one 'np.unique' and one 'np.bincount' over the old ...
+            # ... keys and the keys of the chunk:
+            old_keys, old_sums = acc['energy'][column]
+            nonzero = (values != 0) & known
+            hour_keys = codes[nonzero] * acc['n_hours'] + hours[nonzero]
+            new_keys, inverse = np.unique(np.concatenate([old_keys, hour_keys]),
+                                          return_inverse=True)
+            new_sums = np.bincount(inverse, weights=np.concatenate([old_sums, values[nonzero]]),
+                                   minlength=len(new_keys))
+            acc['energy'][column] = (new_keys, new_sums)
+
+    acc['keys']['All'] = np.union1d(acc['keys']['All'], keys[active_all])
+
+    if acc['sweep'] is not None:
+        # Adding the activity intervals of the chunk to the sweep of each column:
+        actives['All'] = active_all
+        for column, active in actives.items():
+            starts = t_month[active] // 10**9
+            FoldIntervals(acc['sweep'][column], codes[active], starts, starts + acc['reading_s'],
+                          len(train_codes))
+
+    if acc['quality'] is not None:
+        # Checking the raw readings of the rows (before the empty readings are ...
+        # ... set to zero), with the times and train codes of the same scan:
+        values = {column: df_chunk[column].to_numpy(dtype=float)[rows]
+                  for column in QUALITY_COLUMNS if column in df_chunk.columns}
+        FoldQuality(acc['quality'], codes, t_month // BIN_NS, values, len(train_codes))
+
+def AccumulatorResult(acc, return_members=False):
+    """
+    Return the totals of the month from the running totals in 'acc'.
+
+    The first dictionary gives the total value of each column at each
+    5-minute timestamp, and the second one the number of trains with a nonzero
+    value within each hour (the key 'All' counts the trains that are active in
+    any of the columns). With 'return_members=True', a third dictionary gives
+    the active trains of each hour (see 'HourlyMembers').
+    """
+    tot_5min = {column: RollUp(tot, 5 // acc['bin_min']) for column, tot in acc['tot'].items()}
+    num_trains, members = RollUpMembers(acc, 'h')
+    if return_members:
+        return tot_5min, num_trains, members
+    return tot_5min, num_trains
+
+def SortedTrains(acc):
+    """
+    Return the train dictionary of 'acc' in sorted order, and the position of
+    each train code in it.
+    """
+    train_ids = np.array(list(acc['train_codes']), dtype=object)
+    order = np.argsort(train_ids, kind='stable')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return train_ids[order], rank
+
+def RollUp(values, factor):
+    """Sum every 'factor' consecutive values (eg. twelve 5-minute totals into one hour)"""
+    return np.asarray(values).reshape(-1, factor).sum(axis=1)
+
+def RollUpMembers(acc, resolution):
+    """
+    Return the number of active trains within each period of 'resolution',
+    and the active trains of each period (see 'HourlyMembers'), from the
+    (train, period) pairs of the finest resolution kept in 'acc'.
+    """
+    n_periods = acc['n_periods']
+    factor = RESOLUTIONS[resolution] // acc['key_min'] # Finest periods within one period.
+    train_ids, rank = SortedTrains(acc)
+    num_trains = {}
+    members = {}
+    for column, keys in acc['keys'].items():
+        num_trains[column], members[column] = HourlyMembers(
+            rank[keys // n_periods], keys % n_periods // factor, n_periods // factor, train_ids)
+    return num_trains, members
+
+def ResolutionResult(acc, resolution):
+    """
+    Return the totals of the month at one of the resolutions that 'acc' was
+    created with (or a coarser one): the total value of each column within
+    each period, the number of trains with a nonzero value within each
+    period (with the key 'All' as in 'AccumulatorResult'), and the peak number
+    of concurrent trains within each period (None without 'reading_min').
+    """
+    if RESOLUTIONS[resolution] % acc['key_min'] != 0:
+        raise ValueError('The running totals are kept per ' + str(acc['key_min']) +
+                         ' min, so they cannot give the ' + resolution + ' resolution')
+    factor = RESOLUTIONS[resolution] // acc['bin_min'] # Energy bins within one period.
+    tot = {column: RollUp(values, factor) for column, values in acc['tot'].items()}
+    num_trains = RollUpMembers(acc, resolution)[0]
+    concurrent = None if acc['sweep'] is None else ConcurrencyResult(acc, resolution)
+    return tot, num_trains, concurrent
+
+def ConcurrencyResult(acc, resolution='5min'):
+    """
+    Return, from running totals created with 'reading_min', the peak number of
+    trains that are active at the same moment within each period of
+    'resolution', per column and with the key 'All' for the trains that are
+    active in any column.
+    """
+    period_s = RESOLUTIONS[resolution] * 60 # Seconds in one period.
+    n_periods = acc['n_hours'] * 3600 // period_s
+    return {column: SweepPeaks(sweep, n_periods, period_s) for column, sweep in acc['sweep'].items()}
+
+def TrainEnergyResult(acc):
+    """
+    Return the energy of every train within each hour of the month, from
+    running totals created with 'train_energy=True'.
+
+    The returned dictionary holds the sorted ConsumptionPoints ('train_ids')
+    and, per column, a sparse (hours x trains) matrix ('matrix'). As for the
+    hourly totals (see 'CreateHourlyDf'), the value of a train within an hour
+    is the sum of its readings divided by the twelve 5-minute timestamps of
+    the hour, so that the sum of a row of the matrix is the total of that hour.
+    """
+    n_hours = acc['n_hours']
+    train_ids, rank = SortedTrains(acc)
+    matrix = {}
+    for column, (keys, sums) in acc['energy'].items():
+        matrix[column] = sparse.csr_matrix(
+            (sums / BINS_HOUR, (keys % n_hours, rank[keys // n_hours])),
+            shape=(n_hours, len(train_ids)))
+    return {'train_ids': train_ids, 'matrix': matrix}
+
+def QualityResult(acc):
+    """
+    Return the data-quality report of the month from running totals created
+    with 'quality=True': a dataframe with the checks of each hour and one with
+    the checks of each train (see 'DataQuality.py').
+    """
+    train_ids, rank = SortedTrains(acc)
+    times = pd.to_datetime(acc['t_start'] + np.arange(acc['n_hours']) * HOUR_NS)
+    return QualityFrames(acc['quality'], times, train_ids, rank)
+
+def FoldChunks(acc, chunks):
+    """
+    Fold every chunk of 'chunks' into 'acc' while passing it on, so that the
+    chunks of a report can be used for something else in the same scan (eg.
+    checking the data quality of a report that is added to the store).
+    """
+    for df_chunk in chunks:
+        FoldChunk(acc, df_chunk)
+        yield df_chunk
+
+def BinTrainChunks(chunks, month, year=2022,
+                   columns=('Consumption (MWh)', 'Generation (MWh)'),
+                   return_members=False, return_energy=False, resolutions=None,
+                   reading_min=None, return_quality=False):
+    """
+    Bin the rows of a raw DSB report, given as an iterable of dataframes (for
+    instance the chunks of 'ReadReportChunks'), into the 5-minute timestamps
+    of a month. See 'AccumulatorResult' for the returned dictionaries. With
+    'return_energy=True', the energy of every train within each hour is
+    returned as well (see 'TrainEnergyResult'). When the duration of a
+    reading is given ('reading_min'), the peak number of concurrent trains
+    within each 5-minute timestamp is returned next (see 'ConcurrencyResult').
+    When a list of 'resolutions' is given (eg. ['15min', 'h']), the totals at
+    each of them are returned last, in a dictionary keyed by resolution (see
+    'ResolutionResult'). With 'return_quality=True', the data-quality report of
+    the rows of the month is appended after all of them (see 'QualityResult').
+    """
+    acc = NewAccumulator(month, year, columns, train_energy=return_energy,
+                         resolutions=resolutions or ('h',), reading_min=reading_min,
+                         quality=return_quality)
+    for df_chunk in chunks:
+        FoldChunk(acc, df_chunk)
+    out = AccumulatorResult(acc, return_members)
+    if return_energy:
+        out += (TrainEnergyResult(acc),)
+    if reading_min is not None:
+        out += (ConcurrencyResult(acc, '5min'),)
+    if resolutions is not None:
+        out += ({resolution: ResolutionResult(acc, resolution) for resolution in resolutions},)
+    if return_quality:
+        out += (QualityResult(acc),)
+    return out
+
+def BinTrainDataJoint(df_trains, month, year=2022,
+                      columns=('Consumption (MWh)', 'Generation (MWh)'),
+                      return_members=False):
+    """
+    Bin several energy columns of a raw DSB report in one scan of the report.
+
+    Returns two dictionaries keyed by column name: the total value at each
+    5-minute timestamp of the month, and the number of trains with a nonzero
+    value within each hour of the month. The 'num_trains' dictionary also has
+    the key 'All', counting the trains that are active in any of the columns.
+    With 'return_members=True', a third dictionary with the same keys gives
+    the active trains of each hour (see 'HourlyMembers').
+    """
+    return BinTrainChunks([df_trains], month, year, columns, return_members)
+
+def BinTrainData(df_trains, month, year=2022, column='Consumption (MWh)',
+                 return_members=False):
+    """
+    Bin the rows of a raw DSB report into the 5-minute timestamps of a month.
+
+    Returns an array with the total 'column' value at each 5-minute timestamp
+    of the month (same order as 'CreateTimeGrid'), and an array with
+    the number of trains (ConsumptionPoints) with a nonzero 'column' value
+    within each hour of the month. With 'return_members=True', the active
+    trains of each hour are returned as well (see 'HourlyMembers').
+    """
+    out = BinTrainDataJoint(df_trains, month, year, [column], return_members)
+    return tuple(res[column] for res in out)
+
+def HourlyMembers(codes, hours, n_hours, train_ids):
+    """
+    Count the distinct trains within each of the n_hours hours (or periods of
+    another resolution).
+
+    Every (hour, train code) pair of the active rows is turned into a single
+    integer key, so that the distinct pairs are found with one 'np.unique'
+    and counted per hour with one 'np.bincount'. Returns that count, and the
+    active trains of each hour in a compressed sparse row layout: the codes of
+    the trains of hour h are 'indices[indptr[h]:indptr[h+1]]', and
+    'train_ids[code]' gives the ConsumptionPoint of a code.
+    """
+    n_cps = max(len(train_ids), 1)
+    keys = np.unique(hours * n_cps + codes) # Sorted distinct (hour, train) pairs.
+    num_trains = np.bincount(keys // n_cps, minlength=n_hours)
+    indptr = np.zeros(n_hours + 1, dtype=np.int64)
+    np.cumsum(num_trains, out=indptr[1:])
+    members = {'indptr': indptr, 'indices': keys % n_cps,
+               'train_ids': np.asarray(train_ids)}
+    return num_trains, members
+
+def TrainsAtHour(members, h):
+    """Return the ConsumptionPoints that are active within hour h of the month"""
+    codes = members['indices'][members['indptr'][h]:members['indptr'][h + 1]]
+    return members['train_ids'][codes].tolist()
+
+def CreateTimeGrid(month, year=2022, resolution='5min'):
+    """
+    Return the timestamps of a month at the given resolution (eg. '1min',
+    '5min', '15min', 'h'), for any year. The number of days of the month,
+    including the 29th of February of leap years, is taken from the calendar.
+    """
+    t_start = pd.Timestamp(dt.datetime(year, month, 1)) # Start of the month.
+    t_end = t_start + pd.DateOffset(months=1) # Start of the next month.
+    return pd.date_range(t_start, t_end, freq=resolution, inclusive='left', name='Time')
+
+def CreateHourlyDf(label, tot_5min, num_trains, month, year=2022, concurrent=None):
+    """
+    Create the hourly dataframe that is written to 'Data - MonthN.xlsx'.
+
+    'tot_5min' holds the total energy at each 5-minute timestamp of the month
+    (as returned by the binning functions), and 'num_trains' the number of
+    active trains at each hour. The value of each hour (stored under the
+    column 'label') is the mean of its twelve 5-minute totals. When the peak
+    number of concurrent trains within each 5-minute timestamp is given
+    ('concurrent', see 'ConcurrencyResult'), the peak of each hour is added.
+    """
+    df_new_hourly = pd.DataFrame({'Time': CreateTimeGrid(month, year, 'h')})
+    # Get the total energy at each hour. As the 5-minute totals are in time ...
+    # ... order, each row of the reshaped array holds the twelve totals of one hour.
+    df_new_hourly[label] = np.asarray(tot_5min).reshape(-1, BINS_HOUR).mean(axis=1)
+    df_new_hourly['Number of trains available'] = num_trains # Insert the ...
+    # ... active number of trains available at each hourly timestamp.
+    if concurrent is not None:
+        df_new_hourly['Peak concurrent trains'] = np.asarray(concurrent).reshape(
+            -1, BINS_HOUR).max(axis=1) # Most trains active at the same moment.
+    df_new_hourly["day"] = df_new_hourly["Time"].dt.day # Extracting the day ....
+    # ... of the month.
+    df_new_hourly["hour"] = df_new_hourly['Time'].dt.hour # Extracting the hour ...
+    # ... of the day.
+    df_new_hourly["day of week"] = df_new_hourly["Time"].dt.dayofweek # Extracting the day ...
+    # ... of the week with Monday=0, Sunday=6.
+    return df_new_hourly
+
+def CreatePeriodDf(label, tot, num_trains, month, year=2022, resolution='15min',
+                   concurrent=None):
+    """
+    Create the dataframe of a month at one of the 'RESOLUTIONS', from the
+    totals of 'ResolutionResult' at that resolution.
+
+    So that the values of the different resolutions can be compared with each
+    other and with 'CreateHourlyDf', the value of each period (stored under
+    the column 'label') is the mean of the 5-minute totals within the period.
+    At the 1-minute resolution, it is the 1-minute total scaled to 5 minutes.
+    The peak number of concurrent trains within each period ('concurrent', see
+    'ResolutionResult') is added when it is given.
+    """
+    df_new = pd.DataFrame({'Time': CreateTimeGrid(month, year, resolution)})
+    df_new[label] = np.asarray(tot) / (RESOLUTIONS[resolution] / 5)
+    df_new['Number of trains available'] = num_trains
+    if concurrent is not None:
+        df_new['Peak concurrent trains'] = concurrent
+    df_new["day"] = df_new["Time"].dt.day
+    df_new["hour"] = df_new['Time'].dt.hour
+    if RESOLUTIONS[resolution] < 60:
+        df_new["minute"] = df_new['Time'].dt.minute # Start of the period within the hour.
+    df_new["day of week"] = df_new["Time"].dt.dayofweek
+    return df_new
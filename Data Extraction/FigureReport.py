@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the reporting stage of the scripts, which draws their
+# figures separately from the computation. A script does not draw its figures
+# while it computes, but collects one figure specification ('FigureSpec') per
+# figure: the name of the figure, a plotting function (eg. 'BoxFigure', or
+# 'BoxStatsFigure' for box plots drawn from pre-computed box statistics) and
+# the data that the function draws. The figures are then either:
+    #1. Shown as interactive figures, as before ('ShowFigures'), or
+    #2. Rendered headless into image files ('RenderFigures'): every figure is
+    #... drawn with the Agg backend in a pool of processes and saved as
+    #... '<name>.png' in the report folder.
+# When rendering, the hash of each figure (its plotting function, the source
+# of that function and its data) is compared with the hash of the same figure
+# in the manifest of the report folder ('manifest.json'), and the figures whose
+# hash has not changed since the last run are skipped. The pool is run by this
+# file in a separate Python process, so that its processes never run the
+# script that collected the figures again (which they would do on Windows).
+# The plotting functions must therefore be defined in a module (not in the
+# script itself).
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+import os
+import sys
+import json
+import pickle
+import hashlib
+import inspect
+import subprocess
+import tempfile
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+MANIFEST_NAME = 'manifest.json' # Hashes of the figures of a report folder.
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# ----------------------------- Plotting functions ------------------------ #
+
+def BoxFigure(df, x, y, xlabel, ylabel, title, label_size=None, title_size=None, rotation=None):
+    """Draw the box plots of column y of 'df' grouped by column x"""
+    sns.boxplot(x=x, y=y, data=df, palette="Set1")
+    plt.xlabel(xlabel, fontsize=label_size)
+    if rotation is not None:
+        plt.xticks(rotation=rotation)
+    plt.ylabel(ylabel, fontsize=label_size)
+    plt.title(title, fontsize=title_size)
+
+def BoxStatsFigure(stats, xlabel, ylabel, title, label_size=None, title_size=None,
+                   rotation=None):
+    """
+    Draw the box plots of pre-computed box statistics (see 'BoxStats.py'), in
+    the colours of 'BoxFigure'.
+    """
+    line = {'color': '0.25'} # Lines in the grey of the seaborn box plots.
+    boxes = plt.gca().bxp(stats, widths=0.8, patch_artist=True, boxprops={'edgecolor': '0.25'},
+                          whiskerprops=line, capprops=line, medianprops=line,
+                          flierprops={'marker': 'd', 'markersize': 4,
+                                      'markerfacecolor': '0.25', 'markeredgecolor': '0.25'})
+    for box, colour in zip(boxes['boxes'], sns.color_palette("Set1", len(stats), desat=0.75)):
+        box.set_facecolor(colour)
+    plt.xlabel(xlabel, fontsize=label_size)
+    if rotation is not None:
+        plt.xticks(rotation=rotation)
+    plt.ylabel(ylabel, fontsize=label_size)
+    plt.title(title, fontsize=title_size)
+
+def DayLinesFigure(values, ylabel, title, low=None, high=None, ylim=None):
+    """
+    Draw one line per day of the week over the 24 hours of 'values' (of shape
+    (7, 24)), with the bands between 'low' and 'high' in the same colours.
+    """
+    lines = [plt.plot(values[d])[0] for d in range(7)]
+    if low is not None:
+        for d, line in enumerate(lines):
+            plt.fill_between(range(24), low[d], high[d], color=line.get_color(), alpha=0.15)
+    plt.legend(DAYS, loc = "upper right")
+    if ylim is not None:
+        plt.ylim(*ylim)
+    plt.xlabel("Hour of day")
+    plt.ylabel(ylabel)
+    plt.title(title)
+
+def ScenarioDayLinesFigure(values, ylabel, title):
+    """
+    Draw one subplot per scenario (cluster) of 'values' (of shape (scenarios,
+    7, 24)), each with one line per day of the week over the 24 hours.
+    """
+    fig = plt.gcf()
+    for ax, scenario in zip(np.atleast_1d(fig.subplots(nrows=len(values), ncols=1)), values):
+        for d in range(7):
+            ax.plot(scenario[d])
+        ax.legend(DAYS, loc = "upper right")
+    fig.suptitle(title, fontsize=18)
+    fig.supxlabel("Hour of day", fontsize=14)
+    fig.supylabel(ylabel, fontsize=14)
+
+def ClusterFigure(profiles, centroids, colors, title):
+    """
+    Draw one subplot per cluster: the 24-hour profiles of the cluster (one
+    column of 'profiles[i]' per profile) in the colour of the cluster, and its
+    centroid in black.
+    """
+    fig = plt.gcf()
+    fig.suptitle(title, fontsize = 10)
+    axs = np.atleast_1d(fig.subplots(nrows=len(profiles), ncols=1))
+    for i, ax in enumerate(axs):
+        ax.plot(profiles[i], c = colors[i], linewidth = 1)
+        ax.set_xlabel("Hour of day")
+        ax.set_ylabel("Consumption (MW)")
+        ax.set_title("Cluster " + str(i+1))
+        ax.plot(centroids[i], c = "black", linewidth = 4)
+    fig.tight_layout()
+
+def SeriesFigure(df, xlabel, ylabel, title, legend=None, marker=None):
+    """Draw one line per column of 'df' against its index"""
+    for column in df.columns:
+        plt.plot(df.index, df[column], marker=marker)
+    if legend is not None:
+        plt.legend(legend, loc = "upper right")
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+
+def HistogramFigure(counts, x_edges, y_edges, xlabel, ylabel, title):
+    """Draw a 2D histogram from its counts (x along the rows) and bin edges"""
+    mesh = plt.pcolormesh(x_edges, y_edges, counts.T, cmap='viridis')
+    plt.colorbar(mesh, label="Number of hours")
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+
+# ------------------------------ Reporting stage -------------------------- #
+
+def FigureSpec(name, plot, figsize=(8, 4), dpi=80, **data):
+    """
+    Return the specification of a figure: it is drawn by calling 'plot' with
+    the keyword arguments 'data' in a figure of the given size, and saved as
+    '<name>.png'.
+    """
+    return {'name': name, 'plot': plot, 'figsize': figsize, 'dpi': dpi, 'data': data}
+
+def DrawFigure(spec):
+    """Draw a figure from its specification, and return it"""
+    fig = plt.figure(figsize=spec['figsize'], dpi=spec['dpi'])
+    spec['plot'](**spec['data'])
+    return fig
+
+def ShowFigures(specs):
+    """Draw the figures as interactive figures"""
+    for spec in specs:
+        DrawFigure(spec)
+
+def UpdateHash(h, value):
+    """Add a value (dataframe, series, array, dictionary, list or plain value) to a hash"""
+    if isinstance(value, pd.DataFrame):
+        h.update(repr((value.shape, list(value.index.names), list(value.columns),
+                       [str(dtype) for dtype in value.dtypes])).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(repr((value.shape, list(value.index.names), value.name, str(value.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.shape, str(value.dtype))).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(repr(('dict', sorted(value))).encode())
+        for key in sorted(value):
+            UpdateHash(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(repr((type(value).__name__, len(value))).encode())
+        for item in value:
+            UpdateHash(h, item)
+    else:
+        h.update(repr(value).encode())
+
+def SpecHash(spec):
+    """Return the hash of a figure: its plotting function, the source of that function and its data"""
+    h = hashlib.sha256()
+    plot = spec['plot']
+    h.update((plot.__module__ + '.' + plot.__qualname__).encode())
+    h.update(inspect.getsource(plot).encode())
+    UpdateHash(h, (spec['figsize'], spec['dpi']))
+    for key in sorted(spec['data']):
+        h.update(key.encode())
+        UpdateHash(h, spec['data'][key])
+    return h.hexdigest()
+
+def RenderFigure(job):
+    """Render one figure of a job with the Agg backend and save it"""
+    spec, path = job
+    fig = DrawFigure(spec)
+    fig.savefig(path)
+    plt.close(fig)
+    return spec['name']
+
+def RenderFigures(specs, report_dir, processes=None):
+    """
+    Render the figures into '<name>.png' files in 'report_dir', in a pool of
+    'processes' processes (by default one per CPU), skipping the figures whose
+    hash is the same as in the manifest of the folder and whose file exists.
+    Return the names of the rendered figures.
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    manifest_path = os.path.join(report_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    jobs, hashes = [], {}
+    for spec in specs:
+        path = os.path.join(report_dir, spec['name'] + '.png')
+        hashes[spec['name']] = SpecHash(spec)
+        if manifest.get(spec['name']) != hashes[spec['name']] or not os.path.exists(path):
+            jobs.append((spec, path))
+    if not jobs:
+        return []
+
+    # Running the pool in a separate process on the pickled jobs, with the ...
+    # ... same module folders as this process:
+    with tempfile.NamedTemporaryFile(suffix='.pkl', dir=report_dir, delete=False) as f:
+        pickle.dump(jobs, f)
+        job_path = f.name
+    env = dict(os.environ, MPLBACKEND='Agg',
+               PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    try:
+        subprocess.run([sys.executable, os.path.abspath(__file__), job_path,
+                        str(processes or os.cpu_count() or 1)], env=env, check=True)
+    finally:
+        os.remove(job_path)
+
+    for spec, path in jobs:
+        manifest[spec['name']] = hashes[spec['name']]
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return [spec['name'] for spec, path in jobs]
+
+if __name__ == '__main__':
+    # Rendering the jobs of 'RenderFigures' (the pickled jobs and the number ...
+    # ... of processes are given as arguments):
+    from multiprocessing import Pool
+    with open(sys.argv[1], 'rb') as f:
+        jobs = pickle.load(f)
+    with Pool(min(int(sys.argv[2]), len(jobs))) as pool:
+        pool.map(RenderFigure, jobs)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the compact schema of the dataframes of the project, which
+# is applied when a workbook is loaded (see 'ReadExcelCached' in 'DataCache.py'):
+    #1. Raw DSB reports ('CompactReport'): the train IDs (ConsumptionPoint) are
+    #... stored as a categorical column and the times as datetime64 values
+    #... (int64 nanoseconds since 1970, in UTC), which are parsed from the
+    #... day/month/year text of the report only once. The energy columns are
+    #... kept as float64, since every reading is summed into the totals of the
+    #... hourly dataframes (see 'ExtrEngine.py'); they are only cast to float32
+    #... once those totals are stored, by 'CompactHourly'.
+    #2. Hourly dataframes ('Data - MonthN.xlsx' type of files, 'CompactHourly'):
+    #... the energy columns are stored as float32, the numbers of trains as int16,
+    #... and the 'day', 'hour' and 'day of week' columns as int8. The index
+    #... column that is added by 'to_excel' ('Unnamed: 0') is dropped.
+# Since the cached copies of the workbooks are stored with this schema, the
+# conversion is only done the first time a workbook is read.
+# 'MemoryFootprint' compares the memory used by a dataframe before and after
+# the conversion. Running this file prints that comparison for a raw report
+# and for an hourly dataframe.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+import os
+
+CALENDAR_COLUMNS = ['day', 'hour', 'day of week'] # Calendar columns of the hourly dataframes.
+TRAIN_COLUMNS = ['Number of trains available', 'Peak concurrent trains'] # Numbers of trains.
+
+def EnergyColumns(df):
+    """Return the energy columns of a dataframe (the columns in MWh)"""
+    return [column for column in df.columns if '(MWh)' in str(column)]
+
+def CompactReport(df_trains):
+    """Return a copy of a raw DSB report converted to the compact schema"""
+    df_trains = df_trains.copy()
+    if not pd.api.types.is_datetime64_any_dtype(df_trains['Time']):
+        df_trains['Time'] = pd.to_datetime(df_trains['Time'], dayfirst=True) # This ...
+        # ... is to arrange the date in the dataframe in day/month/year format.
+    if df_trains['Time'].dt.tz is None:
+        df_trains['Time'] = df_trains['Time'].dt.tz_localize('UTC')
+    df_trains['ConsumptionPoint'] = df_trains['ConsumptionPoint'].astype('category')
+    for column in EnergyColumns(df_trains):
+        df_trains[column] = df_trains[column].astype(np.float64)
+    return df_trains
+
+def CompactHourly(df_hourly):
+    """Convert an hourly dataframe ('Data - MonthN.xlsx' type) to the compact schema"""
+    df_hourly = df_hourly.drop(columns=['Unnamed: 0'], errors='ignore')
+    if not pd.api.types.is_datetime64_any_dtype(df_hourly['Time']):
+        df_hourly['Time'] = pd.to_datetime(df_hourly['Time'], dayfirst=True)
+    for column in EnergyColumns(df_hourly):
+        df_hourly[column] = df_hourly[column].astype(np.float32)
+    for column in TRAIN_COLUMNS:
+        if column in df_hourly.columns:
+            df_hourly[column] = df_hourly[column].astype(np.int16)
+    for column in CALENDAR_COLUMNS:
+        if column in df_hourly.columns:
+            df_hourly[column] = df_hourly[column].astype(np.int8)
+    return df_hourly
+
+def MemoryFootprint(df, schema):
+    """
+    Return the memory used by each column of a dataframe (in bytes), before
+    and after converting it with 'schema' (eg. 'CompactReport'), together
+    with the total of all columns.
+    """
+    df_compact = schema(df)
+    df_fp = pd.DataFrame({'Original dtype': df.dtypes.astype(str),
+                          'Original (bytes)': df.memory_usage(index=False, deep=True)})
+    df_fp = df_fp.join(pd.DataFrame({'Compact dtype': df_compact.dtypes.astype(str),
+                                     'Compact (bytes)': df_compact.memory_usage(index=False,
+                                                                                deep=True)}),
+                       how='outer')
+    df_fp = df_fp.fillna({'Compact dtype': 'dropped', 'Compact (bytes)': 0})
+    df_fp.loc['Total'] = ['', df_fp['Original (bytes)'].sum(),
+                          '', df_fp['Compact (bytes)'].sum()]
+    df_fp['Ratio'] = df_fp['Compact (bytes)'] / df_fp['Original (bytes)']
+    return df_fp
+
+if __name__ == '__main__':
+
+    # -------------------- Inputs -------------------------------------- #
+    # Input the path of a raw DSB report:
+    report_path = os.path.join(os.getcwd(),'2022-11 - 2022-12_energy-raw-data-report_DSB.xlsx')
+    # Input the path of an hourly dataframe:
+    hourly_path = os.path.join(os.getcwd(),'Data - Month11.xlsx')
+
+    # --------------------- Outputs ----------------------------------- #
+    print(MemoryFootprint(pd.read_excel(report_path), CompactReport).to_string())
+    print(MemoryFootprint(pd.read_excel(hourly_path), CompactHourly).to_string())
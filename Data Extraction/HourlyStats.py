@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the hourly statistics that are created by the extraction
+# scripts ('Stats - MonthN.xlsx', 'RegenStats - MonthN.xlsx' and
+# 'NetStats - MonthN.xlsx'). For every hour of a month, the twelve 5-minute
+# totals of that hour are summarised by their maximum, minimum, sum, count and
+# sum of squares. These summaries can be merged: the summary of a group of
+# hours (eg. all the 08:00 hours of a year, or all the Monday 08:00 hours) is
+# obtained from the summaries of its hours alone ('MergeStats'), without going
+# back to the 5-minute data. The maximum hourly value at each hour of the day
+# (P_max), which is used for the FCRD capacity reserves, is obtained in the
+# same way ('StatsPmax'), so that the later stages do not need to keep a copy
+# of those values or to compute them again from the hourly data of the year.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+import os
+from ExtrEngine import CreateTimeGrid, BINS_HOUR
+from DataCache import ReadExcelCached
+from FrameSchema import CompactHourly
+
+# Columns of the summaries, with the function that merges each of them:
+STAT_COLUMNS = {'Max (MWh)': 'max', 'Min (MWh)': 'min', 'Sum (MWh)': 'sum', 'Count': 'sum',
+                'Sum of squares (MWh2)': 'sum'}
+
+def HourlyStats(tot_5min):
+    """Return the summaries of each hour of a series of 5-minute totals"""
+    values = np.asarray(tot_5min, dtype=float).reshape(-1, BINS_HOUR) # One hour per row.
+    return {'Max (MWh)': values.max(axis=1),
+            'Min (MWh)': values.min(axis=1),
+            'Sum (MWh)': values.sum(axis=1),
+            'Count': np.full(len(values), BINS_HOUR),
+            'Sum of squares (MWh2)': (values**2).sum(axis=1)}
+
+def CreateStatsDf(tot_5min, month, year=2022):
+    """
+    Create the dataframe of the hourly summaries of a month, with the same
+    'Time', 'day', 'hour' and 'day of week' columns as 'CreateHourlyDf'.
+    """
+    df_stats = pd.DataFrame({'Time': CreateTimeGrid(month, year, 'h')})
+    for column, values in HourlyStats(tot_5min).items():
+        df_stats[column] = values
+    df_stats["day"] = df_stats["Time"].dt.day
+    df_stats["hour"] = df_stats['Time'].dt.hour
+    df_stats["day of week"] = df_stats["Time"].dt.dayofweek
+    return df_stats
+
+def ReadStats(name, months, data_dir=None):
+    """
+    Read and concatenate the summaries of several months, eg.
+    ReadStats('Stats - Month', ['1', '2']) for 'Stats - Month1.xlsx' and
+    'Stats - Month2.xlsx' in 'data_dir' (by default the current folder).
+    """
+    data_dir = os.getcwd() if data_dir is None else data_dir
+    list_df = [ReadExcelCached(os.path.join(data_dir, name + str(month) + '.xlsx'),
+                               CompactHourly) for month in months]
+    return pd.concat(list_df, ignore_index=True)
+
+def MergeStats(df_stats, by='hour'):
+    """
+    Merge the summaries of the hours of each group ('by' is a column or a list
+    of columns of 'df_stats', eg. ['day of week', 'hour']). The mean and the
+    standard deviation of the 5-minute totals of each group are added.
+    """
+    df_merged = df_stats.groupby(by)[list(STAT_COLUMNS)].agg(STAT_COLUMNS)
+    mean = df_merged['Sum (MWh)'] / df_merged['Count']
+    df_merged['Mean (MWh)'] = mean
+    df_merged['Std (MWh)'] = np.sqrt(np.maximum(
+        df_merged['Sum of squares (MWh2)'] / df_merged['Count'] - mean**2, 0))
+    return df_merged
+
+def StatsPmax(df_stats, by='hour'):
+    """
+    Return the maximum hourly value within each group ('by' as in
+    'MergeStats'). The hourly value is the mean of the twelve 5-minute totals
+    of the hour, as in 'Data - MonthN.xlsx', so with by='hour' this is the
+    P_max of each hour of the day.
+    """
+    hourly = df_stats['Sum (MWh)'].astype(float) / df_stats['Count']
+    return hourly.groupby([df_stats[column] for column in np.atleast_1d(by)], observed=True).max()
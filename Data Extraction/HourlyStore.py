@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the persistent store that is used by the extraction
+# scripts in their incremental mode. Instead of extracting a whole month again
+# every time a new raw DSB report arrives, only the rows of the new report are
+# added to the store:
+    #1. The readings of the trains are kept per day ('readings/YYYY-MM-DD'),
+    #... with one reading per (Time, ConsumptionPoint).
+    #2. The total energy at each 5-minute timestamp is kept per month
+    #... ('totals/YYYY-MM'), together with the active (hour, train) pairs
+    #... of each energy column ('active/YYYY-MM').
+    #3. The time of the newest reading in the store (the high-water mark) is
+    #... kept in 'state.json'.
+# Rows of a new report that are newer than the high-water mark are new data.
+# Rows that are not newer are late corrections: they replace the stored
+# reading of the same train at the same time. Only the days that receive new
+# or changed readings are recomputed, so the cost of adding a report depends
+# on the size of that report and not on the size of the store.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import os
+import json
+import numpy as np
+from ExtrEngine import TimeToNs, CreateTimeGrid, HourlyMembers, BIN_NS, BINS_HOUR
+from DataCache import SaveFrame, LoadFrame
+
+STORE_COLUMNS = ['Consumption (MWh)', 'Generation (MWh)'] # Energy columns kept in the store.
+KEY = ['Time', 'ConsumptionPoint'] # A reading is identified by its time and train.
+DAY_NS = 24 * 12 * BIN_NS # Nanoseconds in one day.
+
+def ReadState(store_dir):
+    """Return the state of the store (its high-water mark, in nanoseconds)"""
+    path = os.path.join(store_dir, 'state.json')
+    if not os.path.exists(path):
+        return {'high_water': None}
+    with open(path) as f:
+        return json.load(f)
+
+def WriteState(store_dir, state):
+    """Write the state of the store"""
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_path = os.path.join(store_dir, 'state.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, os.path.join(store_dir, 'state.json'))
+
+def AppendReport(store_dir, chunks):
+    """
+    Add the rows of a raw DSB report, given as an iterable of dataframes (see
+    'ReadReport' and 'ReadReportChunks'), to the store. Within one report,
+    the last row of a (Time, ConsumptionPoint) pair is the one that is kept.
+
+    Returns the sorted list of the (year, month) pairs whose data changed.
+    """
+    state = ReadState(store_dir)
+    changed_months = set()
+    for df_chunk in chunks:
+        df_new = pd.DataFrame({'Time': TimeToNs(df_chunk['Time']),
+                               'ConsumptionPoint': df_chunk['ConsumptionPoint'].to_numpy()})
+        for column in STORE_COLUMNS:
+            df_new[column] = np.nan_to_num(df_chunk[column].to_numpy(dtype=float))
+        df_new = df_new.drop_duplicates(KEY, keep='last')
+        if df_new.empty:
+            continue
+
+        high_water = state['high_water']
+        days = df_new['Time'].to_numpy() // DAY_NS # Day of each row (days since 1970).
+        for day, df_day in df_new.groupby(days):
+            if UpsertDay(store_dir, int(day), df_day, high_water):
+                t_day = pd.Timestamp(int(day) * DAY_NS)
+                changed_months.add((t_day.year, t_day.month))
+
+        t_max = int(df_new['Time'].max())
+        state['high_water'] = t_max if high_water is None else max(high_water, t_max)
+
+    WriteState(store_dir, state)
+    return sorted(changed_months)
+
+def UpsertDay(store_dir, day, df_day, high_water):
+    """
+    Merge the new rows of one day into the stored readings of that day, and
+    recompute the totals of that day. Returns False when the new rows do not
+    change anything in the store.
+    """
+    t_day = pd.Timestamp(day * DAY_NS)
+    stem = os.path.join(store_dir, 'readings', t_day.strftime('%Y-%m-%d'))
+    df_old = LoadFrame(stem)
+
+    if df_old is not None:
+        # Rows that are not newer than the high-water mark are only kept when
+        # they are a new reading or correct a stored reading:
+        if high_water is not None:
+            df_late = df_day.loc[df_day['Time'] <= high_water]
+            merged = df_late.merge(df_old, on=KEY, how='left', suffixes=('', '_old'),
+                                   indicator=True)
+            same = merged['_merge'] == 'both'
+            for column in STORE_COLUMNS:
+                same &= merged[column].to_numpy() == merged[column + '_old'].to_numpy()
+            df_day = pd.concat([df_late.loc[~same.to_numpy()],
+                                df_day.loc[df_day['Time'] > high_water]])
+            if df_day.empty:
+                return False
+        df_day = pd.concat([df_old, df_day]).drop_duplicates(KEY, keep='last')
+
+    df_day = df_day.sort_values(KEY, ignore_index=True)
+    SaveFrame(df_day, stem)
+    UpdateMonth(store_dir, t_day, df_day)
+    return True
+
+def UpdateMonth(store_dir, t_day, df_day):
+    """Replace the totals and active trains of one day in the files of its month"""
+    month_name = t_day.strftime('%Y-%m')
+    t0 = t_day.value # Start of the day.
+    bins = (df_day['Time'].to_numpy() - t0) // BIN_NS # 5-minute timestamp of each row.
+    hours = bins // BINS_HOUR # Hour of the day of each row.
+
+    # Total energy at each 5-minute timestamp of the month:
+    stem = os.path.join(store_dir, 'totals', month_name)
+    df_tot = LoadFrame(stem)
+    if df_tot is None:
+        df_tot = pd.DataFrame({'Time': CreateTimeGrid(t_day.month, t_day.year).asi8})
+        for column in STORE_COLUMNS:
+            df_tot[column] = 0.0
+    first = np.searchsorted(df_tot['Time'].to_numpy(), t0) # First row of the day.
+    for column in STORE_COLUMNS:
+        day_tot = np.bincount(bins, weights=df_day[column].to_numpy(), minlength=24 * BINS_HOUR)
+        df_tot.loc[first:first + 24 * BINS_HOUR - 1, column] = day_tot
+    SaveFrame(df_tot, stem)
+
+    # Active (hour, train) pairs of the month, with the day replaced (the ...
+    # ... readings without a ConsumptionPoint are not counted as a train):
+    list_active = []
+    known = df_day['ConsumptionPoint'].notna().to_numpy()
+    for column in STORE_COLUMNS:
+        active = (df_day[column].to_numpy() > 0) & known
+        df_pairs = pd.DataFrame({'Time': t0 + hours[active] * BINS_HOUR * BIN_NS,
+                                 'ConsumptionPoint': df_day['ConsumptionPoint'].to_numpy()[active]})
+        df_pairs = df_pairs.drop_duplicates()
+        df_pairs['Quantity'] = column
+        list_active.append(df_pairs)
+    stem = os.path.join(store_dir, 'active', month_name)
+    df_active = LoadFrame(stem)
+    if df_active is not None:
+        in_day = (df_active['Time'] >= t0) & (df_active['Time'] < t0 + DAY_NS)
+        list_active.insert(0, df_active.loc[~in_day])
+    SaveFrame(pd.concat(list_active, ignore_index=True), stem)
+
+def ReadStoreMonth(store_dir, month, year=2022, return_members=False):
+    """
+    Return the totals of a month from the store, in the same form as
+    'AccumulatorResult' in 'ExtrEngine.py': the total of each energy column at
+    each 5-minute timestamp, and the number of active trains within each hour
+    (with the key 'All' for the trains that are active in any column).
+    """
+    grid = CreateTimeGrid(month, year)
+    n_hours = len(grid) // BINS_HOUR
+    month_name = grid[0].strftime('%Y-%m')
+
+    df_tot = LoadFrame(os.path.join(store_dir, 'totals', month_name))
+    tot_5min = {column: np.zeros(len(grid)) if df_tot is None else df_tot[column].to_numpy()
+                for column in STORE_COLUMNS}
+
+    df_active = LoadFrame(os.path.join(store_dir, 'active', month_name))
+    if df_active is None:
+        df_active = pd.DataFrame({'Time': np.empty(0, dtype=np.int64),
+                                  'ConsumptionPoint': [], 'Quantity': []})
+    codes, train_ids = pd.factorize(df_active['ConsumptionPoint'], sort=True)
+    hours = (df_active['Time'].to_numpy() - grid[0].value) // (BINS_HOUR * BIN_NS)
+
+    num_trains = {}
+    members = {}
+    for column in STORE_COLUMNS:
+        rows = (df_active['Quantity'] == column).to_numpy()
+        num_trains[column], members[column] = HourlyMembers(codes[rows], hours[rows],
+                                                            n_hours, train_ids)
+    num_trains['All'], members['All'] = HourlyMembers(codes, hours, n_hours, train_ids)
+
+    if return_members:
+        return tot_5min, num_trains, members
+    return tot_5min, num_trains
+
+def ReadStoreChunks(store_dir, month, year=2022):
+    """
+    Return the stored readings of a month, day by day, as an iterable of
+    dataframes that can be binned like the chunks of a raw DSB report (see
+    'BinTrainChunks' in 'ExtrEngine.py'). This is used for the outputs that
+    are not kept in the totals of the store, such as the per-train energy
+    matrix or the other resolutions than the hour.
+    """
+    for t_day in CreateTimeGrid(month, year, 'D'):
+        df_day = LoadFrame(os.path.join(store_dir, 'readings', t_day.strftime('%Y-%m-%d')))
+        if df_day is not None:
+            yield df_day
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This code reads a raw DSB report once and calculates, in a single scan of
+# that report, the total consumption, the total regeneration and the total
+# net energy (consumption - regeneration) of all active trains within each
+# hourly timestamp for an entire month. It replaces running 'DataExtr.py' and
+# 'RegenDataExtr.py' one after the other on the same report, and creates the
+# same 'Data - MonthN.xlsx' and 'RegenData - MonthN.xlsx' files, together with
+# a 'NetData - MonthN.xlsx' file and the hourly summaries of the three (see
+# 'HourlyStats.py'). Optionally, the energy of every train within
+# each hour is written to a 'TrainData - MonthN.npz' file (see 'TrainMatrix.py'),
+# and the same three files are written at finer resolutions than the hour
+# (eg. 'Data - MonthN - 15min.xlsx'). The data-quality report of the rows of
+# the month is written to 'Quality - MonthN.xlsx' (see 'DataQuality.py').
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import os
+from ExtrEngine import (BinTrainChunks, CreateHourlyDf, CreatePeriodDf, NewAccumulator,
+                        FoldChunks, QualityResult)
+from ReportReader import ReadReport, ReadReportChunks
+from HourlyStore import AppendReport, ReadStoreMonth, ReadStoreChunks
+from TrainMatrix import SaveTrainMatrix
+from HourlyStats import CreateStatsDf
+from DataQuality import WriteQuality
+
+# -------------------- Inputs -------------------------------------- #
+# Input the number of the month you want to extract the data of:
+month = 11
+# Input the year of the data:
+year = 2022
+# Input the data path by changing the file name of the month you want to
+# extract the data from:
+data_path = os.path.join(os.getcwd(),'2022-11 - 2022-12_energy-raw-data-report_DSB.xlsx')
+# Set 'streaming' to True to read the report in chunks of 'chunk_rows' rows
+# instead of loading the whole report at once (for reports that do not fit
+# in memory):
+streaming = False
+chunk_rows = 100000
+# Set 'incremental' to True to add the report to the persistent store in
+# 'store_dir' (see 'HourlyStore.py'), where only its new rows and the rows that
+# correct already stored readings are processed, and to extract the month from
+# that store:
+incremental = False
+store_dir = os.path.join(os.getcwd(), 'Store')
+# Set 'train_matrix' to True to also write the consumption and regeneration of
+# every train within each hour to a 'TrainData - MonthN.npz' file:
+train_matrix = False
+# Input the resolutions of the excel files ('1min', '5min', '15min', 'h'). The
+# hourly files are always created, and each of the other resolutions gives
+# three more files, from the same scan of the report:
+resolutions = ['h']
+# Input the duration of a reading of a train in minutes (eg. 5) to add the peak
+# number of trains that are active at the same moment within each period
+# ('Peak concurrent trains', see 'SweepLine.py'), or None to leave it out:
+reading_min = None
+
+# --------------------- Outputs ----------------------------------- #
+if streaming:
+    chunks = ReadReportChunks(data_path, chunk_rows) # The report, chunk by chunk.
+else:
+    chunks = [ReadReport(data_path)] # The whole report as a single chunk.
+
+# Calling the 'BinTrainChunks' function (see 'ExtrEngine.py'), or in the ...
+# ... incremental mode the 'ReadStoreMonth' function (see 'HourlyStore.py'), ...
+# ... to obtain, in a single pass over the rows of the inputted month:
+    #1. the total consumption and regeneration at each 5-minute timestamp (tot_5min),
+    #2. the number of trains that are consuming, regenerating, or doing either ...
+    #... at each hour (num_trains),
+    #3. with 'train_matrix', the consumption and regeneration of every train ...
+    #... within each hour (train_energy),
+    #4. with 'reading_min', the peak number of trains that are consuming, ...
+    #... regenerating, or doing either at the same moment within each ...
+    #... 5-minute timestamp (concurrent),
+    #5. the totals and the number of trains at each of the 'resolutions' (by_resolution),
+    #6. the data-quality report of the rows of the month (quality, see 'DataQuality.py').
+# In the incremental mode, the outputs 3, 4 and 5 are obtained from the stored ...
+# ... readings of the month, as they are not kept in the totals of the store, ...
+# ... and the output 6 from the rows of the report while they are added to the store.
+extra_outputs = train_matrix or resolutions != ['h'] or reading_min is not None
+concurrent = {'Consumption (MWh)': None, 'Generation (MWh)': None, 'All': None}
+if incremental:
+    acc_quality = NewAccumulator(month, year, [], quality=True) # Only the quality checks.
+    # Adding the new and corrected rows to the store:
+    AppendReport(store_dir, FoldChunks(acc_quality, chunks))
+    quality = QualityResult(acc_quality)
+    tot_5min, num_trains = ReadStoreMonth(store_dir, month, year)
+    chunks = ReadStoreChunks(store_dir, month, year) # Stored readings, day by day.
+if not incremental or extra_outputs:
+    out = BinTrainChunks(chunks, month, year, ['Consumption (MWh)', 'Generation (MWh)'],
+                         return_energy=train_matrix, resolutions=resolutions,
+                         reading_min=reading_min, return_quality=not incremental)
+    if not incremental:
+        quality, out = out[-1], out[:-1] # The quality report is returned last.
+    tot_5min, num_trains = out[:2]
+    if train_matrix:
+        train_energy = out[2]
+    if reading_min is not None:
+        concurrent = out[-2]
+    by_resolution = out[-1]
+
+consum_l = tot_5min['Consumption (MWh)'] # Total consumption at each 5-minute timestamp.
+regen_l = tot_5min['Generation (MWh)'] # Total regeneration at each 5-minute timestamp.
+net_l = consum_l - regen_l # Total net energy at each 5-minute timestamp.
+
+P_max_consum = consum_l.max()
+P_max_regen = regen_l.max()
+
+# Creating the hourly dataframes of the total consumption, regeneration and ...
+# ... net energy, each with its own number of active trains available:
+df_consum_hourly = CreateHourlyDf('Total consumption (MWh)', consum_l,
+                                  num_trains['Consumption (MWh)'], month, year,
+                                  concurrent['Consumption (MWh)'])
+df_regen_hourly = CreateHourlyDf('Total regeneration (MWh)', regen_l,
+                                 num_trains['Generation (MWh)'], month, year,
+                                 concurrent['Generation (MWh)'])
+df_net_hourly = CreateHourlyDf('Total net energy (MWh)', net_l,
+                               num_trains['All'], month, year, concurrent['All'])
+
+# Creating the excel files for the entire month:
+df_consum_hourly.to_excel('Data - Month' + str(month) + '.xlsx')
+df_regen_hourly.to_excel('RegenData - Month' + str(month) + '.xlsx')
+df_net_hourly.to_excel('NetData - Month' + str(month) + '.xlsx')
+
+# Creating the excel files of the hourly summaries of the 5-minute totals (see ...
+# ... 'HourlyStats.py') and of the data-quality report of the month:
+CreateStatsDf(consum_l, month, year).to_excel('Stats - Month' + str(month) + '.xlsx')
+CreateStatsDf(regen_l, month, year).to_excel('RegenStats - Month' + str(month) + '.xlsx')
+CreateStatsDf(net_l, month, year).to_excel('NetStats - Month' + str(month) + '.xlsx')
+WriteQuality(quality, 'Quality - Month' + str(month) + '.xlsx')
+if train_matrix:
+    SaveTrainMatrix('TrainData - Month' + str(month) + '.npz', train_energy, month, year)
+
+# Creating the excel files of the finer resolutions:
+for resolution in resolutions:
+    if resolution == 'h':
+        continue
+    tot, num, peak = by_resolution[resolution]
+    peak = peak or concurrent # The peaks are None without 'reading_min'.
+    name = ' - Month' + str(month) + ' - ' + resolution + '.xlsx'
+    CreatePeriodDf('Total consumption (MWh)', tot['Consumption (MWh)'],
+                   num['Consumption (MWh)'], month, year, resolution,
+                   peak['Consumption (MWh)']).to_excel('Data' + name)
+    CreatePeriodDf('Total regeneration (MWh)', tot['Generation (MWh)'],
+                   num['Generation (MWh)'], month, year, resolution,
+                   peak['Generation (MWh)']).to_excel('RegenData' + name)
+    CreatePeriodDf('Total net energy (MWh)', tot['Consumption (MWh)'] - tot['Generation (MWh)'],
+                   num['All'], month, year, resolution, peak['All']).to_excel('NetData' + name)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the functions that are used by the extraction scripts to
+# read a raw DSB report ('*_energy-raw-data-report_DSB.xlsx').
+# 'ReadReport' loads the whole report into a single dataframe, while
+# 'ReadReportChunks' opens the workbook in read-only mode and yields it in
+# chunks of rows, so that only one chunk of the report is held in memory at a
+# time. Both are served from the columnar copy of the report kept by
+# 'DataCache.py', once that copy exists, and both return the report in the
+# compact schema of 'FrameSchema.py'.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+from itertools import islice
+from openpyxl import load_workbook
+from DataCache import ReadExcelCached, CachedChunks
+from FrameSchema import CompactReport
+
+def ReadReport(data_path):
+    """Read a whole raw DSB report into a dataframe"""
+    return ReadExcelCached(data_path, CompactReport)
+
+def ReadReportChunks(data_path, chunk_rows=100000):
+    """
+    Read a raw DSB report in chunks of 'chunk_rows' rows.
+
+    The workbook is opened in read-only mode, in which openpyxl streams the
+    rows of the sheet instead of loading the whole sheet. Every chunk is
+    yielded as a dataframe with the same columns as 'ReadReport'. When the
+    report has a cached Parquet copy, the chunks are read from that copy.
+    """
+    cached = CachedChunks(data_path, chunk_rows, CompactReport)
+    if cached is not None:
+        for df_chunk in cached:
+            yield CompactReport(df_chunk)
+        return
+
+    wb = load_workbook(data_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows) # The first row holds the column names.
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            yield CompactReport(pd.DataFrame(chunk, columns=header))
+    finally:
+        wb.close()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the sweep-line computation of the number of trains that
+# are active at the same moment (the concurrent trains). The 'Number of
+# trains available' of the hourly dataframes counts the trains that are
+# active at any moment of an hour, even if they are never active together.
+# Here, every active reading of a train is turned into an activity interval
+# [time of the reading, time of the reading + duration of a reading), and:
+    #1. The overlapping or touching intervals of the same train are merged
+    #... into one interval ('MergeIntervals'), so that a train is never
+    #... counted twice,
+    #2. Every interval gives an event +1 at its start and an event -1 at its
+    #... end. After sorting the events by time, their cumulative sum is the
+    #... number of concurrent trains from each event to the next one, and the
+    #... peak of that number within each period is read from it ('SweepPeak').
+# Both steps sort the intervals once, so the cost is O(n log n) in the number
+# of intervals. The times are handled in whole seconds from the start of the
+# month.
+# When the readings are scanned chunk by chunk (see 'FoldChunk' in
+# 'ExtrEngine.py'), the intervals are not kept: only the last interval of every
+# train is kept open ('NewSweep', 'FoldIntervals'), as the next readings of
+# the train can only overlap that one, and the intervals that are closed are
+# added as their events to the number of concurrent trains at each second of
+# the month. Each chunk is then merged with the open intervals of its trains
+# alone, so the cost is O(n log n) over the whole month, and the memory is
+# bounded by the seconds of the month and the number of trains. The peaks are
+# read from the running count at the end ('SweepPeaks').
+# ------------------------------------------------------------------------- #
+
+import numpy as np
+
+def MergeIntervals(codes, starts, ends):
+    """
+    Merge the overlapping or touching intervals [start, end) of each train
+    code. Returns the codes, starts and ends of the merged intervals, sorted
+    by code and start.
+    """
+    if len(codes) == 0:
+        return codes, starts, ends
+    order = np.lexsort((starts, codes))
+    codes, starts, ends = codes[order], starts[order], ends[order]
+    # Offsetting the times of every train code beyond those of the previous ...
+    # ... codes, so that a single running maximum of the ends over all ...
+    # ... intervals is the running maximum within each train:
+    span = int(ends.max()) + 1
+    ends_off = ends + codes * span
+    prev_end = np.maximum.accumulate(ends_off)[:-1] # Latest end of the earlier intervals.
+    new_run = np.ones(len(codes), dtype=bool)
+    new_run[1:] = (codes[1:] != codes[:-1]) | (starts[1:] + codes[1:] * span > prev_end)
+    first = np.flatnonzero(new_run) # First interval of each merged interval.
+    return codes[first], starts[first], np.maximum.reduceat(ends, first)
+
+def SweepPeak(starts, ends, n_periods, period_s):
+    """
+    Return the peak number of concurrent intervals within each of the
+    n_periods periods of 'period_s' seconds, starting at time 0.
+    """
+    peak = np.zeros(n_periods, dtype=np.int64)
+    if len(starts) == 0:
+        return peak
+    times = np.concatenate([starts, ends])
+    deltas = np.concatenate([np.ones(len(starts), dtype=np.int64),
+                             -np.ones(len(ends), dtype=np.int64)])
+    order = np.argsort(times, kind='stable')
+    times, deltas = times[order], deltas[order]
+
+    # Number of concurrent intervals after all the events at each distinct time:
+    event_times, first = np.unique(times, return_index=True)
+    last = np.append(first[1:], len(times)) - 1 # Last event at each distinct time.
+    counts = np.cumsum(deltas)[last]
+
+    # The peak within a period is the larger of the number at the start of the ...
+    # ... period and the numbers after the events within the period:
+    period_starts = np.arange(n_periods) * period_s
+    before = np.searchsorted(event_times, period_starts, side='right') - 1
+    peak = np.where(before >= 0, counts[np.maximum(before, 0)], 0)
+    within = event_times < n_periods * period_s
+    np.maximum.at(peak, event_times[within] // period_s, counts[within])
+    return peak
+
+def NewSweep(n_seconds):
+    """Create the running events of the sweep over a month of 'n_seconds' seconds"""
+    return {'delta': np.zeros(n_seconds + 1, dtype=np.int32), # Change of the count at each second.
+            'starts': np.empty(0, dtype=np.int64), # Open interval of each train code ...
+            'ends': np.empty(0, dtype=np.int64)} # ... (start -1 when it has none).
+
+def AddEvents(delta, starts, ends):
+    """Add the events of the intervals [start, end) to the changes of the count at each second"""
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, np.minimum(ends, len(delta) - 1), -1) # The ends after the month.
+
+def FoldIntervals(sweep, codes, starts, ends, n_trains):
+    """
+    Add the intervals [start, end) of the readings of a chunk to the sweep.
+    The readings of every train must come in time order from one chunk to
+    the next (within a chunk, they can be in any order).
+    """
+    old = len(sweep['starts'])
+    if old < n_trains: # Trains that are new in this chunk.
+        sweep['starts'] = np.concatenate([sweep['starts'], np.full(n_trains - old, -1)])
+        sweep['ends'] = np.concatenate([sweep['ends'], np.full(n_trains - old, -1)])
+    if len(codes) == 0:
+        return
+    # Open intervals of the trains of the chunk, which are merged with its intervals:
+    trains = np.unique(codes)
+    trains = trains[sweep['starts'][trains] >= 0]
+    if np.any(starts < sweep['starts'][codes]):
+        raise ValueError('The readings of a train come before the ones of an earlier chunk, '
+                         'the chunks must be in time order')
+    codes, starts, ends = MergeIntervals(np.concatenate([codes, trains]),
+                                         np.concatenate([starts, sweep['starts'][trains]]),
+                                         np.concatenate([ends, sweep['ends'][trains]]))
+    # The last merged interval of every train is kept open, and the others are closed:
+    last = np.append(codes[1:] != codes[:-1], True)
+    AddEvents(sweep['delta'], starts[~last], ends[~last])
+    sweep['starts'][codes[last]] = starts[last]
+    sweep['ends'][codes[last]] = ends[last]
+
+def SweepPeaks(sweep, n_periods, period_s):
+    """
+    Return the peak number of concurrent trains within each of the n_periods
+    periods of 'period_s' seconds of the month, from the closed and the open
+    intervals of the sweep.
+    """
+    delta = sweep['delta'].copy() # The open intervals are closed in a copy.
+    open_ = sweep['starts'] >= 0
+    AddEvents(delta, sweep['starts'][open_], sweep['ends'][open_])
+    counts = np.cumsum(delta[:n_periods * period_s]) # Concurrent trains at each second.
+    return counts.reshape(n_periods, period_s).max(axis=1).astype(np.int64)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This code creates synthetic raw DSB reports, with the same columns as the
+# real ones ('Time', 'ConsumptionPoint', 'Consumption (MWh)' and
+# 'Generation (MWh)'), so that the extraction scripts can be tested and timed
+# without the confidential DSB workbooks (see 'BenchExtr.py'). Every train
+# (ConsumptionPoint) has one reading per 'interval', a few seconds after the
+# start of each interval. The readings follow a daily service profile:
+    #1. A train is running in a share of its readings ('activity') that is
+    #... lower at night and higher in the morning and afternoon rush hours,
+    #2. A running train regenerates in a share of its readings ('regen_share'),
+    #... and consumes in the others,
+    #3. A train that is not running has zero consumption and regeneration.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+import os
+from ExtrEngine import CreateTimeGrid, HOUR_NS
+
+def ServiceProfile(hours):
+    """
+    Return the relative share of running trains at each hour of the day
+    (mean 1), with peaks in the morning and afternoon rush hours.
+    """
+    profile = (0.2 + np.exp(-((hours - 8) / 2.5)**2)
+               + np.exp(-((hours - 16.5) / 3)**2)) # Night, morning and afternoon.
+    return profile / profile.mean()
+
+def SynthReport(n_trains=10, months=(11,), year=2022, interval='5min', activity=0.3,
+                regen_share=0.3, seed=0, time_text=True):
+    """
+    Create a synthetic raw DSB report of 'n_trains' trains for the given
+    months. 'activity' is the mean share of the readings in which a train is
+    running (so 1 - activity is the sparsity of the report), and
+    'regen_share' the share of the running readings with regeneration. With
+    'time_text=True', the times are written as day/month/year text, as in
+    the raw reports, otherwise as timestamps.
+    """
+    rng = np.random.default_rng(seed)
+    times = np.concatenate([CreateTimeGrid(month, year, interval).asi8 for month in months])
+    step_s = int(pd.Timedelta(interval).total_seconds()) # Seconds between two readings.
+
+    # Time of each reading: each train reads a fixed number of seconds after ...
+    # ... the start of every interval. The rows are ordered train by train.
+    offsets = rng.integers(0, min(step_s, 60), n_trains) * 10**9
+    t = (times[None, :] + offsets[:, None]).ravel()
+    shape = (n_trains, len(times))
+
+    p_running = np.clip(activity * ServiceProfile((times // HOUR_NS) % 24), 0, 1)
+    running = rng.random(shape) < p_running[None, :]
+    regen = running & (rng.random(shape) < regen_share)
+    consum = np.where(running & ~regen, rng.gamma(2, 0.002, shape), 0.0)
+    generation = np.where(regen, rng.gamma(2, 0.001, shape), 0.0)
+
+    train_ids = np.array(['57131310' + str(k).zfill(10) for k in range(n_trains)])
+    df_trains = pd.DataFrame({'Time': pd.DatetimeIndex(t),
+                              'ConsumptionPoint': np.repeat(train_ids, len(times)),
+                              'Consumption (MWh)': consum.ravel(),
+                              'Generation (MWh)': generation.ravel()})
+    if time_text:
+        df_trains['Time'] = df_trains['Time'].dt.strftime('%d-%m-%Y %H:%M:%S')
+    return df_trains
+
+if __name__ == '__main__':
+
+    # -------------------- Inputs -------------------------------------- #
+    # Input the number of trains of the fleet:
+    n_trains = 10
+    # Input the months and the year of the report:
+    months = [11, 12]
+    year = 2022
+    # Input the time between two readings of a train, the mean share of running
+    # readings and the share of the running readings with regeneration:
+    interval = '5min'
+    activity = 0.3
+    regen_share = 0.3
+
+    # --------------------- Outputs ----------------------------------- #
+    # Creating the excel file of the report, named like the raw DSB reports. An ...
+    # ... excel sheet holds at most 1048575 rows of data.
+    df_trains = SynthReport(n_trains, months, year, interval, activity, regen_share)
+    file_name = (str(year) + '-' + str(months[0]).zfill(2) + ' - ' + str(year) + '-'
+                 + str(months[-1]).zfill(2) + '_energy-raw-data-report_DSB.xlsx')
+    df_trains.to_excel(os.path.join(os.getcwd(), file_name), index=False)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the functions that write and read the per-train energy
+# matrices of a month ('TrainData - MonthN.npz'). The extraction scripts only
+# keep the total energy of all trains within each hour, so the energy of a
+# single train (ConsumptionPoint) would otherwise have to be recovered from
+# the raw DSB report. A matrix holds, for an energy column (consumption,
+# regeneration), the energy of every train within each hour of the month:
+    #1. Its rows are the hours of the month (same order as 'Data - MonthN.xlsx'),
+    #2. Its columns are the trains, in the order of the train dictionary
+    #... ('train_ids') that is stored with the matrices.
+# Most trains are idle within most hours, so the matrices are stored in a
+# compressed sparse row layout, in a single compressed numpy file. The energy
+# of a group of trains (eg. the trains of a depot) within each hour is then
+# the sum of their columns (see 'SubsetEnergy').
+# ------------------------------------------------------------------------- #
+
+import numpy as np
+from scipy import sparse
+
+def SaveTrainMatrix(file_name, energy, month, year=2022):
+    """
+    Write the per-train energy of a month, as returned by 'TrainEnergyResult'
+    (see 'ExtrEngine.py'), to a compressed numpy file.
+    """
+    arrays = {'month': np.array(month), 'year': np.array(year),
+              'train_ids': np.asarray(energy['train_ids']).astype(str),
+              'columns': np.array(list(energy['matrix']), dtype=str)}
+    for i, matrix in enumerate(energy['matrix'].values()):
+        matrix = sparse.csr_matrix(matrix)
+        arrays['data_' + str(i)] = matrix.data
+        arrays['indices_' + str(i)] = matrix.indices
+        arrays['indptr_' + str(i)] = matrix.indptr
+        arrays['shape_' + str(i)] = np.array(matrix.shape)
+    np.savez_compressed(file_name, **arrays)
+
+def LoadTrainMatrix(file_name):
+    """
+    Read a file written by 'SaveTrainMatrix'. Returns a dictionary with the
+    same keys as 'TrainEnergyResult' ('train_ids' and 'matrix'), together with
+    the 'month' and 'year' of the data. The ConsumptionPoints are read back as
+    strings.
+    """
+    with np.load(file_name, allow_pickle=False) as f:
+        matrix = {}
+        for i, column in enumerate(f['columns']):
+            matrix[str(column)] = sparse.csr_matrix(
+                (f['data_' + str(i)], f['indices_' + str(i)], f['indptr_' + str(i)]),
+                shape=tuple(f['shape_' + str(i)]))
+        return {'train_ids': f['train_ids'], 'matrix': matrix,
+                'month': int(f['month']), 'year': int(f['year'])}
+
+def SubsetEnergy(energy, column, trains):
+    """
+    Return the total 'column' energy of the given trains (ConsumptionPoints)
+    within each hour of the month. Trains that are not in the train
+    dictionary have no readings within the month and are left out.
+    """
+    train_ids = np.asarray(energy['train_ids']).astype(str)
+    selected = np.isin(train_ids, np.asarray(trains).astype(str)) # Columns of the trains.
+    return np.asarray(energy['matrix'][column][:, selected].sum(axis=1)).ravel()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This code extracts the hourly consumption, regeneration and net energy data
+# of all months of a year in one run, from a folder containing the raw DSB
+# reports ('*_energy-raw-data-report_DSB.xlsx'). It creates the same
+# 'Data - MonthN.xlsx', 'RegenData - MonthN.xlsx' and 'NetData - MonthN.xlsx'
+# files as 'JointDataExtr.py', for every month.
+# A raw report such as '2022-11 - 2022-12_...' holds the data of two months,
+# so the rows of every report are routed to the calendar month of their
+# timestamp, and a month can be made up of the rows of several reports.
+# The reports are first converted to their cached columnar copies (see
+# 'DataCache.py'), and the months are then extracted at the same time in a
+# pool of processes. Optionally, the energy of every train within each hour is
+# written to a 'TrainData - MonthN.npz' file as well (see 'TrainMatrix.py'),
+# and the files are also created at finer resolutions than the hour. The
+# data-quality report of every month is written to 'Quality - MonthN.xlsx'.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import os
+import re
+import glob
+from concurrent.futures import ProcessPoolExecutor
+from ExtrEngine import BinTrainChunks, CreateHourlyDf, CreatePeriodDf
+from ReportReader import ReadReport
+from DataCache import ReadExcelCached
+from FrameSchema import CompactReport
+from TrainMatrix import SaveTrainMatrix
+from DataQuality import WriteQuality
+from HourlyStats import CreateStatsDf
+
+def ReportMonths(data_path, year):
+    """
+    Return the months of 'year' that a raw report can hold data of, based on
+    its file name ('YYYY-MM - YYYY-MM_...'). When the file name does not
+    follow that pattern, the report is considered for all months.
+    """
+    found = re.findall(r'(\d{4})-(\d{2})', os.path.basename(data_path))
+    if len(found) < 2:
+        return list(range(1, 13))
+    (y_s, m_s), (y_e, m_e) = found[:2]
+    first = int(y_s) * 12 + int(m_s) - 1 # Month of the start of the report.
+    last = int(y_e) * 12 + int(m_e) - 1 # Month of the end of the report.
+    return [m % 12 + 1 for m in range(first, last + 1) if m // 12 == year]
+
+def WarmCache(data_path):
+    """Create the cached copy of a raw report (parsing the Excel file once)"""
+    ReadExcelCached(data_path, CompactReport)
+    return data_path
+
+def ExtractMonth(month, year, report_paths, out_dir, train_matrix=False, resolutions=('h',),
+                 reading_min=None):
+    """
+    Extract one month from the raw reports that can hold its data, and
+    write its 'Data', 'RegenData' and 'NetData' files and their hourly
+    summaries ('Stats', 'RegenStats', 'NetStats') and its data-quality
+    report ('Quality') to 'out_dir' (and its
+    'TrainData' file with 'train_matrix=True'). Besides the hourly files, the
+    files of the other 'resolutions' are named eg. 'Data - MonthN - 15min.xlsx'.
+    With 'reading_min', the files get the 'Peak concurrent trains' column.
+    """
+    list_df = []
+    for r, data_path in enumerate(report_paths):
+        df_report = ReadReport(data_path)
+        # Keeping only the rows of the inputted month:
+        t = df_report['Time']
+        in_month = (t.dt.year == year) & (t.dt.month == month)
+        df_report = df_report.loc[in_month].assign(report=r) # Index of the report.
+        list_df.append(df_report)
+    df_trains = pd.concat(list_df, ignore_index=True)
+
+    # When two reports overlap at the month boundary, a reading of a train at a
+    # certain time can be present in both. Such readings are kept only from
+    # the first report that holds them:
+    if len(report_paths) > 1:
+        first = df_trains.groupby(['Time', 'ConsumptionPoint'],
+                                  observed=True)['report'].transform('min')
+        df_trains = df_trains.loc[df_trains['report'] == first]
+
+    out = BinTrainChunks([df_trains], month, year, ['Consumption (MWh)', 'Generation (MWh)'],
+                         return_energy=train_matrix, resolutions=resolutions,
+                         reading_min=reading_min, return_quality=True)
+    quality, out = out[-1], out[:-1] # The quality report is returned last.
+    tot_5min, num_trains = out[:2]
+    consum_l = tot_5min['Consumption (MWh)']
+    regen_l = tot_5min['Generation (MWh)']
+    concurrent = {'Consumption (MWh)': None, 'Generation (MWh)': None, 'All': None}
+    if reading_min is not None:
+        concurrent = out[-2]
+
+    CreateHourlyDf('Total consumption (MWh)', consum_l, num_trains['Consumption (MWh)'],
+                   month, year, concurrent['Consumption (MWh)']).to_excel(
+        os.path.join(out_dir, 'Data - Month' + str(month) + '.xlsx'))
+    CreateHourlyDf('Total regeneration (MWh)', regen_l, num_trains['Generation (MWh)'],
+                   month, year, concurrent['Generation (MWh)']).to_excel(
+        os.path.join(out_dir, 'RegenData - Month' + str(month) + '.xlsx'))
+    CreateHourlyDf('Total net energy (MWh)', consum_l - regen_l, num_trains['All'],
+                   month, year, concurrent['All']).to_excel(
+        os.path.join(out_dir, 'NetData - Month' + str(month) + '.xlsx'))
+    CreateStatsDf(consum_l, month, year).to_excel(
+        os.path.join(out_dir, 'Stats - Month' + str(month) + '.xlsx'))
+    CreateStatsDf(regen_l, month, year).to_excel(
+        os.path.join(out_dir, 'RegenStats - Month' + str(month) + '.xlsx'))
+    CreateStatsDf(consum_l - regen_l, month, year).to_excel(
+        os.path.join(out_dir, 'NetStats - Month' + str(month) + '.xlsx'))
+    WriteQuality(quality, os.path.join(out_dir, 'Quality - Month' + str(month) + '.xlsx'))
+    if train_matrix:
+        SaveTrainMatrix(os.path.join(out_dir, 'TrainData - Month' + str(month) + '.npz'),
+                        out[2], month, year)
+    for resolution in resolutions:
+        if resolution == 'h':
+            continue
+        tot, num, peak = out[-1][resolution]
+        peak = peak or concurrent # The peaks are None without 'reading_min'.
+        name = ' - Month' + str(month) + ' - ' + resolution + '.xlsx'
+        CreatePeriodDf('Total consumption (MWh)', tot['Consumption (MWh)'],
+                       num['Consumption (MWh)'], month, year, resolution,
+                       peak['Consumption (MWh)']).to_excel(os.path.join(out_dir, 'Data' + name))
+        CreatePeriodDf('Total regeneration (MWh)', tot['Generation (MWh)'],
+                       num['Generation (MWh)'], month, year, resolution,
+                       peak['Generation (MWh)']).to_excel(os.path.join(out_dir, 'RegenData' + name))
+        CreatePeriodDf('Total net energy (MWh)', tot['Consumption (MWh)'] - tot['Generation (MWh)'],
+                       num['All'], month, year, resolution,
+                       peak['All']).to_excel(os.path.join(out_dir, 'NetData' + name))
+    return month
+
+if __name__ == '__main__':
+
+    # -------------------- Inputs -------------------------------------- #
+    # Input the year of the data:
+    year = 2022
+    # Input the folder containing the raw DSB reports of that year:
+    reports_dir = os.getcwd()
+    # Input the folder where the monthly excel files are created:
+    out_dir = os.getcwd()
+    # Input the number of processes (None uses all the cores of the computer):
+    n_workers = None
+    # Set 'train_matrix' to True to also write the energy of every train within
+    # each hour of each month:
+    train_matrix = False
+    # Input the resolutions of the excel files ('1min', '5min', '15min', 'h'):
+    resolutions = ['h']
+    # Input the duration of a reading of a train in minutes (eg. 5) to add the
+    # 'Peak concurrent trains' column, or None to leave it out:
+    reading_min = None
+
+    # --------------------- Outputs ----------------------------------- #
+    report_paths = sorted(glob.glob(os.path.join(reports_dir, '*_energy-raw-data-report_DSB.xlsx')))
+
+    # Raw reports that can hold the data of each month:
+    month_reports = {month: [] for month in range(1, 13)}
+    for data_path in report_paths:
+        for month in ReportMonths(data_path, year):
+            month_reports[month].append(data_path)
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        # Parsing every raw report once, at the same time:
+        list(pool.map(WarmCache, report_paths))
+
+        # Extracting every month that has at least one raw report, at the same time:
+        months = [month for month in range(1, 13) if month_reports[month]]
+        futures = [pool.submit(ExtractMonth, month, year, month_reports[month], out_dir,
+                               train_matrix, resolutions, reading_min)
+                   for month in months]
+        for future in futures:
+            print('Month', future.result(), 'extracted')
@@ -9,7 +9,8 @@ Created on Tue May  7 00:02:18 2024
 # data profiles of a certain day of the week throughout the year 2022
 # (eg. all Mondays of year 2022) into 5 clusters, where each cluster is treated 
 # as a scenario. Here, KMeans is used as the clustering algorithm. 
-# It also plots the 5 consumption scenarios for each day of the week.
+# It also collects the figures of the 5 consumption scenarios for each day of the
+# week, which are drawn by the calling script.
 
 # Further, the function also returns:
     #1. mean consumption of all 24 hours for the 5 clusters of each day 
@@ -29,8 +30,27 @@ import datetime as dt
 import matplotlib.pyplot as plt
 import numpy as np
 from sklearn.cluster import KMeans
+import sys
+# 'ProjectPaths.py' is located in the 'Quantification' folder, and adds the 'Data Extraction' ...
+# ... folder to the module search path as well:
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Quantification'))
+import ProjectPaths
+from DataCache import ReadExcelCached
+from FrameSchema import CompactHourly
+from HourlyStats import ReadStats, StatsPmax
+from CalendarIndex import JoinCalendar
+from FigureReport import FigureSpec, ClusterFigure
 
-def ConsumDataDf():
+# The inputs of the function are the assumptions of the reserves: the ratio of the
+# minimum consumption to the mean (pmin_ratio), and the lower and upper percentiles
+# of the consumption from which the FCRD-Up and FCRD-Down reserves are obtained
+# (lower_q and upper_q). With 'exclude_holidays', the Danish public holidays
+# (see 'CalendarIndex.py') are left out of the days that are clustered, so that
+# they are not mixed into the profiles of the days of the week. When 'figures' is
+# a list, the figure of the clusters of each day of the week is added to it, to be
+# shown or rendered by the calling script (see 'FigureReport.py').
+def ConsumDataDf(pmin_ratio=0.2, lower_q=0.1, upper_q=0.9, exclude_holidays=False,
+                 figures=None):
 
     list_df = []
     
@@ -70,7 +90,8 @@ def ConsumDataDf():
     for month in Months:
         data_path = os.path.join(os.getcwd(),'Data - Month' + month + '.xlsx')
         #data_path = os.path.join(os.getcwd(),'Test - Dec.xlsx')
-        month_data = pd.read_excel(data_path)
+        month_data = ReadExcelCached(data_path, CompactHourly) # Compact schema, served from ...
+        # ... the cached copy once it exists.
         list_df.append(month_data) # Having a list containing 12 seperate dataframes...
         # ... of the hourly consumption data for all days of each month.
     
@@ -80,16 +101,17 @@ def ConsumDataDf():
     # ... is to arrange the date in the dataframe in day/month/year format.
     df_trains['Time'] = df_trains['Time'].dt.tz_localize('UTC')
     
-    # Extracting the 'Day of Year' of each day for Year 2022:
-    df_trains['Day of year'] = df_trains['Time'].dt.dayofyear
+    # The 'Day of Year' and the public holiday flag of each day for Year 2022, ...
+    # ... from the calendar index:
+    df_trains = JoinCalendar(df_trains, ['Day of year', 'Is holiday'])
+    if exclude_holidays:
+        df_trains = df_trains[~df_trains['Is holiday'].to_numpy(dtype=bool)]
 
     # An array which contains the maximum consumption values at each hour, and
-    # this is the same for all 7 days of the week. These values were obtained
-    # from the code that was used to compute the capacity reserves. 
-    max_Val_Arr = np.array([1.49703, 1.44988, 1.29967, 0.796633, 0.787783, 1.19633, 
-                            1.86894, 2.65881, 2.66224, 2.60899, 2.35978, 2.21267, 2.26315, 
-                            2.32463, 2.32203, 2.56189, 2.5359, 2.80095, 2.60407, 2.35997, 
-                            2.04686, 2.0117, 1.92298, 1.80646]) 
+    # this is the same for all 7 days of the week. These values are obtained
+    # from the hourly summaries created by the extraction (see 'HourlyStats.py'),
+    # the same way as in the code that is used to compute the capacity reserves.
+    max_Val_Arr = StatsPmax(ReadStats('Stats - Month', Months)).to_numpy()
     df_Pmax = pd.DataFrame(max_Val_Arr) # Converting the array into a dataframe.
     
     # The 'plot_clusters' function which takes the inputs:
@@ -108,21 +130,12 @@ def ConsumDataDf():
         #... data profile to an appopriate cluster out of the n number of clusters
         cl  = kmeans.cluster_centers_ # Gives the centroids of the clusters 
     
-        # Creating n number of subplots where one subplot represents one cluster:
-        fig, axs = plt.subplots(nrows=n, ncols=1, figsize=(8, 14)) 
-        fig.suptitle("Weekly Cluster of Train Consumption for " + Days[loop_count],
-                  fontsize = 10)
-        
-        for i, ax in enumerate(axs.flat): # Accessing each cluster
-        #for i in range(n):
+        for i in range(n): # Accessing each cluster
             
             list_index_clus = [] # Emptying the list: 'list_index_clus', so that it 
             #... could store the indicies corresponding to the consumption profiles
             #... whose membership belongs to cluster i
             
-            # Plot the cluster i:
-            ax.plot(df_pivot.loc[idx==i].T, c = colors_hex[i], linewidth = 1)
-            
             clus = df_pivot.loc[idx==i].T # Gives a dataframe containing all the
             #... 24-hour consumption data profiles whose label/membership 
             #... belongs to cluster i. 
@@ -131,13 +144,6 @@ def ConsumDataDf():
             #... of the dataframe represents the index of the corresponding 
             #... consumption data profile whose label/membership belongs to cluster i.
             
-            ax.set_xlabel("Hour of day") # Set the label of the plot's x-axis
-            ax.set_ylabel("Consumption (MW)") # Set the label of the plot's y-axis
-            ax.set_title("Cluster " + str(i+1)) # Set the title of each subplot
-            
-            # Plot the centeroid of cluster i:
-            ax.plot(cl[i], c = "black", linewidth = 4) 
-            
             cent_val_i = (cl[i]) # Gives an array of 24 values that composes 
             #... the centeroid of cluster i
             cent_val = cent_val_i.tolist() # Convert the array into a list
@@ -151,19 +157,19 @@ def ConsumDataDf():
             list_index.append(list_index_clus) # Storing that list of indicies 
             #... belonging to cluster i in another list
             
-            Pmin_consum = 0.2 * cent_val_i # Returns an array that has the minimum
+            Pmin_consum = pmin_ratio * cent_val_i # Returns an array that has the minimum
             #... consumption at each hour. This was introduced as an assumption considering
             #... the train operator's point of view.
             Pmin_consum_list = Pmin_consum.tolist() # Convert the array into a list
             Pmin_list.append(Pmin_consum_list) # Storing that list inside another list
             
-            quantile_10 = clus.quantile(.1, axis = 1) # Returns an array containing 
-            #... the 10th percentile of each row in the dataframe: 'clus'
+            quantile_10 = clus.quantile(lower_q, axis = 1) # Returns an array containing 
+            #... the lower (10th by default) percentile of each row in the dataframe: 'clus'
             quantile10_list = quantile_10.tolist() # Convert the array into a list
             Q10_list.append(quantile10_list) # Storing that list inside another list
             
-            quantile_90 = clus.quantile(.9, axis = 1) # Returns an array containing 
-            #... the 90th percentile of each row in the dataframe: 'clus'
+            quantile_90 = clus.quantile(upper_q, axis = 1) # Returns an array containing 
+            #... the upper (90th by default) percentile of each row in the dataframe: 'clus'
             q90_series.append(quantile_90)
             quantile90_list = quantile_90.tolist() # Convert the array into a list
             Q90_list.append(quantile90_list) # Storing that list inside another list
@@ -204,7 +210,14 @@ def ConsumDataDf():
         #... into an array
         df_merged_cDown = pd.DataFrame(merged_cDown) # Convert the array into a dataframe
         
-        fig.tight_layout()
+        # The figure of the n clusters, one subplot per cluster, with the profiles
+        #... of each cluster and its centroid:
+        if figures is not None:
+            figures.append(FigureSpec("Cluster - " + Days[loop_count], ClusterFigure, (8, 14),
+                                      dpi=100, profiles=[df_pivot.loc[idx==i].T for i in range(n)],
+                                      centroids=cl, colors=colors_hex[:n],
+                                      title="Weekly Cluster of Train Consumption for "
+                                      + Days[loop_count]))
         return df_merged_cent, df_merged_Pmin, df_merged_Q10, df_merged_Q90, df_merged_cUP, df_merged_cDown, list_index    
     
     # RGB color codes for the colors that are used for plotting clusters:
@@ -264,8 +277,6 @@ def ConsumDataDf():
         # for the d-th day of the week:
         df_merged_cent, df_merged_Pmin, df_merged_Q10, df_merged_Q90, df_merged_cUP, df_merged_cDown, list_index = plot_clusters(merged_pivot, 5)
         
-        # Save the subplots of the 5 clusters when the day of the week == 'loop_count' (==d):
-        #plt.savefig("Cluster - " + Days[loop_count])
         
         merged_cent_list.append(df_merged_cent) # Storing 'df_merged_cent' of d-th day in a list
         merged_index_list.append(list_index) # Storing 'list_index' of d-th day in a list
@@ -16,6 +16,11 @@ import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns  
 from itertools import cycle, islice
+# 'CalendarIndex.py' and 'FigureReport.py' are located in the 'Data Extraction' folder, ...
+# ... which 'ConsumBaselineV1.py' adds to the module search path (see 'ProjectPaths.py'):
+from CalendarIndex import JoinCalendar
+from FigureReport import (FigureSpec, BoxFigure, DayLinesFigure, ScenarioDayLinesFigure,
+                          ShowFigures, RenderFigures)
 
 cD_list = []
 cU_list = []
@@ -25,6 +30,23 @@ Prices_FCRDwn = CreateFCRDwnPricesDf() # Load FCRD-Down prices (DKK/MW) for all
 Prices_FCRUp = CreateFCRUpPricesDf() # Load FCRD-Up prices (DKK/MW) for all
 # hours from Monday to Sunday. 
 
+# Assumptions of the reserves (see 'ConsumBaselineV1.py'): the minimum consumption
+# is pmin_ratio x mean, and the FCRD-Up and FCRD-Down reserves are obtained from
+# the lower_q and upper_q percentiles of the consumption. Set 'exclude_holidays'
+# to True to leave the Danish public holidays out of the clustered days:
+pmin_ratio = 0.2
+lower_q = 0.1
+upper_q = 0.9
+exclude_holidays = False
+# Set 'report_dir' to a folder to render the figures headless into image files
+# in that folder (in parallel, skipping the figures whose data has not changed
+# since the last run, see 'FigureReport.py'), instead of showing them:
+report_dir = None
+
+# Every figure is collected as a specification (see 'FigureReport.py'), and the
+# figures are shown or rendered at the end:
+figures = []
+
 # Load:
     #1. Baseline consumption (consum_Baseline), 
     #2. Minimum consumption (P_min_consum),
@@ -33,7 +55,7 @@ Prices_FCRUp = CreateFCRUpPricesDf() # Load FCRD-Up prices (DKK/MW) for all
 # for all 24 hours for the 5 clusters from Monday to Sunday, and 
     #5. Maximum consumption (P_max) for all 24 hours which is constant for all
     # clusters and all days of the week.
-consum_Baseline, P_min_consum, P_max, Up_consum, Down_consum = ConsumDataDf() 
+consum_Baseline, P_min_consum, P_max, Up_consum, Down_consum = ConsumDataDf(pmin_ratio, lower_q, upper_q, exclude_holidays, figures)
 
 
 c_MinBid = 0.1 # Minimum capacity (MW) to enter the FCRD bidding market.
@@ -125,8 +147,8 @@ df_new_hourly = pd.concat([df_new, merged_cD, merged_cU, merged_pD, merged_pU],
 
 df_new_hourly["Hour"] =df_new_hourly['Time'].dt.hour # Extracting the hour of the day
 
-# Extracting the day name from each date:
-df_new_hourly['Day of week name'] = df_new_hourly['Time'].dt.day_name(locale = 'English') 
+# The day name of each date, from the calendar index:
+df_new_hourly = JoinCalendar(df_new_hourly, ['Day of week name'])
 
 # Calculating the income generated by selling energy in the FCRD-Down market:
 df_new_hourly["FCRD-Down Sales Income"] = df_new_hourly['c_D values']*df_new_hourly['p_D values']
@@ -136,73 +158,57 @@ df_new_hourly["FCRD-Up Sales Income"] = df_new_hourly['c_U values']*df_new_hourl
 # ---------------------------- Plotting ----------------------------- #
 
 # ------------------ Plotting the bidding capacities --------------------------- #
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='c_D values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Bidding capacity (MW)")
-plt.title("FCRD-Down consumption bidding capacities - grouped hourly") 
-#plt.savefig("box_plot - cDhourly")
-
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='c_U values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Bidding capacity (MW)")
-plt.title("FCRD-Up consumption bidding capacities - grouped hourly") 
-#plt.savefig("box_plot - cUhourly")
+figures.append(FigureSpec("box_plot - cDhourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'c_D values']], x="Hour", y='c_D values',
+                          xlabel="Hour of day", ylabel="Bidding capacity (MW)",
+                          title="FCRD-Down consumption bidding capacities - grouped hourly"))
+
+figures.append(FigureSpec("box_plot - cUhourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'c_U values']], x="Hour", y='c_U values',
+                          xlabel="Hour of day", ylabel="Bidding capacity (MW)",
+                          title="FCRD-Up consumption bidding capacities - grouped hourly"))
 
 # --------------- Plotting the income created ------------------------------------ #
 # ----------- On an hourly basis  -------------#
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='FCRD-Down Sales Income', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Income (DKK/hour)")
-plt.title("FCRD-Down sales income - grouped hourly") 
-#plt.savefig("IncomeD_Hourly")
-
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='FCRD-Up Sales Income', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Income (DKK/hour)")
-plt.title("FCRD-Up sales income - grouped hourly") 
-#plt.savefig("IncomeU_Hourly")
+figures.append(FigureSpec("IncomeD_Hourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'FCRD-Down Sales Income']], x="Hour",
+                          y='FCRD-Down Sales Income', xlabel="Hour of day",
+                          ylabel="Income (DKK/hour)",
+                          title="FCRD-Down sales income - grouped hourly"))
+
+figures.append(FigureSpec("IncomeU_Hourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'FCRD-Up Sales Income']], x="Hour",
+                          y='FCRD-Up Sales Income', xlabel="Hour of day",
+                          ylabel="Income (DKK/hour)",
+                          title="FCRD-Up sales income - grouped hourly"))
 
 # ----------- On a weekly basis -------------#
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y='FCRD-Down Sales Income', data=df_new_hourly, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Income (DKK/hour)",fontsize=13)
-plt.title("FCRD-Down sales income - grouped weekly", fontsize=15) 
-#plt.savefig("IncomeD_Weekly")
-
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y='FCRD-Up Sales Income', data=df_new_hourly, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Income (DKK/hour)",fontsize=13)
-plt.title("FCRD-Up sales income - grouped weekly", fontsize=15) 
-#plt.savefig("IncomeU_Weekly")
+figures.append(FigureSpec("IncomeD_Weekly", BoxFigure, (12, 6),
+                          df=df_new_hourly[['Day of week name', 'FCRD-Down Sales Income']],
+                          x='Day of week name', y='FCRD-Down Sales Income',
+                          xlabel="Day of week", ylabel="Income (DKK/hour)",
+                          title="FCRD-Down sales income - grouped weekly", label_size=13,
+                          title_size=15))
+
+figures.append(FigureSpec("IncomeU_Weekly", BoxFigure, (12, 6),
+                          df=df_new_hourly[['Day of week name', 'FCRD-Up Sales Income']],
+                          x='Day of week name', y='FCRD-Up Sales Income',
+                          xlabel="Day of week", ylabel="Income (DKK/hour)",
+                          title="FCRD-Up sales income - grouped weekly", label_size=13,
+                          title_size=15))
 
 # -------------------- Hourly plots for all 7 days of the week ----------- #
 
 # ------- Bidding capacities --------------- #
-plt.figure(figsize=(10, 6), dpi=80)
-for day in range(7):
-    plt.plot(cD_list[day])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Bidding capacity (MW)")
-plt.title("FCRD-Down consumption bidding capacities")  
-#plt.savefig("FCRDwn_Bid")
-
-plt.figure(figsize=(10, 6), dpi=80)
-for day in range(7):
-    plt.plot(cU_list[day])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Bidding capacity (MW)")
-plt.title("FCRD-Up consumption bidding capacities")  
-#plt.savefig("FCRUp_Bid")
+figures.append(FigureSpec("FCRDwn_Bid", DayLinesFigure, (10, 6),
+                          values=np.hstack(cD_list).T,
+                          ylabel="Bidding capacity (MW)",
+                          title="FCRD-Down consumption bidding capacities"))
+
+figures.append(FigureSpec("FCRUp_Bid", DayLinesFigure, (10, 6),
+                          values=np.hstack(cU_list).T,
+                          ylabel="Bidding capacity (MW)",
+                          title="FCRD-Up consumption bidding capacities"))
 
 # ------------ Income generated ------------- #
 merged_FCRDwnIncome = []
@@ -229,55 +235,31 @@ for day in range(7):
         
     merged_FCRDwnIncome.append(incomeD)
     merged_FCRUpIncome.append(incomeU)
-     
-plt.figure(figsize=(10, 6), dpi=80)
-for day in range(7):
-    plt.plot(merged_FCRDwnIncome[day])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Income (DKK)")
-plt.title("FCRD-Down sales income")
-#plt.savefig("FCRDwn_Income")
-
-plt.figure(figsize=(10, 6), dpi=80)
-for day in range(7):
-    plt.plot(merged_FCRUpIncome[day])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Income (DKK)")
-plt.title("FCRD-Up sales income")
-#plt.savefig("FCRUp_Income")
-  
+
+figures.append(FigureSpec("FCRDwn_Income", DayLinesFigure, (10, 6),
+                          values=merged_FCRDwnIncome,
+                          ylabel="Income (DKK)",
+                          title="FCRD-Down sales income"))
+
+figures.append(FigureSpec("FCRUp_Income", DayLinesFigure, (10, 6),
+                          values=merged_FCRUpIncome,
+                          ylabel="Income (DKK)",
+                          title="FCRD-Up sales income"))
+
 # -------------- Capacity reserves ------------------ #
-      
-fig, axs = plt.subplots(5, ncols=1, figsize=(10, 12))
-range_s = range(5)
-range_h = range(24)
-  
-for s in range_s:
-    #plt.figure(figsize=(10, 6), dpi=80)
-    for day in range(7): 
-        reserveD_day = Down_consum[day]
-        reserveD_s = reserveD_day.iloc[s]
-        axs[s].plot(reserveD_s)
-    axs[s].legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-fig.suptitle("Available FCRD-Down Reserves", fontsize=18)
-fig.supxlabel("Hour of day", fontsize=14)
-fig.supylabel("Capacity reserves (MW)", fontsize=14)
-#plt.savefig("FCRDwn_Res")
-
-fig, axs = plt.subplots(5, ncols=1, figsize=(10, 12))
-range_s = range(5)
-range_h = range(24)
-  
-for s in range_s:
-    #plt.figure(figsize=(10, 6), dpi=80)
-    for day in range(7): 
-        reserveU_day = Up_consum[day]
-        reserveU_s = reserveU_day.iloc[s]
-        axs[s].plot(reserveU_s)
-    axs[s].legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-fig.suptitle("Available FCRD-Up Reserves", fontsize=18)
-fig.supxlabel("Hour of day", fontsize=14)
-fig.supylabel("Capacity reserves (MW)", fontsize=14)
-#plt.savefig("FCRUp_Res")
+# The reserves of each cluster (scenario) for the 7 days of the week:
+figures.append(FigureSpec("FCRDwn_Res", ScenarioDayLinesFigure, (10, 12), dpi=100,
+                          values=np.array([[Down_consum[day].iloc[s] for day in range(7)]
+                                           for s in range(5)]),
+                          ylabel="Capacity reserves (MW)", title="Available FCRD-Down Reserves"))
+
+figures.append(FigureSpec("FCRUp_Res", ScenarioDayLinesFigure, (10, 12), dpi=100,
+                          values=np.array([[Up_consum[day].iloc[s] for day in range(7)]
+                                           for s in range(5)]),
+                          ylabel="Capacity reserves (MW)", title="Available FCRD-Up Reserves"))
+
+# -------------------- Showing or rendering the figures ----------- #
+if report_dir is None:
+    ShowFigures(figures)
+else:
+    RenderFigures(figures, report_dir)
@@ -11,8 +11,12 @@ import datetime as dt
 from ConsumBaselineV1 import ConsumDataDf
 from OptimizerV1 import Optimizer
 import matplotlib.pyplot as plt
+import numpy as np
 import itertools
 import seaborn as sns  
+# 'FigureReport.py' is located in the 'Data Extraction' folder, which 'ConsumBaselineV1.py' ...
+# ... adds to the module search path (see 'ProjectPaths.py'):
+from FigureReport import FigureSpec, DayLinesFigure, ShowFigures, RenderFigures
 
 cD_week = []
 cU_week = []
@@ -26,6 +30,23 @@ cU_hour_week = []
 iD_hour_week = []
 iU_hour_week = []
 
+# Assumptions of the reserves (see 'ConsumBaselineV1.py'): the minimum consumption
+# is pmin_ratio x mean, and the FCRD-Up and FCRD-Down reserves are obtained from
+# the lower_q and upper_q percentiles of the consumption. Set 'exclude_holidays'
+# to True to leave the Danish public holidays out of the clustered days:
+pmin_ratio = 0.2
+lower_q = 0.1
+upper_q = 0.9
+exclude_holidays = False
+# Set 'report_dir' to a folder to render the figures headless into image files
+# in that folder (in parallel, skipping the figures whose data has not changed
+# since the last run, see 'FigureReport.py'), instead of showing them:
+report_dir = None
+
+# Every figure is collected as a specification (see 'FigureReport.py'), and the
+# figures are shown or rendered at the end:
+figures = []
+
 # Load:
     #1. Baseline consumption (consum_Baseline), 
     #2. Minimum consumption (P_min_consum),
@@ -38,7 +59,7 @@ iU_hour_week = []
     # clusters and for all days of the week,
     #8. Weighting factors (Weight_ind) of the 5 clusters of each day 
     # from Monday to Sunday.
-consum_Baseline, P_min_consum, P_max, Up_consum, Down_consum, Weight_ind, Prices_FCRDwn, Prices_FCRUp = ConsumDataDf() # Load weekly baseline consumption
+consum_Baseline, P_min_consum, P_max, Up_consum, Down_consum, Weight_ind, Prices_FCRDwn, Prices_FCRUp = ConsumDataDf(pmin_ratio, lower_q, upper_q, exclude_holidays, figures) # Load weekly baseline consumption
 
 c_MinBid = 0.1 # Minimum capacity (MW) to enter the FCRD bidding market.
 
@@ -131,41 +152,29 @@ for n in range(7): # To access n-th day of the week
 # -------------------- Hourly plots for all 7 days of the week ----------- #
 
 # ------- Bidding capacities --------------- #
-plt.figure(figsize=(10, 6), dpi=80)
-for day in range(7):
-    plt.plot(cD_hour_week[day])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Bidding capacity (MW)")
-plt.title("FCRD-Down consumption bidding capacities")  
-#plt.savefig("FCRDwn_Bid")
-
-plt.figure(figsize=(10, 6), dpi=80)
-for day in range(7):
-    plt.plot(cU_hour_week[day])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Bidding capacity (MW)")
-plt.title("FCRD-Up consumption bidding capacities")  
-#plt.savefig("FCRUp_Bid")
+figures.append(FigureSpec("FCRDwn_Bid", DayLinesFigure, (10, 6),
+                          values=np.hstack(cD_hour_week).T,
+                          ylabel="Bidding capacity (MW)",
+                          title="FCRD-Down consumption bidding capacities"))
+
+figures.append(FigureSpec("FCRUp_Bid", DayLinesFigure, (10, 6),
+                          values=np.hstack(cU_hour_week).T,
+                          ylabel="Bidding capacity (MW)",
+                          title="FCRD-Up consumption bidding capacities"))
 
 # ------------ Income generated ------------- #
-    
-plt.figure(figsize=(10, 6), dpi=80)
-for day in range(7):
-    plt.plot(iD_hour_week[day])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Income (DKK)")
-plt.title("FCRD-Down sales income")
-#plt.savefig("FCRDwn_Income")
-
-plt.figure(figsize=(10, 6), dpi=80)
-for day in range(7):
-    plt.plot(iU_hour_week[day])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Income (DKK)")
-plt.title("FCRD-Up sales income")
-#plt.savefig("FCRUp_Income")
-        
\ No newline at end of file
+figures.append(FigureSpec("FCRDwn_Income", DayLinesFigure, (10, 6),
+                          values=np.hstack(iD_hour_week).T,
+                          ylabel="Income (DKK)",
+                          title="FCRD-Down sales income"))
+
+figures.append(FigureSpec("FCRUp_Income", DayLinesFigure, (10, 6),
+                          values=np.hstack(iU_hour_week).T,
+                          ylabel="Income (DKK)",
+                          title="FCRD-Up sales income"))
+
+# -------------------- Showing or rendering the figures ----------- #
+if report_dir is None:
+    ShowFigures(figures)
+else:
+    RenderFigures(figures, report_dir)
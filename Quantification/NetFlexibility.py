@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the net flexibility quantification, which combines the
+# consumption and the regeneration of the trains. The grid sees the net draw
+# of the trains (consumption - regeneration), so the reserves of the net draw
+# are not those of the consumption and of the regeneration taken apart. The
+# hourly consumption and regeneration of the year, aligned on their 'Time'
+# (see 'LoadYear' in 'ReservesEngine.py'), are reshaped into one
+# (quantity x day of week x week x hour) cube ('JointCube'), whose quantities
+# are the consumption, the regeneration and the net draw ('JOINT_QUANTITIES'):
+    #1. The percentiles and the means of the three quantities are obtained
+    #... from a single 'np.nanquantile' call over the week axis, and their
+    #... reserves follow from them as in 'ReservesCube.py' ('JointReserves'),
+    #2. The joint distribution of the consumption and the regeneration is
+    #... given by their correlation at every (day of week, hour) pair over
+    #... the weeks ('JointCorrelation'), and by their 2D histogram over all
+    #... the hours of the year ('JointHistogram').
+# The reserves of the net draw can be used by the optimization in place of
+# those of the consumption (see 'CreateConsumBaselineDf' in Optimization I).
+# ------------------------------------------------------------------------- #
+
+import numpy as np
+from ReservesCube import WeekdayCube, ReserveTable
+
+JOINT_QUANTITIES = ['consumption', 'regeneration', 'net']
+
+def JointCube(df_year, consumption_column, regeneration_column):
+    """
+    Reshape the hourly consumption and regeneration of 'df_year' (aligned on
+    'Time', with the 'day of week' and 'hour' columns) into an array of shape
+    (3, 7, number of weeks, 24), with the consumption, the regeneration and
+    the net draw (consumption - regeneration) of every slot of 'WeekdayCube'.
+    """
+    consumption = WeekdayCube(df_year, consumption_column)
+    regeneration = WeekdayCube(df_year, regeneration_column)
+    return np.stack([consumption, regeneration, consumption - regeneration])
+
+def JointReserves(cube, P_max, pmin_ratio=0.2, lower_q=0.1, upper_q=0.9):
+    """
+    Return a dictionary with the percentiles and the reserves of every
+    (day of week, hour) pair of each of the 'JOINT_QUANTITIES' of a cube of
+    'JointCube' (see 'ReserveTable'), where 'P_max' holds the maximum value
+    at each hour of each quantity. The reserves of the regeneration are
+    swapped, as in 'ReserveArrays'.
+    """
+    quantiles = np.nanquantile(cube, [lower_q, 0.5, upper_q], axis=2) # Shape (3, 3, 7, 24).
+    mean = np.nanmean(cube, axis=2)
+    return {quantity: ReserveTable(quantiles[0, i], quantiles[1, i], quantiles[2, i], mean[i],
+                                   P_max[quantity], pmin_ratio, quantity == 'regeneration')
+            for i, quantity in enumerate(JOINT_QUANTITIES)}
+
+def JointCorrelation(cube):
+    """
+    Return the correlation of the consumption and the regeneration of a cube
+    of 'JointCube' at every (day of week, hour) pair over the weeks where both
+    have data, as an array of shape (7, 24).
+    """
+    consumption, regeneration = cube[0], cube[1]
+    valid = ~np.isnan(consumption) & ~np.isnan(regeneration)
+    n = valid.sum(axis=1)
+    consumption = np.where(valid, consumption, 0.0)
+    regeneration = np.where(valid, regeneration, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        c = consumption - (consumption.sum(axis=1) / n)[:, None]
+        r = regeneration - (regeneration.sum(axis=1) / n)[:, None]
+        c, r = np.where(valid, c, 0.0), np.where(valid, r, 0.0)
+        return (c * r).sum(axis=1) / np.sqrt((c * c).sum(axis=1) * (r * r).sum(axis=1))
+
+def JointHistogram(cube, bins=20):
+    """
+    Return the 2D histogram of the consumption and the regeneration of a cube
+    of 'JointCube' over all the hours where both have data, as the counts of
+    shape (bins, bins) and the bin edges of the consumption and of the
+    regeneration.
+    """
+    consumption, regeneration = cube[0].ravel(), cube[1].ravel()
+    valid = ~np.isnan(consumption) & ~np.isnan(regeneration)
+    return np.histogram2d(consumption[valid], regeneration[valid], bins=bins)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file adds the 'Data Extraction' and 'Quantification' folders to the
+# module search path, so that the scripts of the 'Quantification' and
+# 'Optimization' folders can import the modules of both folders (eg.
+# 'DataCache.py', 'FigureReport.py', 'CalendarIndex.py', 'ReservesEngine.py')
+# by importing this file first:
+    #1. The scripts of the 'Quantification' folder import it directly, as it
+    #... is located in their own folder,
+    #2. The scripts of the 'Optimization' folders add the 'Quantification'
+    #... folder to the search path first (in 'ConsumBaselineV1.py') and then
+    #... import it, so the scripts importing 'ConsumBaselineV1.py' (eg. the
+    #... 'Main' files) can import the modules of both folders as well.
+# A folder is only added once, no matter how many files import this one.
+# ------------------------------------------------------------------------- #
+
+import os
+import sys
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+FOLDERS = ['Data Extraction', 'Quantification']
+
+for folder in FOLDERS:
+    folder_path = os.path.normpath(os.path.join(PROJECT_DIR, folder))
+    if folder_path not in sys.path:
+        sys.path.append(folder_path)
@@ -19,156 +19,71 @@ import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns  
 from itertools import cycle, islice
+from ReservesEngine import (QuantifyReserves, DayTypeQuantify, BootstrapReserves, RollingQuantify,
+                            SweepQuantify, NetQuantify)
+from ReservesCube import STAT_NAMES
+# 'ProjectPaths.py' adds the 'Data Extraction' folder to the module search path:
+import ProjectPaths
+from FigureReport import (FigureSpec, BoxFigure, DayLinesFigure, SeriesFigure, HistogramFigure,
+                          ShowFigures, RenderFigures)
+from CalendarIndex import JoinCalendar
 
 Months = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12'] 
 Days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-
-list_df = []
-
-df_trains_new = []
-
-df_consum_pivot = []
-df_mean = []
-df_Pmin = []
-df_quantile_10 = []
-df_quantile_50 = []
-df_quantile_90 = []
-df_FCRUp = []
-df_FCRDown = []
-
-df_train_pivot = []
-df_mean_T = []
-
-tot_merged_pivot = []
-q90_series = []
-
-# Appending the dataframes containing the total consumption data at every hour ... 
-# ... of each day of each month in year 2022 into one list: 
-for month in Months:
-    data_path = os.path.join(os.getcwd(),'Data - Month' + month + '.xlsx')
-    #data_path = os.path.join(os.getcwd(),'Test - Dec.xlsx')
-    month_data = pd.read_excel(data_path)
-    list_df.append(month_data) # Having a list containing 12 seperate dataframes...
-    # ... of the hourly consumption data for all days of each month.
-
-df_trains = pd.concat(list_df) # Concatenating the list to obtain a single ...
-# ... dataframe containing the total consumption data of all 12 months of 2022. 
-df_trains['Time'] = pd.to_datetime(df_trains['Time'], dayfirst=True) # This ...
-# ... is to arrange the date in the dataframe in day/month/year format.
-df_trains['Time'] = df_trains['Time'].dt.tz_localize('UTC')
-
-# Extracting the 'Day of Year' of each day for Year 2022:
-df_trains['Day of year'] = df_trains['Time'].dt.dayofyear
-
-# =============================================================================
-# #P_max_consum = df_trains['Total consumption (MWh)'].max()
-# P_max_consum = 3.2281 # Maximum consumption value (Extracted from the 
-# # 5minute data extraction code)
-# max_Val_Arr = np.ones(24, dtype = int) * P_max_consum  # Returns an array having
-# # a shape of 24 with each element's value being equal to 'P_max_consum'.
-# df_Pmax = pd.DataFrame(max_Val_Arr) # Converts 'max_Val_Arr' into a dataframe.
-# =============================================================================
-
-for d in range(7): # To access each day of the week
-    df_train_day = df_trains.loc[df_trains["day of week"] == d] # Filtering 
-    # the dataframe 'df_trains' based on the condition that the day of week for
-    # each day of 2022 being equal to d. 
-    
-    df_hourly = df_train_day.resample('H', on='Time').mean() # Resampling the 
-    # the consumption data in the dataframe to hourly values.
-    df_hourly = df_hourly.reset_index() # Resetting the indicies of the
-    # dataframe to start from 0.
-    
-    
-    # Creating a table with 'Total consumption values' of each 'Day of year' (row-wise)
-    # at each hour (column-wise):
-    df_pivot = pd.pivot_table(df_hourly, values='Total consumption (MWh)', index='Day of year', columns='hour')
-    df_consum_pivot.append(df_pivot) # Appending 'df_pivot' into a list.
-    merged_pivot = pd.concat(df_consum_pivot) # Converting that list to a dataframe.
-    merged_pivot = merged_pivot.reset_index(drop=True) # Resetting the indicies
-    # of the dataframe to start from 0.
-   
-    mean_consum = merged_pivot.mean() # Returns a series containing the mean value
-    # of the consumption values at each hour in the dataframe: 'merged_pivot'
-    df_m = mean_consum.to_frame() # Converting the series into a dataframe
-    df_mean.append(df_m) # Appending 'df_m' into the list: 'df_mean'
-    
-    P_min_consum = 0.2 * mean_consum # Returns a series that has the minimum
-    # consumption at each hour. This was introduced as an assumption considering
-    # the train operator's point of view. 
-    df_Pmin_consum = P_min_consum.to_frame() # Converting the series into a dataframe
-    df_Pmin.append(df_Pmin_consum) # Appending 'df_Pmin_consum' into the list:'df_Pmin'
-    
-    quantile_10 = merged_pivot.quantile(.1, axis = 0) # Returns a series containing 
-    # the 10th percentile of the consumption values at each hour
-    df_q10 = quantile_10.to_frame() # Converting the series into a dataframe
-    df_quantile_10.append(df_q10) # Storing that dataframe in a list
-    
-    quantile_50 = merged_pivot.quantile(.5, axis = 0) # Returns a series containing 
-    # the 50th percentile of the consumption values at each hour
-    df_q50 = quantile_50.to_frame()  # Converting the series into a dataframe
-    df_quantile_50.append(df_q50) # Storing that dataframe in a list
-    
-    quantile_90 = merged_pivot.quantile(.9, axis = 0) # Returns a series containing 
-    # the 90th percentile of the consumption values at each hour
-    q90_series.append(quantile_90)
-    df_q90 = quantile_90.to_frame() # Converting the series into a dataframe
-    df_quantile_90.append(df_q90) # Storing that dataframe in a list
-    
-
-    # FCRD-Up capacity reserves
-    c_Up = quantile_10 - P_min_consum # Calculating the capacity reserves at 
-    # each hour for FCRD-Up services
-    df_cUp = c_Up.to_frame() # Converting the series into a dataframe
-    df_FCRUp.append(df_cUp) # Storing that dataframe in a list
-    
-    
-    tot_merged_pivot.append(merged_pivot) # Storing the 'merged_pivot' dataframe
-    # in the list 'tot_merged_pivot'
-    df_consum_pivot = [] # Emptying the list: 'df_consum_pivot', so that it 
-    # could store the data of the next day of the week
-    
-# FCRD-Down capacity reserves
-df_tot_pivot = pd.concat(tot_merged_pivot) # Gives a data frame containing the
-# total consumption of each hour for the 365 days of year 2022. 
-P_max_consum = df_tot_pivot.max() # Outputs a series containing the maximum
-# consumption value at each hour. 
-df_Pmax = P_max_consum.to_frame() # Converts 'P_max_consum' into a data frame.
-
-
-for d in range(7):
-    c_Down = P_max_consum - q90_series[d] # Calculating the capacity reserves for 
-    # FCRD-Down services
-    df_cDown = c_Down.to_frame() # Converting the series into a dataframe
-    df_FCRDown.append(df_cDown) # Storing that dataframe in a list
-
-
-merged_q10 = pd.concat(df_quantile_10) # Concatenating the hourly 10th percentile 
-# data for each day of the week
-merged_q50 = pd.concat(df_quantile_50) # Concatenating the hourly 50th percentile 
-# data for each day of the week
-merged_q90 = pd.concat(df_quantile_90) # Concatenating the hourly 90th percentile 
-# data for each day of the week
-merged_FCRUp = pd.concat(df_FCRUp) # Concatenating the hourly data for FCRD-Up reserves
-# for each day of the week
-merged_FCRDwn = pd.concat(df_FCRDown) # Concatenating the hourly data for FCRD-Down reserves
-# for each day of the week
-
-# Re-naming the columns:
-merged_q10.columns = ['Q10 values']
-merged_q10 = merged_q10.reset_index()
-
-merged_q50.columns = ['Q50 values']
-merged_q50 = merged_q50.reset_index()
-
-merged_q90.columns = ['Q90 values']
-merged_q90 = merged_q90.reset_index()
-
-merged_FCRUp.columns = ['FCRUp values']
-merged_FCRUp = merged_FCRUp.reset_index()
-
-merged_FCRDwn.columns = ['FCRDown values']
-merged_FCRDwn = merged_FCRDwn.reset_index()
+# Set 'backend' to 'sketch' to estimate the percentiles from mergeable quantile
+# sketches of the months (see 'QuantileSketch.py') instead of the whole year,
+# eg. for several years of data ('data_dirs', one folder per year) or for the
+# 5-minute data ('resolution' = '5min'):
+backend = 'exact'
+data_dirs = [os.getcwd()]
+resolution = 'h'
+# Number of bootstrap resamplings of the days for the confidence bands (at the
+# level 'band_level') of the reserves in the hourly plots, eg. 1000, or 0 for no
+# bands (see 'ReservesBootstrap.py'). The days are resampled from the hourly
+# data of 'data_dirs' (without the holidays if 'exclude_holidays'), so the bands
+# need the hourly 'resolution':
+n_boot = 0
+band_level = 0.9
+# Set 'report_dir' to a folder to render the figures headless into image files
+# in that folder (in parallel, skipping the figures whose data has not changed
+# since the last run, see 'FigureReport.py'), instead of showing them:
+report_dir = None
+# Set 'exclude_holidays' to True to leave the Danish public holidays out of the
+# days of the week, and 'day_types' to True to also plot the reserves of every
+# day type ('Weekday', 'Saturday', 'Sunday' or 'Holiday', see 'CalendarIndex.py'):
+exclude_holidays = False
+day_types = False
+# Set 'net_flexibility' to True to also plot the reserves of the net draw of the
+# trains (consumption - regeneration, from 'RegenData - MonthN.xlsx' too) and the
+# joint distribution of the consumption and the regeneration (see 'NetFlexibility.py'):
+net_flexibility = False
+# Set 'window_weeks' to a number of weeks (eg. 8) to also plot the daily
+# rolling-window reserves, from the same day of the week in the weeks before
+# each day (see 'RollingReserves.py'):
+window_weeks = None
+# Set 'sweep' to True to also plot the sensitivity of the reserves to the ratio
+# of P_min and to the lower and upper percentiles (in place of Q10 and Q90), over
+# the grids below (see 'SweepReserves' in 'ReservesCube.py'):
+sweep = False
+pmin_ratios = [0.1, 0.2, 0.3]
+lower_qs = [0.05, 0.1, 0.2]
+upper_qs = [0.8, 0.9, 0.95]
+
+# Calling the reserves engine (see 'ReservesEngine.py') on the hourly consumption
+# data of all 12 months of 2022 ('Data - MonthN.xlsx'), to obtain for every hour
+# of each day of the week the 10th, 50th and 90th percentiles, the mean, the
+# minimum consumption P_min (0.2 x mean, introduced as an assumption considering
+# the train operator's point of view), the maximum consumption P_max (from the
+# hourly summaries of the extraction), the FCRD-Up reserves (Q10 - P_min) and
+# the FCRD-Down reserves (P_max - Q90):
+df_reserves = QuantifyReserves(['consumption'], Months, data_dirs, pmin_ratio=0.2, backend=backend,
+                               resolution=resolution,
+                               exclude_holidays=exclude_holidays)['consumption'] # One
+# row per (day of week, hour), in the order Monday 00:00, ..., Sunday 23:00.
+if n_boot > 0:
+    df_bands = BootstrapReserves(['consumption'], Months, data_dirs, n_boot=n_boot, level=band_level,
+                                 pmin_ratio=0.2, resolution=resolution,
+                                 exclude_holidays=exclude_holidays)['consumption']
 
 month_31 = [1, 3, 5, 7, 8, 10, 12] # Months having 31 days.
 month_30 = [4, 6, 9, 11] # Months having 30 days.
@@ -198,134 +113,180 @@ df_new.columns = ['Time']
 # Merging the dataframe with 'Time' column with the dataframes containing the 24 hour
 # data of 10th, 50th and 90th percentiles, and FCRD-Up and FCRD-Down capacity reserves
 # for all days of the week:
-df_new_hourly = pd.concat([df_new, merged_q10, merged_q50, merged_q90, merged_FCRUp, merged_FCRDwn], axis=1)
+df_new_hourly = pd.concat([df_new, df_reserves[STAT_NAMES].reset_index(drop=True)], axis=1)
 #df_new_hourly = df_new_hourly.drop("index")
 
 df_new_hourly["Hour"] =df_new_hourly['Time'].dt.hour # Extracting the hour of the day
 
-# Extracting the day name from each date:
-df_new_hourly['Day of week name'] = df_new_hourly['Time'].dt.day_name(locale = 'English') 
-
-# Extracting weekdays and weekends from each date:
-df_new_hourly['Weekday-Weekend'] = df_new_hourly["Time"].dt.weekday < 5
-df_new_hourly['Weekday-Weekend'].replace(True, 'Weekday', inplace=True)
-df_new_hourly['Weekday-Weekend'].replace(False, 'Weekend', inplace=True)
+# The day name and the weekday/weekend of each date, from the calendar index ...
+# ... (see 'CalendarIndex.py'):
+df_new_hourly = JoinCalendar(df_new_hourly, ['Day of week name', 'Weekday-Weekend'])
 
 # ---------------------------- Plotting ----------------------------- #
+# Every figure is collected as a specification (see 'FigureReport.py'), and the
+# figures are shown or rendered at the end:
+figures = []
 
 # ------------ Plotting the percentiles -------------- #
 
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='Q10 values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Total consumption (MW)")
-plt.title("10th percentile of consumption data - grouped hourly") 
-#plt.savefig("box_plot - Q10hourly")
-
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y='Q10 values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)",fontsize=13)
-plt.title("10th percentile of consumption data - grouped weekly", fontsize=15) 
-#plt.savefig("box_plot - Q10weekly")
-
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='Q50 values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Total consumption (MW)")
-plt.title("50th percentile of consumption data - grouped hourly") 
-#plt.savefig("box_plot - Q50hourly")
-
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y='Q50 values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)",fontsize=13)
-plt.title("50th percentile of consumption data - grouped weekly", fontsize=15) 
-#plt.savefig("box_plot - Q50weekly")
-
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='Q90 values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Total consumption (MW)")
-plt.title("90th percentile of consumption data - grouped hourly") 
-#plt.savefig("box_plot - Q90hourly")
-
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y='Q90 values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)",fontsize=13)
-plt.title("90th percentile of consumption data - grouped weekly", fontsize=15) 
-#plt.savefig("box_plot - Q90weekly")
+figures.append(FigureSpec("box_plot - Q10hourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'Q10 values']], x="Hour", y='Q10 values',
+                          xlabel="Hour of day", ylabel="Total consumption (MW)",
+                          title="10th percentile of consumption data - grouped hourly"))
+
+figures.append(FigureSpec("box_plot - Q10weekly", BoxFigure, (12, 6),
+                          df=df_new_hourly[['Day of week name', 'Q10 values']],
+                          x='Day of week name', y='Q10 values', xlabel="Day of week",
+                          ylabel="Total consumption (MW)",
+                          title="10th percentile of consumption data - grouped weekly",
+                          label_size=13, title_size=15))
+
+figures.append(FigureSpec("box_plot - Q50hourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'Q50 values']], x="Hour", y='Q50 values',
+                          xlabel="Hour of day", ylabel="Total consumption (MW)",
+                          title="50th percentile of consumption data - grouped hourly"))
+
+figures.append(FigureSpec("box_plot - Q50weekly", BoxFigure, (12, 6),
+                          df=df_new_hourly[['Day of week name', 'Q50 values']],
+                          x='Day of week name', y='Q50 values', xlabel="Day of week",
+                          ylabel="Total consumption (MW)",
+                          title="50th percentile of consumption data - grouped weekly",
+                          label_size=13, title_size=15))
+
+figures.append(FigureSpec("box_plot - Q90hourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'Q90 values']], x="Hour", y='Q90 values',
+                          xlabel="Hour of day", ylabel="Total consumption (MW)",
+                          title="90th percentile of consumption data - grouped hourly"))
+
+figures.append(FigureSpec("box_plot - Q90weekly", BoxFigure, (12, 6),
+                          df=df_new_hourly[['Day of week name', 'Q90 values']],
+                          x='Day of week name', y='Q90 values', xlabel="Day of week",
+                          ylabel="Total consumption (MW)",
+                          title="90th percentile of consumption data - grouped weekly",
+                          label_size=13, title_size=15))
 
 # ----------------- Plotting the reserves -------------- #
 # ------- FCRD-Up ----------------#
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='FCRUp values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Total consumption (MW)")
-plt.title("Hourly FCRD-Up reserves of consumption data") 
-#plt.savefig("box_plot - Uphourly")
-
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y='FCRUp values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)",fontsize=13)
-plt.title("Weekly FCRD-Up reserves of consumption data", fontsize=15) 
-#plt.savefig("box_plot - Upweekly")
-
-plt.figure(figsize=(10, 6), dpi=80)
-sns.boxplot(x='Weekday-Weekend', y='FCRUp values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Weekday and Weekend")
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)")
-plt.title("FCRD-Up reserves based on weekdays and weekends", fontsize=15) 
-#plt.savefig("box_plot - Upwkd_wend")
+figures.append(FigureSpec("box_plot - Uphourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'FCRUp values']], x="Hour", y='FCRUp values',
+                          xlabel="Hour of day", ylabel="Total consumption (MW)",
+                          title="Hourly FCRD-Up reserves of consumption data"))
+
+figures.append(FigureSpec("box_plot - Upweekly", BoxFigure, (12, 6),
+                          df=df_new_hourly[['Day of week name', 'FCRUp values']],
+                          x='Day of week name', y='FCRUp values', xlabel="Day of week",
+                          ylabel="Total consumption (MW)",
+                          title="Weekly FCRD-Up reserves of consumption data", label_size=13,
+                          title_size=15))
+
+figures.append(FigureSpec("box_plot - Upwkd_wend", BoxFigure, (10, 6),
+                          df=df_new_hourly[['Weekday-Weekend', 'FCRUp values']],
+                          x='Weekday-Weekend', y='FCRUp values', xlabel="Weekday and Weekend",
+                          ylabel="Total consumption (MW)",
+                          title="FCRD-Up reserves based on weekdays and weekends", title_size=15))
 
 # ------- FCRD-Down ----------------#
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="Hour", y='FCRDown values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Total consumption (MW)")
-plt.title("Hourly FCRD-Down reserves of consumption data") 
-#plt.savefig("box_plot - Dwnhourly")
-
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y='FCRDown values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)",fontsize=13)
-plt.title("Weekly FCRD-Down reserves of consumption data", fontsize=15) 
-#plt.savefig("box_plot - Dwnweekly")
-
-plt.figure(figsize=(10, 6), dpi=80)
-sns.boxplot(x='Weekday-Weekend', y='FCRDown values', data=df_new_hourly, palette="Set1")
-plt.xlabel("Weekday and Weekend")
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)")
-plt.title("FCRD-Down reserves based on weekdays and weekends", fontsize=15) 
-#plt.savefig("box_plot - Dwnwkd_wend")
+figures.append(FigureSpec("box_plot - Dwnhourly", BoxFigure, (8, 4),
+                          df=df_new_hourly[["Hour", 'FCRDown values']], x="Hour",
+                          y='FCRDown values', xlabel="Hour of day", ylabel="Total consumption (MW)",
+                          title="Hourly FCRD-Down reserves of consumption data"))
+
+figures.append(FigureSpec("box_plot - Dwnweekly", BoxFigure, (12, 6),
+                          df=df_new_hourly[['Day of week name', 'FCRDown values']],
+                          x='Day of week name', y='FCRDown values', xlabel="Day of week",
+                          ylabel="Total consumption (MW)",
+                          title="Weekly FCRD-Down reserves of consumption data", label_size=13,
+                          title_size=15))
+
+figures.append(FigureSpec("box_plot - Dwnwkd_wend", BoxFigure, (10, 6),
+                          df=df_new_hourly[['Weekday-Weekend', 'FCRDown values']],
+                          x='Weekday-Weekend', y='FCRDown values', xlabel="Weekday and Weekend",
+                          ylabel="Total consumption (MW)",
+                          title="FCRD-Down reserves based on weekdays and weekends", title_size=15))
 
 # -------------------- Hourly plots for all 7 days of the week ----------- #
 
 # ------- Capacity reserves --------------- #
-plt.figure(figsize=(10, 6), dpi=80)
-for d in range(7):
-    plt.plot(df_FCRDown[d])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Capacity reserve (MW)")
-plt.title("Available FCRD-Down Reserves")  
-#plt.savefig("FCRDwn_Res_Weekly")
-
-plt.figure(figsize=(10, 6), dpi=80)
-for d in range(7):
-    plt.plot(df_FCRUp[d])
-plt.legend( ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], loc = "upper right")
-plt.xlabel("Hour of day")
-plt.ylabel("Capacity reserve (MW)")
-plt.title("Available FCRD-Up Reserves")  
-#plt.savefig("FCRUp_Res_Weekly")
\ No newline at end of file
+# The confidence bands of the reserves of every day, as arrays of shape (7, 24):
+bands = {}
+if n_boot > 0:
+    bands = {name: df_bands[name].to_numpy().reshape(7, 24) for name in df_bands.columns}
+figures.append(FigureSpec("FCRDwn_Res_Weekly", DayLinesFigure, (10, 6),
+                          values=df_reserves['FCRDown values'].to_numpy().reshape(7, 24),
+                          ylabel="Capacity reserve (MW)", title="Available FCRD-Down Reserves",
+                          low=bands.get('FCRDown values low'),
+                          high=bands.get('FCRDown values high')))
+
+figures.append(FigureSpec("FCRUp_Res_Weekly", DayLinesFigure, (10, 6),
+                          values=df_reserves['FCRUp values'].to_numpy().reshape(7, 24),
+                          ylabel="Capacity reserve (MW)", title="Available FCRD-Up Reserves",
+                          low=bands.get('FCRUp values low'),
+                          high=bands.get('FCRUp values high')))
+
+# -------------------- Rolling-window reserves over the year ----------- #
+if window_weeks is not None:
+    df_rolling = RollingQuantify(['consumption'], Months, data_dirs, weeks=window_weeks,
+                                 pmin_ratio=0.2)['consumption']
+    # Mean reserves over the hours of each day:
+    df_daily = df_rolling.groupby(df_rolling['Time'].dt.normalize())[['FCRUp values',
+                                                                       'FCRDown values']].mean()
+    figures.append(FigureSpec("Rolling_Res_Daily", SeriesFigure, (12, 6), df=df_daily,
+                              xlabel="Day", ylabel="Capacity reserve (MW)",
+                              title=("Daily mean reserves over the last " + str(window_weeks)
+                                     + " weeks"),
+                              legend=["FCRD-Up", "FCRD-Down"]))
+
+# -------------------- Sensitivity of the reserves to the assumptions ----------- #
+if sweep:
+    df_sweep = SweepQuantify(['consumption'], Months, data_dirs, pmin_ratios, lower_qs,
+                             upper_qs)['consumption']
+    # Mean reserves over all hours of the week, for each assumption:
+    df_up = df_sweep.groupby(['Pmin ratio', 'lower q'])['FCRUp values'].mean().unstack()
+    df_down = df_sweep.groupby('upper q')['FCRDown values'].mean()
+    figures.append(FigureSpec("Sweep_Res_Up", SeriesFigure, (10, 6), df=df_up,
+                              xlabel="Ratio of P_min to the mean",
+                              ylabel="Mean capacity reserve (MW)",
+                              title="Sensitivity of the FCRD-Up reserves",
+                              legend=["Lower percentile " + str(q) for q in df_up.columns],
+                              marker='o'))
+    figures.append(FigureSpec("Sweep_Res_Down", SeriesFigure, (10, 6), df=df_down.to_frame(),
+                              xlabel="Upper percentile", ylabel="Mean capacity reserve (MW)",
+                              title="Sensitivity of the FCRD-Down reserves", marker='o'))
+
+# -------------------- Reserves of every day type ----------- #
+if day_types:
+    df_types = DayTypeQuantify(['consumption'], Months, data_dirs, pmin_ratio=0.2)['consumption']
+    for column, name, short in [('FCRDown values', 'FCRD-Down', 'FCRDwn'),
+                                ('FCRUp values', 'FCRD-Up', 'FCRUp')]:
+        df_type = df_types[column].unstack(level='Day type') # One column per day type ...
+        df_type = df_type[df_types.index.unique('Day type')] # ... in the order of 'DAY_TYPES'.
+        figures.append(FigureSpec(short + "_Res_DayTypes", SeriesFigure, (10, 6),
+                                  df=df_type, xlabel="Hour of day", ylabel="Capacity reserve (MW)",
+                                  title="Available " + name + " Reserves per day type",
+                                  legend=list(df_type.columns)))
+
+# -------------------- Net flexibility of the trains ----------- #
+if net_flexibility:
+    flexibility = NetQuantify(Months, data_dirs, pmin_ratio=0.2, exclude_holidays=exclude_holidays)
+    for column, name, short in [('FCRDown values', 'FCRD-Down', 'FCRDwn'),
+                                ('FCRUp values', 'FCRD-Up', 'FCRUp')]:
+        figures.append(FigureSpec("Net - " + short + "_Res_Weekly", DayLinesFigure, (10, 6),
+                                  values=flexibility['net'][column].to_numpy().reshape(7, 24),
+                                  ylabel="Capacity reserve (MW)",
+                                  title="Available " + name + " Reserves of the net draw"))
+    figures.append(FigureSpec("Net - Correlation_Weekly", DayLinesFigure, (10, 6),
+                              values=flexibility['correlation']['Correlation'].to_numpy().reshape(7, 24),
+                              ylabel="Correlation",
+                              title="Correlation of the consumption and the regeneration"))
+    histogram = flexibility['histogram']
+    figures.append(FigureSpec("Net - Joint_Histogram", HistogramFigure, (8, 6),
+                              counts=histogram['counts'], x_edges=histogram['consumption edges'],
+                              y_edges=histogram['regeneration edges'],
+                              xlabel="Total consumption (MW)", ylabel="Total regeneration (MW)",
+                              title="Joint distribution of the consumption and the regeneration"))
+
+# -------------------- Showing or rendering the figures ----------- #
+if report_dir is None:
+    ShowFigures(figures)
+else:
+    RenderFigures(figures, report_dir)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains mergeable quantile sketches of the values of every
+# (day of week, hour) group, in the style of the t-digest. They are used by
+# the reserves engine ('ReservesEngine.py', backend='sketch') to obtain the
+# percentiles of several years of data, at any resolution, without keeping all
+# the values in memory: every month is summarised by a small sketch
+# ('MonthSketch'), and the sketches of the months are merged ('MergeSketches').
+# A sketch holds, for every group, a sorted list of centroids (mean, weight),
+# each standing for 'weight' values around 'mean'. The sketches of all groups
+# are kept in the same arrays, so that they are built, merged and queried at
+# once, without looping over the groups:
+    #1. The centroids of a group are placed on the scale
+    #... k(q) = compression / (2 pi) x arcsin(2q - 1), where q is the share of
+    #... the values of the group below the centroid, and the centroids that lie
+    #... entirely within the same unit of k are merged into one (with the
+    #... weighted mean). A centroid that crosses the end of its unit (which
+    #... can happen to the centroids of earlier merges) is kept on its own,
+    #2. A quantile is read by linear interpolation between the centres of the
+    #... centroids, in the same way as 'np.quantile'.
+# Error bounds: the scale k is steeper in the tails, so a merged centroid at
+# the quantile q holds at most a share 2 pi sqrt(q(1 - q)) / compression of
+# the values of its group (one unit of k), also after any number of merges, and
+# the rank of an estimated quantile is within half of that share of q (plus the
+# rank step 1/n of the n values of the group): 0.94 / compression for Q10 and
+# Q90, and 1.57 / compression for Q50 (about 0.5 % and 0.8 % of the values with
+# the default compression of 200). The bound is on the rank of the estimate
+# among the values, so it holds for values without ties: when many values are
+# equal (eg. rounded values), an estimate just above a run of equal values
+# ranks after the whole run, although it is within the gap between two
+# adjacent values of the data. As long as a group holds fewer than about
+# compression / pi values, no centroids are merged and the quantiles are
+# exactly those of 'np.quantile'. The mean of every group is always exact, as
+# merging centroids keeps their sum, and so is its maximum, which is kept
+# apart from the centroids (it gives P_max at the resolution of the values of
+# the sketch, see 'SketchMax'). The errors against the exact quantiles
+# of the data in the current folder are printed by running this file.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+
+N_GROUPS = 7 * 24 # Number of (day of week, hour) groups.
+
+def NewSketch():
+    """Create an empty sketch"""
+    return {'group': np.empty(0, dtype=np.int64), 'mean': np.empty(0), 'weight': np.empty(0),
+            'max': np.full(N_GROUPS, -np.inf)} # Maximum value of every group.
+
+def Compress(sketch, compression=200):
+    """
+    Sort the centroids of every group by mean and merge the centroids that
+    lie within the same unit of the scale k (see the top of this file).
+    """
+    group, mean, weight = sketch['group'], sketch['mean'], sketch['weight']
+    if len(group) == 0:
+        return NewSketch()
+    order = np.lexsort((mean, group))
+    group, mean, weight = group[order], mean[order], weight[order]
+
+    # Shares of the values of its group below and up to each centroid:
+    n_group = np.bincount(group, weights=weight, minlength=N_GROUPS)
+    cum = np.cumsum(weight)
+    start = np.searchsorted(group, group) # First centroid of the group of each centroid.
+    before = cum - weight - (cum[start] - weight[start]) # Weight of the group before it.
+    q_left = before / n_group[group]
+    q_right = np.minimum((before + weight) / n_group[group], 1)
+
+    scale = lambda q: compression / (2 * np.pi) * np.arcsin(2 * q - 1) + compression / 4
+    k = np.floor(scale(q_left)).astype(np.int64) # Unit of k where each centroid starts.
+    # Only the centroids that lie within a single unit of k are merged, so that ...
+    # ... a merged centroid never holds more than one unit. A centroid that ...
+    # ... crosses the end of its unit (eg. a centroid of an earlier merge, which ...
+    # ... can only be the last centroid of its unit) is kept on its own:
+    crossing = scale(q_right) > k + 1 + 1e-9
+    key = group * (compression + 2) + 2 * k + crossing # Centroids merged together.
+    first = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) # First centroid of each unit.
+    new_weight = np.add.reduceat(weight, first)
+    return {'group': group[first], 'mean': np.add.reduceat(weight * mean, first) / new_weight,
+            'weight': new_weight, 'max': sketch['max']}
+
+def MonthSketch(df_month, column, compression=200):
+    """
+    Return the sketch of the values of 'column' in 'df_month' (hourly or
+    finer data, with the 'day of week' and 'hour' columns of the extracted
+    data), grouped by (day of week, hour). Empty values are left out.
+    """
+    values = df_month[column].to_numpy(dtype=float)
+    group = (df_month['day of week'].to_numpy(dtype=np.int64) * 24
+             + df_month['hour'].to_numpy(dtype=np.int64))
+    valid = ~np.isnan(values)
+    group_max = np.full(N_GROUPS, -np.inf)
+    np.maximum.at(group_max, group[valid], values[valid])
+    return Compress({'group': group[valid], 'mean': values[valid],
+                     'weight': np.ones(valid.sum()), 'max': group_max}, compression)
+
+def MergeSketches(sketches, compression=200):
+    """Merge several sketches (eg. of months or of years) into one"""
+    sketches = list(sketches)
+    merged = {name: np.concatenate([sketch[name] for sketch in sketches])
+              for name in ['group', 'mean', 'weight']}
+    merged['max'] = np.max([sketch['max'] for sketch in sketches], axis=0)
+    return Compress(merged, compression)
+
+def SketchQuantiles(sketch, quantiles):
+    """
+    Return the given quantiles of every group of a compressed sketch, as an
+    array of shape (number of quantiles, 7, 24), NaN for the empty groups.
+    """
+    group, mean, weight = sketch['group'], sketch['mean'], sketch['weight']
+    n_group = np.bincount(group, weights=weight, minlength=N_GROUPS)
+    out = np.full((len(quantiles), N_GROUPS), np.nan)
+    if len(group) == 0:
+        return out.reshape(len(quantiles), 7, 24)
+
+    # Rank of the centre of each centroid within its group (the rank of a ...
+    # ... single value is its position, as in 'np.quantile'):
+    cum = np.cumsum(weight)
+    start = np.searchsorted(group, group)
+    centre = cum - weight - (cum[start] - weight[start]) + (weight - 1) / 2
+    span = n_group.max() + 1 # Offset of the ranks of every group, to search them at once.
+    position = group * span + centre
+
+    present = np.flatnonzero(n_group > 0)
+    first = np.searchsorted(group, present) # First centroid of each group.
+    last = np.searchsorted(group, present, side='right') - 1 # Last centroid of each group.
+    for i, q in enumerate(quantiles):
+        target = q * (n_group[present] - 1) # Rank of the quantile within each group.
+        right = np.searchsorted(position, present * span + target, side='left')
+        right = np.clip(right, first, last)
+        left = np.clip(right - 1, first, last)
+        gap = centre[right] - centre[left] # Zero when both are the same centroid.
+        frac = (target - centre[left]) / np.where(gap > 0, gap, 1)
+        frac = np.where(gap > 0, np.clip(frac, 0, 1), 0)
+        out[i, present] = mean[left] + frac * (mean[right] - mean[left])
+    return out.reshape(len(quantiles), 7, 24)
+
+def SketchMean(sketch):
+    """Return the mean of every group of a sketch, as an array of shape (7, 24)"""
+    n_group = np.bincount(sketch['group'], weights=sketch['weight'], minlength=N_GROUPS)
+    total = np.bincount(sketch['group'], weights=sketch['weight'] * sketch['mean'],
+                        minlength=N_GROUPS)
+    with np.errstate(invalid='ignore'):
+        return (total / n_group).reshape(7, 24)
+
+def SketchMax(sketch):
+    """
+    Return the maximum value at each hour of the day over the groups of a
+    sketch (as 'StatsPmax' in 'HourlyStats.py'), as an array of shape (24,),
+    NaN for the hours without values.
+    """
+    hour_max = sketch['max'].reshape(7, 24).max(axis=0)
+    return np.where(np.isfinite(hour_max), hour_max, np.nan)
+
+if __name__ == '__main__':
+    import os
+    # 'ProjectPaths.py' adds the 'Data Extraction' folder to the module search path:
+    import ProjectPaths
+    from DataCache import ReadExcelCached
+    from FrameSchema import CompactHourly
+
+    # Comparing the sketch of the consumption data of the year in the current ...
+    # ... folder with the exact quantiles, in value and in rank. Equal values ...
+    # ... share a range of ranks, so the rank error of an estimate is the ...
+    # ... distance of q from the range of ranks of the values equal to it (up ...
+    # ... to rounding), which is zero for the exact quantile:
+    Months = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
+    column = 'Total consumption (MWh)'
+    list_df = [ReadExcelCached(os.path.join(os.getcwd(), 'Data - Month' + month + '.xlsx'),
+                               CompactHourly) for month in Months]
+    for compression in [25, 50, 200]:
+        sketch = MergeSketches([MonthSketch(df, column, compression) for df in list_df],
+                               compression)
+        df_year = pd.concat(list_df, ignore_index=True)
+        values = df_year.groupby(['day of week', 'hour'])[column]
+        for q, estimate in zip([0.1, 0.5, 0.9], SketchQuantiles(sketch, [0.1, 0.5, 0.9])):
+            exact = values.quantile(q).to_numpy().reshape(7, 24)
+            rank_error = np.zeros(7 * 24)
+            for i, ((_, g), e) in enumerate(zip(values, estimate.ravel())):
+                g = np.sort(g.to_numpy(dtype=float))
+                tol = 1e-6 * max(1, abs(e)) # Rounding of the float32 values.
+                low = np.searchsorted(g, e - tol, side='left') / len(g) # Share below e.
+                high = np.searchsorted(g, e + tol, side='right') / len(g) # Share up to e.
+                rank_error[i] = max(0, low - q, q - high)
+            print('compression', compression, 'Q' + str(int(q * 100)),
+                  '- max error:', np.abs(estimate - exact).max(),
+                  'MWh, max rank error:', rank_error.max(),
+                  '(bound', round(np.pi * np.sqrt(q * (1 - q)) / compression
+                                  + 1 / values.size().min(), 4), ')')
+        print('centroids:', len(sketch['group']), 'values:', len(df_year))
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the bootstrap confidence bands of the percentiles and the
+# FCRD capacity reserves. The reserves of every (day of week, hour) pair are
+# obtained from about 52 days of the year, so they are uncertain. The days of
+# every day of the week are resampled with replacement many times, and the
+# spread of the reserves over the replicates gives their confidence bands:
+    #1. The days with data of every day of the week are moved to the front of
+    #... the week axis of the cube of 'WeekdayCube', and the replicates draw
+    #... their days among them (one index per day of the replicate),
+    #2. A batch of replicates is taken from the cube with a single indexing
+    #... operation, into an array of shape (replicates, 7, weeks, 24), and is
+    #... sorted along the week axis, so that Q10 and Q90 are read by position
+    #... (with the linear interpolation of 'np.quantile') for all the
+    #... replicates at once,
+    #3. The reserves of every replicate follow from its percentiles and mean
+    #... (see 'ReserveArrays' in 'ReservesCube.py'), and the bands are the
+    #... percentiles of the replicates, eg. 5 % and 95 % for a level of 90 %.
+# P_max is the maximum value at each hour from the hourly summaries, and is
+# kept fixed. The replicates are drawn in batches ('batch') to bound the memory.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+from ReservesCube import STAT_NAMES, ReserveArrays
+
+BAND_STATS = ['Q10 values', 'Q90 values', 'FCRUp values', 'FCRDown values'] # Statistics with bands.
+
+def SortedQuantiles(values, quantiles, axis):
+    """
+    Return the given quantiles of 'values' along 'axis' (as 'np.nanquantile'),
+    from values sorted along that axis with the NaN values last.
+    """
+    count = np.sum(~np.isnan(values), axis=axis, keepdims=True)
+    out = []
+    for q in quantiles:
+        position = q * (count - 1)
+        lo = np.floor(np.maximum(position, 0)).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+        low = np.take_along_axis(values, lo, axis=axis)
+        high = np.take_along_axis(values, hi, axis=axis)
+        value = low + (position - lo) * (high - low)
+        out.append(np.where(count > 0, value, np.nan).squeeze(axis))
+    return out
+
+def BootstrapStats(cube, P_max, n_boot=1000, pmin_ratio=0.2, regeneration=False, seed=0,
+                   batch=250):
+    """
+    Return the 'STAT_NAMES' statistics of 'n_boot' bootstrap replicates of a
+    cube of 'WeekdayCube', as an array of shape (n_boot, 8, 7, 24). See
+    'ReserveArrays' for 'P_max', 'pmin_ratio' and 'regeneration'.
+    """
+    rng = np.random.default_rng(seed)
+    # Moving the days with data of every day of the week to the front:
+    valid = ~np.all(np.isnan(cube), axis=2) # Shape (7, weeks).
+    order = np.argsort(~valid, axis=1, kind='stable')
+    cube = np.take_along_axis(cube, order[:, :, None], axis=1)
+    n_days = valid.sum(axis=1) # Number of days of every day of the week.
+    weeks = cube.shape[1]
+    empty = np.arange(weeks) >= n_days[:, None] # Slots beyond the days of the day of the week.
+
+    stats = np.empty((n_boot, len(STAT_NAMES), 7, 24))
+    for start in range(0, n_boot, batch):
+        size = min(batch, n_boot - start)
+        day = (rng.random((size, 7, weeks)) * n_days[:, None]).astype(np.int64)
+        sample = cube[np.arange(7)[None, :, None], day] # Shape (size, 7, weeks, 24).
+        sample[:, empty] = np.nan
+        mean = np.nanmean(sample, axis=2)
+        sample.sort(axis=2) # NaN values are sorted last.
+        q10, q50, q90 = SortedQuantiles(sample, [0.1, 0.5, 0.9], axis=2)
+        stats[start:start + size] = np.moveaxis(
+            ReserveArrays(q10, q50, q90, mean, P_max, pmin_ratio, regeneration), 0, 1)
+    return stats
+
+def BootstrapBands(cube, P_max, n_boot=1000, level=0.9, pmin_ratio=0.2, regeneration=False,
+                   seed=0):
+    """
+    Return the confidence bands (at the given 'level') of the 'BAND_STATS'
+    statistics of every (day of week, hour) pair of a cube of 'WeekdayCube',
+    as a dataframe indexed by 'day of week' and 'hour', with a 'low' and a
+    'high' column per statistic (eg. 'FCRUp values low').
+    """
+    stats = BootstrapStats(cube, P_max, n_boot, pmin_ratio, regeneration, seed)
+    stats = stats[:, [STAT_NAMES.index(name) for name in BAND_STATS]]
+    stats.sort(axis=0)
+    low, high = SortedQuantiles(stats, [(1 - level) / 2, (1 + level) / 2], axis=0)
+    index = pd.MultiIndex.from_product([range(7), range(24)], names=['day of week', 'hour'])
+    df_bands = pd.DataFrame(index=index)
+    for i, name in enumerate(BAND_STATS):
+        df_bands[name + ' low'] = low[i].ravel()
+        df_bands[name + ' high'] = high[i].ravel()
+    return df_bands
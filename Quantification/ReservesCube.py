@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the quantification of the percentiles and the FCRD
+# capacity reserves of the hourly data of a year, for each hour of each day of
+# the week, as used by 'Qs and Reserves.py' and 'Regen-Qs and Reserves - V1.py'.
+# Instead of filtering, resampling and pivoting the data once for every day of
+# the week, the year is reshaped once into a (day of week x week x hour) cube
+# ('WeekdayCube'), where the week slots that have no data (eg. the first days
+# of the year before the first Monday) are NaN. The percentiles of every
+# (day of week, hour) pair are then obtained from a single 'np.nanquantile'
+# call over the week axis ('ReserveStats'), and the reserves follow from them:
+    #1. The minimum value at each hour is P_min = pmin_ratio x mean,
+    #2. The reserve below the usual value is Q10 - P_min, and the reserve above
+    #... it is P_max - Q90, where P_max is the maximum value at each hour (see
+    #... 'StatsPmax' in 'HourlyStats.py').
+# For the consumption, the reserve below is the FCRD-Up reserve (the trains
+# can consume less) and the reserve above the FCRD-Down reserve. For the
+# regeneration, it is the other way around. The percentiles Q10 and Q90 and
+# the ratio of P_min can be changed, and 'SweepReserves' computes the reserves
+# of whole grids of them at once, for sensitivity studies. The days can also be
+# grouped by other day codes than the day of the week, eg. by the day type of
+# the calendar index ('Weekday', 'Saturday', 'Sunday' or 'Holiday', see
+# 'CalendarIndex.py'), with 'GroupCube' and 'GroupReserves'.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+
+# Columns of the dataframe of 'ReserveStats', in the order of the statistics:
+STAT_NAMES = ['Q10 values', 'Q50 values', 'Q90 values', 'Mean', 'Pmin', 'Pmax', 'FCRUp values',
+              'FCRDown values']
+
+def WeekdayCube(df_hourly, column):
+    """
+    Reshape the hourly values of 'column' in 'df_hourly' (with the 'Time',
+    'day of week' and 'hour' columns of the extracted data) into an array of
+    shape (7, number of weeks, 24). Element [d, w, h] is the value at hour h of
+    the day d of the week (Monday=0) in the w-th week since the first day of
+    the data, and NaN without data.
+    """
+    days = df_hourly['Time'].dt.normalize()
+    day_num = ((days - days.min()).dt.days).to_numpy() # Days since the first day.
+    weekday = df_hourly['day of week'].to_numpy(dtype=np.int64)
+    hour = df_hourly['hour'].to_numpy(dtype=np.int64)
+    # The days with the same day of the week are 7 days apart, so every one of ...
+    # ... them has its own week slot:
+    week = day_num // 7
+
+    cube = np.full((7, week.max() + 1, 24), np.nan)
+    cube[weekday, week, hour] = df_hourly[column].to_numpy(dtype=float)
+    return cube
+
+def GroupCube(df_hourly, column, codes, n_groups):
+    """
+    Reshape the hourly values of 'column' in 'df_hourly' into an array of
+    shape (n_groups, number of days of the largest group, 24), where the days
+    are grouped by the group code of every row ('codes', from 0 to
+    n_groups - 1, the same for all the hours of a day). Element [g, i, h] is
+    the value at hour h of the i-th day of group g, and NaN without data.
+    """
+    days = df_hourly['Time'].dt.normalize()
+    day_num = ((days - days.min()).dt.days).to_numpy() # Days since the first day.
+    codes = np.asarray(codes, dtype=np.int64)
+    hour = df_hourly['hour'].to_numpy(dtype=np.int64)
+    # Rank of every day within its group, from the sorted (group, day) pairs:
+    pairs, inverse = np.unique(codes * (day_num.max() + 1) + day_num, return_inverse=True)
+    group = pairs // (day_num.max() + 1)
+    rank = np.arange(len(pairs)) - np.searchsorted(group, group)
+
+    cube = np.full((n_groups, rank.max() + 1, 24), np.nan)
+    cube[codes, rank[inverse], hour] = df_hourly[column].to_numpy(dtype=float)
+    return cube
+
+def ReserveStats(cube, P_max, pmin_ratio=0.2, regeneration=False, lower_q=0.1, upper_q=0.9):
+    """
+    Return the percentiles, the mean, P_min, P_max and the FCRD-Up and
+    FCRD-Down reserves of every (day of week, hour) pair of a cube of
+    'WeekdayCube' (see 'ReserveTable'). The 'Q10 values' and 'Q90 values'
+    hold the lower and upper percentiles ('lower_q' and 'upper_q').
+    """
+    q10, q50, q90 = np.nanquantile(cube, [lower_q, 0.5, upper_q], axis=1) # Each of shape (7, 24).
+    return ReserveTable(q10, q50, q90, np.nanmean(cube, axis=1), P_max, pmin_ratio,
+                        regeneration)
+
+def ReserveTable(q10, q50, q90, mean, P_max, pmin_ratio=0.2, regeneration=False):
+    """
+    Return the percentiles, the mean, P_min, P_max and the FCRD-Up and
+    FCRD-Down reserves of every (day of week, hour) pair, from the
+    percentiles and the mean of shape (7, 24), as a dataframe indexed by
+    'day of week' and 'hour' with the 'STAT_NAMES' columns (see
+    'ReserveArrays').
+    """
+    stats = ReserveArrays(q10, q50, q90, mean, P_max, pmin_ratio, regeneration)
+    index = pd.MultiIndex.from_product([range(7), range(24)], names=['day of week', 'hour'])
+    return pd.DataFrame(stats.reshape(len(STAT_NAMES), -1).T, index=index, columns=STAT_NAMES)
+
+def GroupReserves(cube, groups, P_max, pmin_ratio=0.2, regeneration=False, lower_q=0.1,
+                  upper_q=0.9, name='Day type'):
+    """
+    Return the 'STAT_NAMES' statistics of every (group, hour) pair of a cube
+    of 'GroupCube', as a dataframe indexed by the group labels ('groups',
+    under 'name') and 'hour' (see 'ReserveStats').
+    """
+    q10, q50, q90 = np.nanquantile(cube, [lower_q, 0.5, upper_q], axis=1)
+    stats = ReserveArrays(q10, q50, q90, np.nanmean(cube, axis=1), P_max, pmin_ratio, regeneration)
+    index = pd.MultiIndex.from_product([groups, range(24)], names=[name, 'hour'])
+    return pd.DataFrame(stats.reshape(len(STAT_NAMES), -1).T, index=index, columns=STAT_NAMES)
+
+def ReserveArrays(q10, q50, q90, mean, P_max, pmin_ratio=0.2, regeneration=False):
+    """
+    Return the 'STAT_NAMES' statistics stacked into one array, from the
+    percentiles and the mean of the same shape, whose last axis is the hour
+    of the day. 'P_max' holds the maximum value at each hour of the day. With
+    'regeneration=True', the reserves below and above the usual value are the
+    FCRD-Down and FCRD-Up reserves instead.
+    """
+    P_min = pmin_ratio * mean
+    below = q10 - P_min # Reserve below the usual value.
+    P_max = np.broadcast_to(np.asarray(P_max, dtype=float), q90.shape)
+    above = P_max - q90 # Reserve above the usual value.
+    up, down = (above, below) if regeneration else (below, above)
+    return np.stack([q10, q50, q90, mean, P_min, P_max, up, down])
+
+def SweepReserves(cube, P_max, pmin_ratios, lower_qs, upper_qs, regeneration=False):
+    """
+    Return the FCRD-Up and FCRD-Down reserves of every (day of week, hour) pair
+    of a cube of 'WeekdayCube', for every combination of the ratios of P_min
+    ('pmin_ratios') and of the lower and upper percentiles ('lower_qs' and
+    'upper_qs', in place of Q10 and Q90), as a dataframe indexed by 'Pmin
+    ratio', 'lower q', 'upper q', 'day of week' and 'hour'. All the
+    percentiles are obtained from a single 'np.nanquantile' call.
+    """
+    pmin_ratios, lower_qs, upper_qs = (np.asarray(grid, dtype=float)
+                                       for grid in [pmin_ratios, lower_qs, upper_qs])
+    levels, inverse = np.unique(np.concatenate([lower_qs, upper_qs]), return_inverse=True)
+    quantiles = np.nanquantile(cube, levels, axis=1) # Shape (levels, 7, 24).
+    lower = quantiles[inverse[:len(lower_qs)]]
+    upper = quantiles[inverse[len(lower_qs):]]
+    mean = np.nanmean(cube, axis=1)
+
+    shape = (len(pmin_ratios), len(lower_qs), len(upper_qs), 7, 24)
+    # Reserve below the usual value, of shape (ratios, lower_qs, 1, 7, 24):
+    below = (lower[None] - pmin_ratios[:, None, None, None] * mean)[:, :, None]
+    # Reserve above the usual value, of shape (1, 1, upper_qs, 7, 24):
+    above = (np.asarray(P_max, dtype=float) - upper)[None, None]
+    up, down = (above, below) if regeneration else (below, above)
+    index = pd.MultiIndex.from_product([pmin_ratios, lower_qs, upper_qs, range(7), range(24)],
+                                       names=['Pmin ratio', 'lower q', 'upper q', 'day of week',
+                                              'hour'])
+    return pd.DataFrame({'FCRUp values': np.broadcast_to(up, shape).ravel(),
+                         'FCRDown values': np.broadcast_to(down, shape).ravel()}, index=index)
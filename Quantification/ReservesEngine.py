@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the reserves engine, which quantifies the percentiles and
+# the FCRD capacity reserves of a year of extracted data for each hour of each
+# day of the week (see 'ReservesCube.py'), for any of the quantities:
+    #1. 'consumption' ('Data - MonthN.xlsx', 'Stats - MonthN.xlsx'),
+    #2. 'regeneration' ('RegenData - MonthN.xlsx', 'RegenStats - MonthN.xlsx'),
+    #... for which the FCRD-Up and FCRD-Down reserves are swapped,
+    #3. 'net' ('NetData - MonthN.xlsx', 'NetStats - MonthN.xlsx').
+# The monthly files of all the requested quantities are loaded once into a
+# single dataframe of the year ('LoadYear'), from which the reserves of every
+# quantity are computed ('QuantifyReserves'), or those of grids of the ratio
+# of P_min and of the percentiles ('SweepQuantify'). Alternatively
+# (backend='sketch'), every month is summarised by a mergeable quantile sketch
+# ('SketchYear', see 'QuantileSketch.py'), so that several years of data (a
+# list of folders) and the finer resolutions (eg. '5min') can be used without
+# holding all of their values in memory (P_max is then the maximum of the
+# values of the sketches, at their resolution). The rolling-window reserves of
+# every day, from the weeks just before it, are obtained with 'RollingQuantify'
+# (see 'RollingReserves.py'), and the bootstrap confidence bands of the yearly
+# reserves with 'BootstrapReserves' (see 'ReservesBootstrap.py'). The Danish
+# public holidays can be left out of the days of the week, and of P_max
+# ('exclude_holidays'), and the reserves of every day type of the calendar
+# index ('Weekday', 'Saturday', 'Sunday' or 'Holiday', see 'CalendarIndex.py')
+# are obtained with 'DayTypeQuantify'. The consumption and the regeneration
+# are combined into the reserves of the net draw of the trains, with their
+# joint distribution, by 'NetQuantify' (see 'NetFlexibility.py'). Nothing is
+# plotted or written, so the engine can be imported and called by the
+# quantification scripts ('Qs and Reserves.py', 'Regen-Qs and Reserves - V1.py')
+# and by the optimization ('ConsumBaselineV1.py') alike.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import os
+# 'ProjectPaths.py' adds the 'Data Extraction' folder to the module search path:
+import ProjectPaths
+from DataCache import ReadExcelCached
+from FrameSchema import CompactHourly
+from HourlyStats import ReadStats, StatsPmax
+from CalendarIndex import DAY_TYPES, JoinCalendar, DropHolidays
+from ReservesCube import (WeekdayCube, GroupCube, ReserveStats, ReserveTable, GroupReserves,
+                          SweepReserves)
+from QuantileSketch import (NewSketch, MonthSketch, MergeSketches, SketchQuantiles, SketchMean,
+                            SketchMax)
+from RollingReserves import RollingReserves
+from ReservesBootstrap import BootstrapBands
+from NetFlexibility import (JOINT_QUANTITIES, JointCube, JointReserves, JointCorrelation,
+                            JointHistogram)
+
+# Files, column and reserve convention of each quantity:
+QUANTITIES = {
+    'consumption': {'data': 'Data - Month', 'stats': 'Stats - Month',
+                    'column': 'Total consumption (MWh)', 'regeneration': False},
+    'regeneration': {'data': 'RegenData - Month', 'stats': 'RegenStats - Month',
+                     'column': 'Total regeneration (MWh)', 'regeneration': True},
+    'net': {'data': 'NetData - Month', 'stats': 'NetStats - Month',
+            'column': 'Total net energy (MWh)', 'regeneration': False},
+}
+MONTHS = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
+
+def DataDirs(data_dir):
+    """
+    Return the list of the folders of the data: the current folder (None), one
+    folder, or several folders (eg. one per year).
+    """
+    if data_dir is None:
+        return [os.getcwd()]
+    if isinstance(data_dir, str):
+        return [data_dir]
+    return list(data_dir)
+
+def DataPath(folder, quantity, month, resolution='h'):
+    """Return the path of a monthly data file, eg. 'Data - Month11 - 5min.xlsx'"""
+    suffix = '' if resolution == 'h' else ' - ' + resolution
+    return os.path.join(folder, QUANTITIES[quantity]['data'] + month + suffix + '.xlsx')
+
+def LoadYear(quantities=('consumption', 'regeneration'), months=MONTHS, data_dir=None):
+    """
+    Load the hourly data of the given quantities and months from 'data_dir'
+    (see 'DataDirs') into one dataframe, with the 'Time', 'day of week' and
+    'hour' columns and the column of each quantity.
+    """
+    df_year = None
+    for quantity in quantities:
+        info = QUANTITIES[quantity]
+        list_df = [ReadExcelCached(DataPath(folder, quantity, month), CompactHourly)
+                   for folder in DataDirs(data_dir) for month in months]
+        df_quantity = pd.concat(list_df, ignore_index=True)
+        if df_year is None:
+            df_year = df_quantity[['Time', 'day of week', 'hour', info['column']]]
+        else:
+            df_year = df_year.merge(df_quantity[['Time', info['column']]], on='Time', how='left')
+    return df_year
+
+def SketchYear(quantities=('consumption', 'regeneration'), months=MONTHS, data_dir=None,
+               resolution='h', compression=200, exclude_holidays=False):
+    """
+    Return a dictionary with the merged quantile sketch (see
+    'QuantileSketch.py') of each of the given quantities, over the months of
+    every folder of 'data_dir' (without the public holidays if
+    'exclude_holidays'). Only one month is held in memory at a time.
+    """
+    sketches = {quantity: NewSketch() for quantity in quantities}
+    for folder in DataDirs(data_dir):
+        for month in months:
+            for quantity in quantities:
+                df_month = ReadExcelCached(DataPath(folder, quantity, month, resolution),
+                                           CompactHourly)
+                if exclude_holidays:
+                    df_month = DropHolidays(df_month)
+                month_sketch = MonthSketch(df_month, QUANTITIES[quantity]['column'], compression)
+                sketches[quantity] = MergeSketches([sketches[quantity], month_sketch], compression)
+    return sketches
+
+def QuantityPmax(quantity, months=MONTHS, data_dir=None, exclude_holidays=False, by='hour'):
+    """
+    Return the maximum value at each hour of a quantity, from the hourly
+    summaries of the months (without the public holidays if 'exclude_holidays').
+    With another grouping 'by' (eg. ['Day type', 'hour']), the maximum value
+    of each group is returned instead (see 'StatsPmax'), where the fields of
+    the calendar index are joined to the summaries when they are needed.
+    """
+    df_stats = pd.concat([ReadStats(QUANTITIES[quantity]['stats'], months, folder)
+                          for folder in DataDirs(data_dir)], ignore_index=True)
+    if exclude_holidays:
+        df_stats = DropHolidays(df_stats)
+    calendar_columns = [column for column in ([by] if isinstance(by, str) else by)
+                        if column not in df_stats.columns]
+    if calendar_columns:
+        df_stats = JoinCalendar(df_stats, calendar_columns)
+    return StatsPmax(df_stats, by)
+
+def QuantifyReserves(quantities=('consumption', 'regeneration'), months=MONTHS, data_dir=None,
+                     pmin_ratio=0.2, df_year=None, backend='exact', resolution='h',
+                     compression=200, lower_q=0.1, upper_q=0.9, exclude_holidays=False):
+    """
+    Return a dictionary with, for each of the given quantities, the
+    percentiles and the reserves of every hour of each day of the week (see
+    'ReserveTable'), with the lower and upper percentiles 'lower_q' and
+    'upper_q' in place of Q10 and Q90. With backend='exact', the percentiles
+    are those of the hourly data of all the months, loaded with 'LoadYear'
+    unless it is given ('df_year'), and P_max is obtained from the hourly
+    summaries of the months. With backend='sketch', the percentiles are
+    estimated from the merged sketches of the months ('SketchYear'), at the
+    given 'resolution' of the data files and 'compression' of the sketches,
+    and P_max is the maximum value of the sketches ('SketchMax'), at the same
+    resolution as the percentiles. With 'exclude_holidays', the Danish public
+    holidays are left out of the days of the week, and of P_max.
+    """
+    if backend == 'exact':
+        if resolution != 'h':
+            raise ValueError("The 'exact' backend uses the hourly data, use the 'sketch' "
+                             "backend for the " + resolution + ' resolution')
+        if df_year is None:
+            df_year = LoadYear(quantities, months, data_dir)
+        if exclude_holidays:
+            df_year = DropHolidays(df_year)
+    elif backend == 'sketch':
+        sketches = SketchYear(quantities, months, data_dir, resolution, compression,
+                              exclude_holidays)
+    else:
+        raise ValueError("Unknown backend '" + str(backend) + "', use 'exact' or 'sketch'")
+
+    reserves = {}
+    for quantity in quantities:
+        info = QUANTITIES[quantity]
+        if backend == 'exact':
+            P_max = QuantityPmax(quantity, months, data_dir, exclude_holidays) # Maximum ...
+            # ... value at each hour.
+            cube = WeekdayCube(df_year, info['column'])
+            reserves[quantity] = ReserveStats(cube, P_max, pmin_ratio, info['regeneration'],
+                                              lower_q, upper_q)
+        else:
+            # The sub-hour values can be larger than the largest hourly value, ...
+            # ... so P_max is taken from the values of the sketch:
+            q10, q50, q90 = SketchQuantiles(sketches[quantity], [lower_q, 0.5, upper_q])
+            reserves[quantity] = ReserveTable(q10, q50, q90, SketchMean(sketches[quantity]),
+                                              SketchMax(sketches[quantity]), pmin_ratio,
+                                              info['regeneration'])
+    return reserves
+
+def DayTypeQuantify(quantities=('consumption', 'regeneration'), months=MONTHS, data_dir=None,
+                    pmin_ratio=0.2, df_year=None, lower_q=0.1, upper_q=0.9):
+    """
+    Return a dictionary with, for each of the given quantities, the
+    percentiles and the reserves of every hour of each day type of the
+    calendar index ('DAY_TYPES'), as a dataframe indexed by 'Day type' and
+    'hour' (see 'GroupReserves'). The hourly data is loaded with 'LoadYear'
+    unless it is given ('df_year'). P_max is the maximum value at each hour of
+    each day type, from the hourly summaries of the months.
+    """
+    if df_year is None:
+        df_year = LoadYear(quantities, months, data_dir)
+    day_type = JoinCalendar(df_year[['Time']].copy(), ['Day type'])['Day type']
+    codes = pd.Categorical(day_type, categories=DAY_TYPES).codes
+    index = pd.MultiIndex.from_product([DAY_TYPES, range(24)]) # Every (day type, hour) pair.
+    reserves = {}
+    for quantity in quantities:
+        info = QUANTITIES[quantity]
+        P_max = QuantityPmax(quantity, months, data_dir, by=['Day type', 'hour']).reindex(index)
+        reserves[quantity] = GroupReserves(GroupCube(df_year, info['column'], codes,
+                                                     len(DAY_TYPES)),
+                                           DAY_TYPES, P_max.to_numpy().reshape(len(DAY_TYPES), 24),
+                                           pmin_ratio, info['regeneration'], lower_q, upper_q)
+    return reserves
+
+def NetQuantify(months=MONTHS, data_dir=None, pmin_ratio=0.2, df_year=None, lower_q=0.1,
+                upper_q=0.9, exclude_holidays=False, bins=20):
+    """
+    Return a dictionary with the percentiles and the reserves of every hour
+    of each day of the week (see 'JointReserves') of the consumption, the
+    regeneration and the net draw ('net'), and their joint distribution: the
+    correlation of the consumption and the regeneration ('correlation', a
+    dataframe indexed by 'day of week' and 'hour') and their 2D histogram
+    ('histogram', with the 'counts' and the bin edges of each quantity). The
+    hourly consumption and regeneration are loaded with 'LoadYear' unless
+    they are given ('df_year'). P_max of the net draw is obtained from the
+    hourly summaries of the net energy ('NetStats - MonthN.xlsx'). With
+    'exclude_holidays', the Danish public holidays are left out of the days
+    of the week, and of P_max.
+    """
+    if df_year is None:
+        df_year = LoadYear(('consumption', 'regeneration'), months, data_dir)
+    if exclude_holidays:
+        df_year = DropHolidays(df_year)
+    cube = JointCube(df_year, QUANTITIES['consumption']['column'],
+                     QUANTITIES['regeneration']['column'])
+    P_max = {quantity: QuantityPmax(quantity, months, data_dir, exclude_holidays)
+             for quantity in JOINT_QUANTITIES}
+    flexibility = JointReserves(cube, P_max, pmin_ratio, lower_q, upper_q)
+    index = pd.MultiIndex.from_product([range(7), range(24)], names=['day of week', 'hour'])
+    flexibility['correlation'] = pd.DataFrame({'Correlation': JointCorrelation(cube).ravel()},
+                                              index=index)
+    counts, consumption_edges, regeneration_edges = JointHistogram(cube, bins)
+    flexibility['histogram'] = {'counts': counts, 'consumption edges': consumption_edges,
+                                'regeneration edges': regeneration_edges}
+    return flexibility
+
+def SweepQuantify(quantities=('consumption', 'regeneration'), months=MONTHS, data_dir=None,
+                  pmin_ratios=(0.1, 0.2, 0.3), lower_qs=(0.05, 0.1, 0.2),
+                  upper_qs=(0.8, 0.9, 0.95), df_year=None):
+    """
+    Return a dictionary with, for each of the given quantities, the reserves
+    of every hour of each day of the week for every combination of the grids
+    of ratios of P_min and of lower and upper percentiles (see
+    'SweepReserves'). The hourly data is loaded with 'LoadYear' unless it is
+    given ('df_year').
+    """
+    if df_year is None:
+        df_year = LoadYear(quantities, months, data_dir)
+    reserves = {}
+    for quantity in quantities:
+        info = QUANTITIES[quantity]
+        reserves[quantity] = SweepReserves(WeekdayCube(df_year, info['column']),
+                                           QuantityPmax(quantity, months, data_dir), pmin_ratios,
+                                           lower_qs, upper_qs, info['regeneration'])
+    return reserves
+
+def RollingQuantify(quantities=('consumption', 'regeneration'), months=MONTHS, data_dir=None,
+                    weeks=8, pmin_ratio=0.2, df_year=None):
+    """
+    Return a dictionary with, for each of the given quantities, the
+    percentiles and the reserves of every hour of the data, from the values of
+    the same hour and day of the week in the 'weeks' weeks before it (see
+    'RollingReserves'), including P_max. The hourly data is loaded with
+    'LoadYear' unless it is given ('df_year').
+    """
+    if df_year is None:
+        df_year = LoadYear(quantities, months, data_dir)
+    df_year = df_year.sort_values('Time', ignore_index=True)
+    reserves = {}
+    for quantity in quantities:
+        info = QUANTITIES[quantity]
+        reserves[quantity] = RollingReserves(df_year, info['column'], weeks, pmin_ratio,
+                                             info['regeneration'])
+    return reserves
+
+def BootstrapReserves(quantities=('consumption', 'regeneration'), months=MONTHS, data_dir=None,
+                      n_boot=1000, level=0.9, pmin_ratio=0.2, df_year=None, seed=0,
+                      resolution='h', exclude_holidays=False):
+    """
+    Return a dictionary with, for each of the given quantities, the bootstrap
+    confidence bands at the given 'level' of the percentiles and the reserves
+    of every hour of each day of the week (see 'BootstrapBands'), from
+    'n_boot' resamplings of the days. The days are resampled from the hourly
+    data, loaded with 'LoadYear' unless it is given ('df_year'), so only the
+    hourly 'resolution' is supported. With 'exclude_holidays', the Danish
+    public holidays are left out of the days of the week, and of P_max.
+    """
+    if resolution != 'h':
+        raise ValueError("The bootstrap resamples the hourly data, the " + resolution
+                         + ' resolution is not supported')
+    if df_year is None:
+        df_year = LoadYear(quantities, months, data_dir)
+    if exclude_holidays:
+        df_year = DropHolidays(df_year)
+    bands = {}
+    for quantity in quantities:
+        info = QUANTITIES[quantity]
+        bands[quantity] = BootstrapBands(WeekdayCube(df_year, info['column']),
+                                         QuantityPmax(quantity, months, data_dir, exclude_holidays),
+                                         n_boot, level, pmin_ratio, info['regeneration'], seed)
+    return bands
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------- #
+# This file contains the rolling-window mode of the reserve quantification.
+# Instead of the percentiles of a whole year, the reserves of every day are
+# obtained from the values of the same day of the week in the last 'weeks'
+# weeks before that day (eg. the last 8 Mondays for a Monday), so that they
+# follow the recent behaviour of the trains and can be used for the bids of
+# that day. For every (day of week, hour) group, the values of the window are
+# kept in a sorted list and in their order of arrival:
+    #1. When a new day arrives, each of its 24 values is inserted into the
+    #... sorted list of its group at the position found by bisection,
+    #2. When the window is full, the oldest value of the group is located in
+    #... the sorted list by bisection and removed,
+    #3. Q10, Q50 and Q90 are read from the sorted list by position (with the
+    #... linear interpolation of 'np.quantile'), P_max is its last value (the
+    #... maximum of the window) and the mean is read from the running sum of
+    #... the window.
+# So the window is not sorted again as the days go by: the positions are found
+# by bisection (O(log n)), and the insertion into and the removal from the
+# sorted list shift the values after them (O(n) per value, for windows of only
+# 'weeks' values). P_max is taken from the same window, and not from all the
+# data as for the yearly reserves, so that the reserves of a day only depend on
+# the days before it.
+# ------------------------------------------------------------------------- #
+
+import pandas as pd
+import numpy as np
+from bisect import bisect_left, insort
+from collections import deque
+from ReservesCube import STAT_NAMES, ReserveArrays
+
+def NewWindows():
+    """Create the empty windows of every (day of week, hour) group"""
+    return {'sorted': [[[] for h in range(24)] for d in range(7)], # Values in sorted order.
+            'arrival': [[deque() for h in range(24)] for d in range(7)], # Values in order of arrival.
+            'sum': np.zeros((7, 24))} # Sum of the values of each window.
+
+def PushValue(windows, d, h, value, weeks):
+    """Add a value to the window of group (d, h), dropping its oldest value when full"""
+    values, arrival = windows['sorted'][d][h], windows['arrival'][d][h]
+    insort(values, value)
+    arrival.append(value)
+    windows['sum'][d, h] += value
+    if len(arrival) > weeks:
+        oldest = arrival.popleft()
+        del values[bisect_left(values, oldest)]
+        windows['sum'][d, h] -= oldest
+
+def WindowQuantile(values, q):
+    """Return the quantile q of a sorted list of values (as 'np.quantile'), NaN if empty"""
+    if not values:
+        return np.nan
+    position = q * (len(values) - 1)
+    lo = int(position)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (position - lo) * (values[hi] - values[lo])
+
+def RollingReserves(df_hourly, column, weeks=8, pmin_ratio=0.2, regeneration=False):
+    """
+    Return the rolling reserves of every hour of the data in 'df_hourly' (with
+    the 'Time', 'day of week' and 'hour' columns of the extracted data): the
+    'STAT_NAMES' statistics of each hour are those of the values of the same
+    hour and day of the week in the 'weeks' weeks before it, and NaN for the
+    first days, which have no earlier values. P_max is the maximum value of
+    the same window. See 'ReserveArrays' for 'pmin_ratio' and
+    'regeneration'.
+    """
+    # Values of each day (row-wise) at each hour (column-wise), in time order:
+    days = df_hourly['Time'].dt.normalize()
+    day_list = np.sort(days.unique())
+    day_index = np.searchsorted(day_list, days.to_numpy())
+    table = np.full((len(day_list), 24), np.nan)
+    table[day_index, df_hourly['hour'].to_numpy(dtype=np.int64)] = df_hourly[column].to_numpy(dtype=float)
+    weekday = pd.DatetimeIndex(day_list).dayofweek
+
+    windows = NewWindows()
+    quantiles = np.full((3, len(day_list), 24), np.nan) # Q10, Q50 and Q90 of each hour.
+    mean = np.full((len(day_list), 24), np.nan)
+    P_max = np.full((len(day_list), 24), np.nan) # Maximum value of the window of each hour.
+    for i, d in enumerate(weekday):
+        for h in range(24):
+            values = windows['sorted'][d][h]
+            if values: # The statistics of the weeks before the day.
+                for k, q in enumerate([0.1, 0.5, 0.9]):
+                    quantiles[k, i, h] = WindowQuantile(values, q)
+                mean[i, h] = windows['sum'][d, h] / len(values)
+                P_max[i, h] = values[-1]
+            if not np.isnan(table[i, h]):
+                PushValue(windows, d, h, table[i, h], weeks)
+
+    stats = ReserveArrays(quantiles[0], quantiles[1], quantiles[2], mean, P_max, pmin_ratio,
+                          regeneration)
+    df_rolling = pd.DataFrame({'Time': (pd.DatetimeIndex(np.repeat(day_list, 24))
+                                        + pd.to_timedelta(np.tile(np.arange(24), len(day_list)), 'h'))})
+    df_rolling['day of week'] = np.repeat(weekday, 24)
+    df_rolling['hour'] = np.tile(np.arange(24), len(day_list))
+    for name, values in zip(STAT_NAMES, stats):
+        df_rolling[name] = values.ravel()
+    return df_rolling
@@ -9,6 +9,9 @@ Created on Sat May  4 21:57:06 2024
 # Year 2022, in hourly, monthly and weekly frames. 
 # Additionally, it also represents the number of active trains avaiable on 
 # hourly and weekly frames.
+# When the data holds the 'Peak concurrent trains' column, the peak number of
+# trains that are active at the same moment is also represented on hourly and
+# weekly frames.
 # ------------------------------------------------------------------------- #
 import pandas as pd
 import os
@@ -16,9 +19,20 @@ import datetime as dt
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns  
+# 'ProjectPaths.py' adds the 'Data Extraction' folder to the module search path:
+import ProjectPaths
+from DataCache import ReadExcelCached
+from FrameSchema import CompactHourly
+from FigureReport import FigureSpec, BoxStatsFigure, ShowFigures, RenderFigures
+from BoxStats import GroupedBoxStats
+from CalendarIndex import JoinCalendar
 
 Months = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12'] 
 Days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+# Set 'report_dir' to a folder to render the figures headless into image files
+# in that folder (in parallel, skipping the figures whose data has not changed
+# since the last run, see 'FigureReport.py'), instead of showing them:
+report_dir = None
  
 # Appending the dataframes containing the total consumption data at every hour ... 
 # ... of each day of each month in year 2022 into one list: 
@@ -28,7 +42,8 @@ list_df = []
 for month in Months:
     data_path = os.path.join(os.getcwd(),'Data - Month' + month + '.xlsx')
     #data_path = os.path.join(os.getcwd(),'Test - Dec.xlsx')
-    month_data = pd.read_excel(data_path)
+    month_data = ReadExcelCached(data_path, CompactHourly) # Compact schema, served from ...
+    # ... the cached copy once it exists.
     list_df.append(month_data)
 
 df_trains = pd.concat(list_df) # Concatanating the list to obtain a single ...
@@ -37,39 +52,40 @@ df_trains['Time'] = pd.to_datetime(df_trains['Time'], dayfirst=True) # This ...
 # ... is to arrange the date in the dataframe in day/month/year format.
 df_trains['Time'] = df_trains['Time'].dt.tz_localize('UTC')
 
-# Extracting the day name from each date:
-df_trains['Day of week name'] = df_trains['Time'].dt.day_name(locale = 'English')
-# Extracting the month name from each date: 
-df_trains['Month of year name'] = df_trains['Time'].dt.month_name(locale = 'English') 
+# The day name, the month name, the weekday/weekend and the day type ('Weekday', ...
+# ... 'Saturday', 'Sunday' or 'Holiday') of each date, looked up in the calendar ...
+# ... index by the day key of the date (see 'CalendarIndex.py'):
+df_trains = JoinCalendar(df_trains, ['Day of week name', 'Month of year name', 'Weekday-Weekend',
+                                     'Day type'])
 
-# Extracting weekdays and weekends from each date:
-df_trains['Weekday-Weekend'] = df_trains["Time"].dt.weekday < 5
-df_trains['Weekday-Weekend'].replace(True, 'Weekday', inplace=True)
-df_trains['Weekday-Weekend'].replace(False, 'Weekend', inplace=True)
+# The box statistics of every column, for each grouping of the box plots, ...
+# ... computed in one pass per column (see 'BoxStats.py'):
+groupings = ["hour", 'Month of year name', 'Day of week name', 'Weekday-Weekend', 'Day type']
+box_stats = {column: GroupedBoxStats(df_trains, column, groupings)
+             for column in ["Total consumption (MWh)", "Number of trains available", "Peak concurrent trains"]
+             if column in df_trains.columns}
+
+# Every figure is collected as a specification (see 'FigureReport.py'), and the
+# figures are shown or rendered at the end:
+figures = []
 
 # ---------- Plotting the total consumption--------------------------------- #
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="hour", y="Total consumption (MWh)", data=df_trains, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Total consumption (MW)")
-plt.title("Hourly consumption data analysis - Year 2022") 
-#plt.savefig("box_plot - hourly")
-
-plt.figure(figsize=(12,10), dpi=80)
-sns.boxplot(x='Month of year name', y="Total consumption (MWh)", data=df_trains, palette="Set1")
-plt.xlabel("Month of year", fontsize=13)
-plt.xticks(rotation=60)
-plt.ylabel("Total consumption (MW)",fontsize=13)
-plt.title("Monthly consumption data analysis - Year 2022", fontsize=15) 
-#plt.savefig("box_plot - monthly")
-
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y="Total consumption (MWh)", data=df_trains, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)",fontsize=13)
-plt.title("Weekly consumption data analysis - Year 2022", fontsize=15) 
-#plt.savefig("box_plot - weekly")
+figures.append(FigureSpec("box_plot - hourly", BoxStatsFigure, (8, 4),
+                          stats=box_stats["Total consumption (MWh)"]["hour"],
+                          xlabel="Hour of day", ylabel="Total consumption (MW)",
+                          title="Hourly consumption data analysis - Year 2022"))
+
+figures.append(FigureSpec("box_plot - monthly", BoxStatsFigure, (12, 10),
+                          stats=box_stats["Total consumption (MWh)"]['Month of year name'],
+                          xlabel="Month of year", ylabel="Total consumption (MW)",
+                          title="Monthly consumption data analysis - Year 2022", label_size=13,
+                          title_size=15, rotation=60))
+
+figures.append(FigureSpec("box_plot - weekly", BoxStatsFigure, (12, 6),
+                          stats=box_stats["Total consumption (MWh)"]['Day of week name'],
+                          xlabel="Day of week", ylabel="Total consumption (MW)",
+                          title="Weekly consumption data analysis - Year 2022", label_size=13,
+                          title_size=15))
 
 # =============================================================================
 # plt.figure(figsize=(8, 4), dpi=80)
@@ -81,26 +97,49 @@ plt.title("Weekly consumption data analysis - Year 2022", fontsize=15)
 # 
 # =============================================================================
 
-plt.figure(figsize=(10, 6), dpi=80)
-sns.boxplot(x='Weekday-Weekend', y="Total consumption (MWh)", data=df_trains, palette="Set1")
-plt.xlabel("Weekday and Weekend")
-#plt.xticks(rotation=90)
-plt.ylabel("Total consumption (MW)")
-plt.title("Consumption data analysis based on weekdays and weekends - Year 2022", fontsize=15) 
-#plt.savefig("box_plot - wkd_wend")
+figures.append(FigureSpec("box_plot - wkd_wend", BoxStatsFigure, (10, 6),
+                          stats=box_stats["Total consumption (MWh)"]['Weekday-Weekend'],
+                          xlabel="Weekday and Weekend", ylabel="Total consumption (MW)",
+                          title="Consumption data analysis based on weekdays and weekends - Year 2022",
+                          title_size=15))
+
+# The day types of the calendar index, where the public holidays are apart ...
+# ... from the days of the week they fall on:
+figures.append(FigureSpec("box_plot - daytype", BoxStatsFigure, (10, 6),
+                          stats=box_stats["Total consumption (MWh)"]['Day type'],
+                          xlabel="Day type", ylabel="Total consumption (MW)",
+                          title="Consumption data analysis based on day types - Year 2022",
+                          title_size=15))
     
 # ----------------- Plotting the number of active trains available ------------ #
-plt.figure(figsize=(8, 4), dpi=80)
-sns.boxplot(x="hour", y="Number of trains available", data=df_trains, palette="Set1")
-plt.xlabel("Hour of day")
-plt.ylabel("Number of active trains available")
-plt.title("Hourly active train analysis - Year 2022") 
-#plt.savefig("box_plot - Trainshourly")
-
-plt.figure(figsize=(12,6), dpi=80)
-sns.boxplot(x='Day of week name', y="Number of trains available", data=df_trains, palette="Set1")
-plt.xlabel("Day of week", fontsize=13)
-#plt.xticks(rotation=90)
-plt.ylabel("Number of active trains available",fontsize=13)
-plt.title("Weekly active train analysis - Year 2022", fontsize=15) 
-#plt.savefig("box_plot - Trainsweekly")
\ No newline at end of file
+figures.append(FigureSpec("box_plot - Trainshourly", BoxStatsFigure, (8, 4),
+                          stats=box_stats["Number of trains available"]["hour"],
+                          xlabel="Hour of day", ylabel="Number of active trains available",
+                          title="Hourly active train analysis - Year 2022"))
+
+figures.append(FigureSpec("box_plot - Trainsweekly", BoxStatsFigure, (12, 6),
+                          stats=box_stats["Number of trains available"]['Day of week name'],
+                          xlabel="Day of week", ylabel="Number of active trains available",
+                          title="Weekly active train analysis - Year 2022", label_size=13,
+                          title_size=15))
+
+# ------------- Plotting the peak number of concurrent trains ----------------- #
+# The peak number of trains that are active at the same moment of an hour is ...
+# ... only in the data extracted with 'reading_min' (see 'DataExtr.py').
+if 'Peak concurrent trains' in df_trains.columns:
+    figures.append(FigureSpec("box_plot - Concurrenthourly", BoxStatsFigure, (8, 4),
+                              stats=box_stats["Peak concurrent trains"]["hour"],
+                              xlabel="Hour of day", ylabel="Peak number of concurrent trains",
+                              title="Hourly concurrent train analysis - Year 2022"))
+
+    figures.append(FigureSpec("box_plot - Concurrentweekly", BoxStatsFigure, (12, 6),
+                              stats=box_stats["Peak concurrent trains"]['Day of week name'],
+                              xlabel="Day of week", ylabel="Peak number of concurrent trains",
+                              title="Weekly concurrent train analysis - Year 2022", label_size=13,
+                              title_size=15))
+
+# -------------------- Showing or rendering the figures ----------- #
+if report_dir is None:
+    ShowFigures(figures)
+else:
+    RenderFigures(figures, report_dir)
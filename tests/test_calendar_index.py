@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data Extraction'))
+from CalendarIndex import CalendarIndex, JoinCalendar
+
+
+def day_type(df_calendar, date):
+    return df_calendar.loc[df_calendar['Date'] == pd.Timestamp(date), 'Day type'].iloc[0]
+
+
+def test_day_types_of_known_days():
+    df_calendar = CalendarIndex('2022-12-19', '2022-12-31')
+    assert day_type(df_calendar, '2022-12-23') == 'Weekday' # Friday.
+    assert day_type(df_calendar, '2022-12-24') == 'Saturday'
+    assert day_type(df_calendar, '2022-12-25') == 'Holiday' # Christmas Day, a Sunday.
+    assert day_type(df_calendar, '2022-12-31') == 'Saturday'
+
+
+def test_sunday_and_holiday_on_a_weekday():
+    df_calendar = CalendarIndex('2022-04-01', '2022-04-30')
+    assert day_type(df_calendar, '2022-04-10') == 'Sunday'
+    assert day_type(df_calendar, '2022-04-15') == 'Holiday' # Good Friday.
+    assert day_type(df_calendar, '2022-04-18') == 'Holiday' # Easter Monday.
+
+
+def test_join_calendar_matches_the_dates():
+    df = pd.DataFrame({'Time': pd.date_range('2022-12-23', periods=72, freq='h', tz='UTC')})
+    JoinCalendar(df, ['Day of week name', 'Day type'])
+    assert (df['Day of week name'] == df['Time'].dt.day_name()).all()
+    assert list(pd.unique(df['Day type'].astype(str))) == ['Weekday', 'Saturday', 'Holiday']
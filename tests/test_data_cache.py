@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data Extraction'))
+import DataCache
+from DataCache import ReadExcelCached
+from FrameSchema import CompactReport, CompactHourly
+
+
+def test_report_dtypes_cold_and_warm(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataCache, 'CACHE_DIR', str(tmp_path / 'Cache'))
+    data_path = str(tmp_path / 'report.xlsx')
+    pd.DataFrame({'ConsumptionPoint': [5701, 5702, 5701, 5703],
+                  'Time': ['01-11-2022 00:00', '01-11-2022 00:05', '01-11-2022 00:10',
+                           '01-11-2022 00:15'],
+                  'Consumption (MWh)': [0.1, 0.2, 0.3, 0.4],
+                  'Generation (MWh)': [0.0, 0.1, 0.0, 0.2]}).to_excel(data_path, index=False)
+
+    cold = ReadExcelCached(data_path, CompactReport)
+    warm = ReadExcelCached(data_path, CompactReport)
+    assert isinstance(cold['ConsumptionPoint'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_series_equal(cold.dtypes, warm.dtypes)
+    pd.testing.assert_frame_equal(cold, warm)
+
+
+def test_hourly_dtypes_cold_and_warm(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataCache, 'CACHE_DIR', str(tmp_path / 'Cache'))
+    data_path = str(tmp_path / 'Data - Month11.xlsx')
+    pd.DataFrame({'Time': pd.date_range('2022-11-01', periods=3, freq='h'),
+                  'Total consumption (MWh)': [1.0, 2.0, 3.0],
+                  'Number of trains available': [10, 11, 12],
+                  'day': [1, 1, 1], 'hour': [0, 1, 2],
+                  'day of week': [1, 1, 1]}).to_excel(data_path)
+
+    cold = ReadExcelCached(data_path, CompactHourly)
+    warm = ReadExcelCached(data_path, CompactHourly)
+    pd.testing.assert_series_equal(cold.dtypes, warm.dtypes)
+
+
+def test_report_conversion_keeps_input_and_energy():
+    df_trains = pd.DataFrame({'ConsumptionPoint': [5701, 5702, 5701],
+                              'Time': ['01-11-2022 00:00', '01-11-2022 00:05',
+                                       '01-11-2022 00:10'],
+                              'Consumption (MWh)': [0.1, 0.2, 1e-9],
+                              'Generation (MWh)': [0.0, 0.1, 0.3]})
+    original = df_trains.copy()
+
+    compact = CompactReport(df_trains)
+    pd.testing.assert_frame_equal(df_trains, original)
+    for column in ['Consumption (MWh)', 'Generation (MWh)']:
+        assert (compact[column].to_numpy() == original[column].to_numpy()).all()
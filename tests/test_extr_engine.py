@@ -0,0 +1,95 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data Extraction'))
+from ExtrEngine import BinTrainChunks, CreateHourlyDf
+from FrameSchema import CompactReport
+from SynthReport import SynthReport
+
+
+def baseline_hourly(df_trains, month, year=2022):
+    """
+    The 5-minute triple loop of the original 'DataExtr.py': the readings of
+    each 5-minute timestamp are selected from t_s to t_e (t_s + 4:59), summed,
+    and the trains with a nonzero reading are counted once within each hour.
+    """
+    t = pd.to_datetime(df_trains['Time'], dayfirst=True).to_numpy()
+    consumption = df_trains['Consumption (MWh)'].to_numpy()
+    points = df_trains['ConsumptionPoint'].to_numpy()
+    n_days = pd.Period(year=year, month=month, freq='M').days_in_month
+
+    consum_l = []
+    num_trains = []
+    for day in range(1, n_days + 1):
+        for hour in range(24):
+            for mints in range(0, 60, 5):
+                t_s = np.datetime64(pd.Timestamp(year, month, day, hour, mints))
+                t_e = t_s + np.timedelta64(4 * 60 + 59, 's')
+                rows = (t >= t_s) & (t <= t_e)
+                consum_l.append(consumption[rows].sum())
+                active_points = pd.unique(points[rows & (consumption > 0)]).tolist()
+                if mints == 0:
+                    consumP_list = active_points
+                else:
+                    for i in active_points:
+                        if i not in consumP_list:
+                            consumP_list.append(i)
+            num_trains.append(len(consumP_list))
+
+    df_new = pd.DataFrame({'Time': pd.date_range(pd.Timestamp(year, month, 1),
+                                                 periods=len(consum_l), freq='5min'),
+                           'Total consumption (MWh)': consum_l})
+    df_new_hourly = df_new.resample('h', on='Time').mean().reset_index()
+    df_new_hourly['Number of trains available'] = num_trains
+    return df_new_hourly
+
+
+def chunk(times, trains, consumption):
+    return pd.DataFrame({'Time': pd.to_datetime(times), 'ConsumptionPoint': trains,
+                         'Consumption (MWh)': consumption, 'Generation (MWh)': 0.0})
+
+
+def test_rows_without_train_are_not_credited_to_a_train():
+    df = chunk(['2022-11-01 00:00', '2022-11-01 00:05', '2022-11-01 00:10'],
+               ['A', np.nan, 'B'], [1.0, 2.0, 4.0])
+    tot_5min, num_trains, energy, quality = BinTrainChunks(
+        [df], 11, columns=['Consumption (MWh)'], return_energy=True, return_quality=True)
+    assert tot_5min['Consumption (MWh)'][:3].tolist() == [1.0, 2.0, 4.0] # Energy is kept.
+    assert num_trains['Consumption (MWh)'][0] == 2
+    assert energy['train_ids'].tolist() == ['A', 'B']
+    hour = energy['matrix']['Consumption (MWh)'].toarray()[0] * 12
+    assert hour.tolist() == [1.0, 4.0] # Nothing is added to 'B'.
+    df_hours, df_trains = quality
+    assert df_hours['Readings without ConsumptionPoint'].iloc[0] == 1
+    assert df_trains['Readings'].tolist() == [1, 1]
+
+
+def test_chunk_without_any_train():
+    chunks = [chunk(['2022-11-01 00:00', '2022-11-01 00:05'], [np.nan, np.nan], [1.0, 2.0]),
+              chunk(['2022-11-01 01:00'], ['A'], [3.0])]
+    tot_5min, num_trains, concurrent, quality = BinTrainChunks(
+        chunks, 11, columns=['Consumption (MWh)'], reading_min=5, return_quality=True)
+    assert tot_5min['Consumption (MWh)'].sum() == 6.0
+    assert num_trains['All'][:2].tolist() == [0, 1]
+    assert concurrent['Consumption (MWh)'][:13].max() == 1
+    assert quality[0]['Readings without ConsumptionPoint'].sum() == 2
+
+
+def test_engine_matches_the_baseline_loop():
+    df_trains = SynthReport(n_trains=4, months=(2,), activity=0.4, seed=5)
+    expected = baseline_hourly(df_trains, 2)
+
+    compact = CompactReport(df_trains)
+    chunks = [compact.iloc[i:i + 5000] for i in range(0, len(compact), 5000)]
+    tot_5min, num_trains = BinTrainChunks(chunks, 2, columns=['Consumption (MWh)'])
+    df_hourly = CreateHourlyDf('Total consumption (MWh)', tot_5min['Consumption (MWh)'],
+                               num_trains['Consumption (MWh)'], 2)
+
+    assert len(df_hourly) == 28 * 24
+    np.testing.assert_allclose(df_hourly['Total consumption (MWh)'],
+                               expected['Total consumption (MWh)'], rtol=1e-12, atol=0)
+    assert np.array_equal(df_hourly['Number of trains available'],
+                          expected['Number of trains available'])
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data Extraction'))
+from ExtrEngine import BinTrainChunks
+from FrameSchema import CompactReport
+from HourlyStore import AppendReport, ReadStoreMonth
+from SynthReport import SynthReport
+
+
+def test_late_corrections_match_a_full_extraction(tmp_path):
+    df_trains = CompactReport(SynthReport(n_trains=5, months=(2,), activity=0.4, seed=7,
+                                          time_text=False))
+    df_trains = df_trains.sort_values('Time', kind='stable', ignore_index=True)
+    split = df_trains['Time'] < pd.Timestamp('2022-02-15', tz='UTC')
+    df_first = df_trains.loc[split]
+
+    # Late corrections of readings before the high-water mark: some readings
+    # change, some are cleared, some start, and some are sent again unchanged.
+    rng = np.random.default_rng(0)
+    df_late = df_first.iloc[rng.choice(len(df_first), 400, replace=False)].copy()
+    consumption = df_late['Consumption (MWh)'].to_numpy()
+    consumption[:100] = 0.0
+    consumption[100:200] *= 1.5
+    consumption[200:300] = 0.003
+    df_late['Consumption (MWh)'] = consumption
+    df_late.loc[df_late.index[:50], 'Generation (MWh)'] = 0.001
+    df_second = pd.concat([df_late, df_trains.loc[~split]], ignore_index=True)
+
+    store_dir = str(tmp_path / 'store')
+    assert AppendReport(store_dir, [df_first.iloc[:6000], df_first.iloc[6000:]]) == [(2022, 2)]
+    assert AppendReport(store_dir, [df_second.iloc[:3000], df_second.iloc[3000:]]) == [(2022, 2)]
+    # Sending the same report again does not change anything:
+    assert AppendReport(store_dir, [df_second]) == []
+
+    df_final = df_trains.copy()
+    df_final.loc[df_late.index, ['Consumption (MWh)', 'Generation (MWh)']] = \
+        df_late[['Consumption (MWh)', 'Generation (MWh)']]
+    tot_5min, num_trains = BinTrainChunks([df_final], 2)
+    store_tot, store_trains = ReadStoreMonth(store_dir, 2)
+    for column in ['Consumption (MWh)', 'Generation (MWh)']:
+        np.testing.assert_allclose(store_tot[column], tot_5min[column], rtol=1e-12, atol=1e-15)
+    for column in ['Consumption (MWh)', 'Generation (MWh)', 'All']:
+        assert np.array_equal(store_trains[column], num_trains[column])
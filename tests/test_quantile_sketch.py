@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Quantification'))
+from QuantileSketch import MonthSketch, MergeSketches, SketchQuantiles, SketchMax
+
+
+def month_frame(rng, n_weeks, shift=0.0):
+    n = 7 * 24 * n_weeks
+    return pd.DataFrame({'day of week': np.repeat(np.arange(7), 24 * n_weeks),
+                         'hour': np.tile(np.arange(24), 7 * n_weeks),
+                         'value': rng.lognormal(shift, 1.0, n)})
+
+
+def test_small_groups_are_exact():
+    df = month_frame(np.random.default_rng(0), 4)
+    estimate = SketchQuantiles(MonthSketch(df, 'value'), [0.1, 0.5, 0.9])
+    exact = np.stack([df.groupby(['day of week', 'hour'])['value'].quantile(q).to_numpy()
+                      for q in [0.1, 0.5, 0.9]]).reshape(3, 7, 24)
+    assert np.allclose(estimate, exact)
+
+
+def test_rank_error_within_bound_after_repeated_merges():
+    rng = np.random.default_rng(0)
+    compression = 50
+    list_df = [month_frame(rng, 10, shift=month / 10) for month in range(24)]
+    sketch = MonthSketch(list_df[0], 'value', compression)
+    for df in list_df[1:]: # Merged one month at a time, as a year is accumulated.
+        sketch = MergeSketches([sketch, MonthSketch(df, 'value', compression)], compression)
+
+    values = pd.concat(list_df).groupby(['day of week', 'hour'])['value']
+    n = values.size().min()
+    for q, estimate in zip([0.1, 0.5, 0.9], SketchQuantiles(sketch, [0.1, 0.5, 0.9])):
+        rank = np.array([(g.to_numpy() < e).mean() for (_, g), e in zip(values, estimate.ravel())])
+        assert np.abs(rank - q).max() <= np.pi * np.sqrt(q * (1 - q)) / compression + 1 / n
+
+
+def test_sketch_max_is_the_maximum_of_every_hour():
+    rng = np.random.default_rng(2)
+    list_df = [month_frame(rng, 10, shift=month / 10) for month in range(6)]
+    sketch = MergeSketches([MonthSketch(df, 'value', 25) for df in list_df], 25)
+    exact = pd.concat(list_df).groupby('hour')['value'].max().to_numpy()
+    assert np.array_equal(SketchMax(sketch), exact)
+    q90 = SketchQuantiles(sketch, [0.9])[0]
+    assert (SketchMax(sketch) - q90 >= 0).all() # The reserve above Q90 is never negative.
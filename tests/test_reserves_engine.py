@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data Extraction'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Quantification'))
+import DataCache
+from ExtrEngine import CreateHourlyDf, CreateTimeGrid
+from HourlyStats import CreateStatsDf
+from ReservesEngine import QuantifyReserves, DayTypeQuantify
+
+
+def write_december(folder):
+    """Write the consumption files of December 2022, with a peak on Christmas Day at 08:00"""
+    grid = CreateTimeGrid(12, 2022)
+    tot_5min = np.random.default_rng(0).uniform(1.0, 2.0, len(grid))
+    tot_5min[(grid.day == 25) & (grid.hour == 8)] = 10.0
+    num_trains = np.zeros(len(grid) // 12, dtype=int)
+    CreateHourlyDf('Total consumption (MWh)', tot_5min, num_trains, 12).to_excel(
+        os.path.join(folder, 'Data - Month12.xlsx'))
+    CreateStatsDf(tot_5min, 12).to_excel(os.path.join(folder, 'Stats - Month12.xlsx'))
+
+
+def test_pmax_without_holidays(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataCache, 'CACHE_DIR', str(tmp_path / 'Cache'))
+    write_december(str(tmp_path))
+    df_all = QuantifyReserves(['consumption'], ['12'], str(tmp_path))['consumption']
+    df_work = QuantifyReserves(['consumption'], ['12'], str(tmp_path),
+                               exclude_holidays=True)['consumption']
+    assert (df_all.xs(8, level='hour')['Pmax'] == 10.0).all()
+    assert (df_work['Pmax'] < 2.0).all() # The peak of Christmas Day is left out.
+    assert (df_work['FCRDown values'] < 1.0).all()
+
+
+def test_pmax_of_every_day_type(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataCache, 'CACHE_DIR', str(tmp_path / 'Cache'))
+    write_december(str(tmp_path))
+    df_types = DayTypeQuantify(['consumption'], ['12'], str(tmp_path))['consumption']
+    pmax = df_types['Pmax'].xs(8, level='hour')
+    assert pmax['Holiday'] == 10.0 # Christmas Day.
+    assert (pmax[['Weekday', 'Saturday', 'Sunday']] < 2.0).all()
+    assert (df_types['FCRDown values'] >= 0).all()
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Quantification'))
+from RollingReserves import RollingReserves
+
+
+def hourly_data(days=70, seed=0):
+    rng = np.random.default_rng(seed)
+    time = pd.date_range('2022-01-03', periods=days * 24, freq='h')
+    return pd.DataFrame({'Time': time, 'day of week': time.dayofweek, 'hour': time.hour,
+                         'Total consumption (MWh)': rng.random(len(time))})
+
+
+def test_pmax_is_the_maximum_of_the_window():
+    df = hourly_data()
+    df_rolling = RollingReserves(df, 'Total consumption (MWh)', weeks=4)
+    values = df['Total consumption (MWh)'].to_numpy().reshape(-1, 24)
+    for day in [7, 20, 45, 69]:
+        window = values[day - 7 * np.arange(1, 5)[7 * np.arange(1, 5) <= day]]
+        np.testing.assert_allclose(df_rolling['Pmax'].to_numpy().reshape(-1, 24)[day],
+                                   window.max(axis=0))
+
+
+def test_no_look_ahead():
+    df = hourly_data()
+    df_later = df.copy()
+    df_later.loc[df_later['Time'] >= '2022-02-14', 'Total consumption (MWh)'] *= 10
+    a = RollingReserves(df, 'Total consumption (MWh)', weeks=4)
+    b = RollingReserves(df_later, 'Total consumption (MWh)', weeks=4)
+    before = a['Time'] < '2022-02-15' # The day of the change has no values after it.
+    pd.testing.assert_frame_equal(a[before], b[before])
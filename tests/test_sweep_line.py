@@ -0,0 +1,69 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data Extraction'))
+from ExtrEngine import BinTrainChunks
+from SweepLine import MergeIntervals, SweepPeak
+from SynthReport import SynthReport
+
+
+def reference_peaks(df, column, reading_s, n_periods, period_s):
+    """Peaks of the merged intervals of all the active readings of the month at once"""
+    active = df.loc[df[column] > 0]
+    codes = pd.factorize(active['ConsumptionPoint'])[0]
+    starts = (active['Time'] - pd.Timestamp('2022-11-01')).dt.total_seconds().to_numpy(np.int64)
+    codes, starts, ends = MergeIntervals(codes, starts, starts + reading_s)
+    return SweepPeak(starts, ends, n_periods, period_s)
+
+
+def test_chunked_peaks_match_the_sweep_of_all_intervals():
+    df = SynthReport(n_trains=8, activity=0.5, seed=3, time_text=False)
+    df = df.sort_values('Time', kind='stable', ignore_index=True)
+    chunks = [df.iloc[i:i + 997] for i in range(0, len(df), 997)]
+    for reading_min in [5, 7]: # Touching and overlapping readings of a train.
+        concurrent = BinTrainChunks(chunks, 11, reading_min=reading_min)[-1]
+        single = BinTrainChunks([df], 11, reading_min=reading_min)[-1]
+        for column in ['Consumption (MWh)', 'Generation (MWh)']:
+            expected = reference_peaks(df, column, reading_min * 60, 30 * 24 * 12, 300)
+            assert np.array_equal(concurrent[column], expected)
+            assert np.array_equal(single[column], expected)
+        assert (concurrent['All'] >= concurrent['Consumption (MWh)']).all()
+
+
+def test_peaks_match_a_count_at_every_second():
+    df = SynthReport(n_trains=5, months=(2,), activity=0.4, seed=11, time_text=False)
+    df = df.sort_values('Time', kind='stable', ignore_index=True)
+    chunks = [df.iloc[i:i + 1500] for i in range(0, len(df), 1500)]
+    n_seconds = 28 * 24 * 3600
+    reading_s = 7 * 60
+    concurrent = BinTrainChunks(chunks, 2, columns=['Consumption (MWh)'], reading_min=7)[-1]
+
+    # Whether each train is active at each second of the month:
+    active = df.loc[df['Consumption (MWh)'] > 0]
+    codes, train_ids = pd.factorize(active['ConsumptionPoint'])
+    starts = (active['Time'] - pd.Timestamp('2022-02-01')).dt.total_seconds().to_numpy(np.int64)
+    busy = np.zeros((len(train_ids), n_seconds), dtype=bool)
+    for code, start in zip(codes, starts):
+        busy[code, start:start + reading_s] = True
+    expected = busy.sum(axis=0).reshape(-1, 300).max(axis=1)
+
+    assert expected.max() > 1
+    assert np.array_equal(concurrent['Consumption (MWh)'], expected)
+    assert np.array_equal(concurrent['All'], expected)
+
+
+def test_peak_of_a_few_intervals():
+    # Two trains overlapping from 00:04 to 00:05, and a third one from 00:06:
+    starts, ends = np.array([0, 240, 360]), np.array([300, 540, 660])
+    assert SweepPeak(starts, ends, 3, 300).tolist() == [2, 2, 1]
+
+
+def test_chunks_out_of_time_order_are_rejected():
+    df = SynthReport(n_trains=2, activity=1.0, time_text=False)
+    df = df.sort_values('Time', kind='stable', ignore_index=True)
+    with pytest.raises(ValueError):
+        BinTrainChunks([df.iloc[100:200], df.iloc[:100]], 11, reading_min=5)